@@ -2,101 +2,500 @@
 Flask API for Torah reading tracker.
 """
 
+import atexit
+import base64
 import json
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from functools import wraps
 from pathlib import Path
-from typing import Dict, List
-
-from flask import Flask, jsonify, request
+from typing import Dict, Optional
+from weakref import WeakKeyDictionary
+
+from flask import (
+    Flask,
+    Response,
+    abort,
+    g,
+    jsonify,
+    make_response,
+    request,
+    stream_with_context,
+)
 from flask_cors import CORS
 
+from backend.api.compression import (
+    CompressionCache,
+    compress,
+    negotiate,
+    should_compress,
+)
+from backend.data_fetcher.calendar_index import CalendarIndex
+from backend.data_fetcher.catalog import Catalog
+from backend.data_fetcher.hebcal_fetcher import parse_verse_range
+from backend.data_fetcher.progress_analytics import ProgressAnalytics
+from backend.data_fetcher.progress_events import ProgressEvents
+from backend.data_fetcher.progress_registry import (
+    TrackerRegistry,
+    is_valid_user_id,
+    user_store_path,
+)
+from backend.data_fetcher.progress_stats import ProgressStats
+from backend.data_fetcher.progress_storage import SqliteStorage
 from backend.data_fetcher.progress_tracker import ProgressTracker
+from backend.data_fetcher.reading_cycle import ReadingCycle, load_cycles
+from backend.data_fetcher.reading_plan import ReadingPlanner
+from backend.data_fetcher.verse_index import VerseIndex
+from backend.data_fetcher.verse_progress import VerseProgress
+from backend.metrics import (
+    REGISTRY,
+    REQUEST_SECONDS,
+    REQUESTS,
+    RESPONSE_BYTES,
+    record_cache,
+)
 
 app = Flask(__name__)
 CORS(app)
 
+
+@app.before_request
+def start_timer():
+    """Note when the request started, for the latency metrics."""
+    g.started = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    """Record latency, status and payload size per route template."""
+    started = g.pop("started", None)
+    if started is not None:
+        # Templates such as /api/users/<user_id>/stats keep label sets bounded
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route, request.method)
+        REQUESTS.inc(route, request.method, str(response.status_code))
+        if not response.is_streamed:
+            RESPONSE_BYTES.observe(response.calculate_content_length() or 0, route)
+    return response
+
+
+# Compressed bodies of conditional responses, by path, ETag and encoding
+_compressed = CompressionCache()
+
+
+@app.after_request
+def compress_response(response):
+    """Compress large responses on the fly (runs before record_request)."""
+    if response.mimetype != "text/event-stream":
+        response.vary.add("Accept-Encoding")
+    if should_compress(response):
+        encoding = negotiate(request.accept_encodings)
+        if encoding is not None:
+            response.set_data(compress(response.get_data(), encoding))
+            response.content_encoding = encoding
+    return response
+
+
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 TORAH_DATA_FILE = DATA_DIR / "torah_readings_complete.json"
+CATALOG_FILE = DATA_DIR / "catalog.bin"
 PROGRESS_FILE = DATA_DIR / "progress.csv"
+VERSE_INDEX_FILE = DATA_DIR / "verse_index.json"
+CALENDAR_INDEX_FILE = DATA_DIR / "calendar_index.json"
+VERSE_PROGRESS_FILE = DATA_DIR / "verse_progress.csv"
+CYCLES_DIR = DATA_DIR / "cycles"
+USERS_DIR = DATA_DIR / "users"
+# Set to a SQLite path to share progress safely between worker processes
+PROGRESS_DB = os.environ.get("PROGRESS_DB")
+# Maximum number of per-user trackers kept in memory
+MAX_LOADED_USERS = int(os.environ.get("MAX_LOADED_USERS", "256"))
+
+
+def create_tracker() -> ProgressTracker:
+    """
+    Create the progress tracker for the configured storage backend.
 
-tracker = ProgressTracker(str(PROGRESS_FILE))
-
-# Load Torah data once at startup (it never changes during runtime)
-_torah_data_cache: List[Dict] = []
+    With PROGRESS_DB set, progress lives in SQLite; the existing CSV is
+    imported the first time the database is created.
+    """
+    if not PROGRESS_DB:
+        return ProgressTracker(str(PROGRESS_FILE))
 
+    storage = SqliteStorage(PROGRESS_DB)
+    if storage.is_empty() and PROGRESS_FILE.exists():
+        storage.import_csv(str(PROGRESS_FILE))
+    return ProgressTracker(storage=storage)
 
-def load_torah_data() -> List[Dict]:
-    """Load Torah reading data from JSON file (cached)."""
-    global _torah_data_cache
 
-    if _torah_data_cache:
-        return _torah_data_cache
+def create_user_tracker(user_id: str) -> ProgressTracker:
+    """Create a user's tracker in its shard, using the configured backend."""
+    if not PROGRESS_DB:
+        user_tracker = ProgressTracker(str(user_store_path(USERS_DIR, user_id)))
+    else:
+        path = user_store_path(USERS_DIR, user_id, suffix=".db")
+        user_tracker = ProgressTracker(storage=SqliteStorage(str(path)))
+    return user_tracker
 
-    if not TORAH_DATA_FILE.exists():
-        return []
 
-    with open(TORAH_DATA_FILE, "r", encoding="utf-8") as f:
-        _torah_data_cache = json.load(f)
+tracker = create_tracker()
+atexit.register(tracker.close)
 
-    return _torah_data_cache
+users = TrackerRegistry(create_user_tracker, MAX_LOADED_USERS)
+atexit.register(users.close)
 
 
-def merge_progress_with_data(torah_data: List[Dict]) -> List[Dict]:
+def get_tracker(user_id: Optional[str] = None) -> ProgressTracker:
     """
-    Merge progress information with Torah reading data.
+    Get the tracker for a request.
 
     Args:
-        torah_data: List of parsha dicts
+        user_id: User from the URL, or None for the default single-user store
 
     Returns:
-        Torah data enriched with progress information
+        ProgressTracker for that user
+    """
+    if user_id is None:
+        return tracker
+
+    if not is_valid_user_id(user_id):
+        abort(make_response(jsonify({"error": "Invalid user id"}), 400))
+    # Held until the request ends, so the tracker can't be evicted mid-request
+    held = g.setdefault("held_trackers", {})
+    if user_id not in held:
+        held[user_id] = users.acquire(user_id)
+    return held[user_id]
+
+
+@app.teardown_request
+def release_trackers(exc):
+    """Release the per-user trackers held by the request."""
+    for user_id in g.pop("held_trackers", {}):
+        users.release(user_id)
+
+
+# Load Torah data once at startup (it never changes during runtime)
+_catalog_cache: Optional[Catalog] = None
+
+
+def load_catalog() -> Catalog:
+    """
+    Load the immutable Torah reading catalog (cached).
+
+    The binary catalog is preferred; the JSON export is used when it hasn't
+    been built, or when it is stale or from an older format.
     """
-    progress = tracker.load_progress()
+    global _catalog_cache
+
+    record_cache("catalog", _catalog_cache is not None)
+    if _catalog_cache is not None:
+        return _catalog_cache
+
+    catalog = None
+    if CATALOG_FILE.exists():
+        try:
+            catalog = Catalog.from_binary(CATALOG_FILE, source=TORAH_DATA_FILE)
+        except ValueError as e:
+            app.logger.warning("%s; loading %s instead", e, TORAH_DATA_FILE.name)
+    if catalog is None:
+        catalog = Catalog.from_json(TORAH_DATA_FILE)
+    if len(catalog) > 0:
+        _catalog_cache = catalog
+
+    return catalog
+
+
+_verse_index_cache: Optional[VerseIndex] = None
+
+
+def load_verse_index() -> Optional[VerseIndex]:
+    """Load the per-verse word-count index (cached), or None if not built."""
+    global _verse_index_cache
+
+    if _verse_index_cache is None and VERSE_INDEX_FILE.exists():
+        _verse_index_cache = VerseIndex.load(VERSE_INDEX_FILE)
+
+    return _verse_index_cache
+
+
+_calendar_cache: Optional[CalendarIndex] = None
+
+
+def load_calendar_index() -> Optional[CalendarIndex]:
+    """Load the weekly reading calendar (cached), or None if not built."""
+    global _calendar_cache
+
+    if _calendar_cache is None and CALENDAR_INDEX_FILE.exists():
+        _calendar_cache = CalendarIndex.load(CALENDAR_INDEX_FILE)
+
+    return _calendar_cache
+
+
+_cycles_cache: Optional[Dict[str, ReadingCycle]] = None
+
 
-    for parsha in torah_data:
-        for aliyah in parsha["aliyot"]:
-            key = (parsha["title"], aliyah["number"])
-            if key in progress:
-                aliyah["is_complete"] = progress[key]["is_complete"]
-                aliyah["date_completed"] = progress[key]["date_completed"]
+def load_reading_cycles() -> Optional[Dict[str, ReadingCycle]]:
+    """
+    Load the annual cycle plus any cycle files (cached), or None if the
+    verse index or catalog isn't built.
+    """
+    global _cycles_cache
+
+    if _cycles_cache is None:
+        verse_index = load_verse_index()
+        catalog = load_catalog()
+        if verse_index is not None and len(catalog) > 0:
+            _cycles_cache = load_cycles(CYCLES_DIR, verse_index, catalog)
+
+    return _cycles_cache
+
+
+# Statistics aggregates, built on first use and kept current by each tracker
+_stats: "WeakKeyDictionary[ProgressTracker, ProgressStats]" = WeakKeyDictionary()
+
+
+def get_stats(tracker: ProgressTracker) -> ProgressStats:
+    """Get a tracker's statistics aggregate, building it on first use."""
+    with tracker.lock:
+        stats = _stats.get(tracker)
+
+        if stats is None:
+            stats = ProgressStats(load_catalog(), tracker.load_progress())
+            tracker.subscribe(stats.apply)
+            _stats[tracker] = stats
+
+    return stats
+
+
+# Reading history aggregates, built on first use and kept current by each tracker
+_analytics: "WeakKeyDictionary[ProgressTracker, ProgressAnalytics]" = (
+    WeakKeyDictionary()
+)
+
+
+def get_analytics(tracker: ProgressTracker) -> ProgressAnalytics:
+    """Get a tracker's reading history aggregate, building it on first use."""
+    with tracker.lock:
+        analytics = _analytics.get(tracker)
+
+        if analytics is None:
+            analytics = ProgressAnalytics(load_catalog(), tracker.load_progress())
+            tracker.subscribe(analytics.apply)
+            _analytics[tracker] = analytics
+
+    return analytics
+
+
+# Live change feeds for /api/events, one per tracker
+_events: "WeakKeyDictionary[ProgressTracker, ProgressEvents]" = WeakKeyDictionary()
+
+# How often an idle event stream checks storage for other workers' writes,
+# sends a keep-alive comment, and ends so the client reconnects
+EVENTS_POLL_SECONDS = 2.0
+EVENTS_KEEPALIVE_SECONDS = 15.0
+EVENTS_MAX_SECONDS = 25.0
+# Each open stream holds a server thread; past this many per process, new
+# streams get a 503 so other requests still find a free thread
+MAX_EVENT_STREAMS = int(
+    os.environ.get(
+        "MAX_EVENT_STREAMS", max(1, int(os.environ.get("GUNICORN_THREADS", "16")) // 2)
+    )
+)
+EVENTS_RETRY_AFTER_SECONDS = 10
+_event_streams = threading.BoundedSemaphore(MAX_EVENT_STREAMS)
+
+
+def get_events(tracker: ProgressTracker) -> ProgressEvents:
+    """Get a tracker's change feed, subscribing it on first use."""
+    with tracker.lock:
+        events = _events.get(tracker)
+
+        if events is None:
+            events = ProgressEvents(tracker)
+            tracker.subscribe(events.publish)
+            _events[tracker] = events
+
+    return events
+
+
+# Reading planners, built on first use and kept current by each tracker
+_planners: "WeakKeyDictionary[ProgressTracker, ReadingPlanner]" = WeakKeyDictionary()
+
+
+def get_planner(tracker: ProgressTracker) -> ReadingPlanner:
+    """Get a tracker's reading planner, building it on first use."""
+    with tracker.lock:
+        planner = _planners.get(tracker)
+
+        if planner is None:
+            planner = ReadingPlanner(load_catalog(), tracker.load_progress())
+            tracker.subscribe(planner.apply)
+            _planners[tracker] = planner
+
+    return planner
+
+
+# Verse-level progress, kept in step with each tracker's aliyah toggles
+_verse_progress: "WeakKeyDictionary[ProgressTracker, VerseProgress]" = (
+    WeakKeyDictionary()
+)
+
+
+def attach_verse_progress(
+    tracker: ProgressTracker, log_path: Path
+) -> Optional[VerseProgress]:
+    """
+    Load a tracker's verse progress and attach it to the tracker.
+
+    Returns:
+        VerseProgress, or None if the verse index hasn't been built
+    """
+    verse_index = load_verse_index()
+    catalog = load_catalog()
+    if verse_index is None or len(catalog) == 0:
+        return None
+
+    verse_progress = VerseProgress(log_path, verse_index, catalog)
+    verse_progress.attach(tracker)
+    _verse_progress[tracker] = verse_progress
+    return verse_progress
+
+
+def get_verse_progress(user_id: Optional[str] = None) -> Optional[VerseProgress]:
+    """Get verse progress for a request's tracker, attaching it if needed."""
+    tracker = get_tracker(user_id)
+    with tracker.lock:
+        verse_progress = _verse_progress.get(tracker)
+        if verse_progress is None:
+            if user_id is None:
+                log_path = VERSE_PROGRESS_FILE
             else:
-                aliyah["is_complete"] = False
-                aliyah["date_completed"] = None
+                log_path = user_store_path(USERS_DIR, user_id, suffix=".verses.csv")
+            verse_progress = attach_verse_progress(tracker, log_path)
+    return verse_progress
+
+
+def conditional(view):
+    """
+    Add ETag/Last-Modified validators keyed on the progress version.
+
+    Requests whose If-None-Match (or, failing that, If-Modified-Since) matches
+    the current progress state get an empty 304 without calling the view.
+    The view runs under the tracker lock, so the validators always describe
+    the state it rendered.
+
+    Last-Modified has one-second precision, so it is only sent, and
+    If-Modified-Since only honored, once the second of the last change has
+    passed; until then a later change in the same second would look
+    unmodified. The ETag covers that window.
 
-    return torah_data
+    Compressed bodies are cached by ETag, so each state is rendered and
+    compressed once per encoding. The ETag is weak when the client accepts
+    compression, as the bytes sent depend on the encoding.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        tracker = get_tracker(kwargs.get("user_id"))
+        with tracker.lock:
+            catalog = load_catalog()
+            tracker.load_progress()
+            # The catalog size covers the data file appearing after startup
+            etag = f"{tracker.etag}.{len(catalog)}"
+            last_modified = tracker.last_modified.replace(microsecond=0)
+            settled = last_modified < datetime.now(timezone.utc).replace(microsecond=0)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = settled and since is not None and since >= last_modified
+
+            encoding = negotiate(request.accept_encodings)
+            cache_key = f"{request.full_path} {etag}"
+            cached = None
+            if encoding and not not_modified:
+                cached = _compressed.lookup(cache_key, encoding)
+                record_cache("compressed", cached is not None)
+
+            if not_modified:
+                response = app.response_class(status=304)
+            elif cached:
+                mimetype, body = cached
+                response = app.response_class(body, mimetype=mimetype)
+                response.content_encoding = encoding
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if encoding and should_compress(response):
+                    response.set_data(
+                        _compressed.store(
+                            cache_key,
+                            encoding,
+                            response.mimetype,
+                            response.get_data(),
+                        )
+                    )
+                    response.content_encoding = encoding
+
+            response.set_etag(etag, weak=encoding is not None)
+            if settled:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+
+    return wrapper
 
 
 @app.route("/api/parshiot", methods=["GET"])
-def get_all_parshiot():
+@app.route("/api/users/<user_id>/parshiot", methods=["GET"])
+@conditional
+def get_all_parshiot(user_id: Optional[str] = None):
     """Get all Torah readings with progress."""
-    torah_data = load_torah_data()
-    enriched_data = merge_progress_with_data(torah_data)
-    return jsonify(enriched_data)
+    body = load_catalog().render(get_tracker(user_id).load_progress())
+    return app.response_class(body, mimetype="application/json")
 
 
 @app.route("/api/parshiot/<parsha_title>", methods=["GET"])
-def get_parsha(parsha_title: str):
+@app.route("/api/users/<user_id>/parshiot/<parsha_title>", methods=["GET"])
+@conditional
+def get_parsha(parsha_title: str, user_id: Optional[str] = None):
     """Get a specific parsha with progress."""
-    torah_data = load_torah_data()
-    enriched_data = merge_progress_with_data(torah_data)
-
-    for parsha in enriched_data:
-        if parsha["title"] == parsha_title:
-            return jsonify(parsha)
+    parsha = load_catalog().by_title.get(parsha_title)
+    if parsha is None:
+        return jsonify({"error": "Parsha not found"}), 404
 
-    return jsonify({"error": "Parsha not found"}), 404
+    body = parsha.render(get_tracker(user_id).load_progress())
+    return app.response_class(body, mimetype="application/json")
 
 
 @app.route("/api/parshiot/<parsha_title>/aliyot/<int:aliyah_number>", methods=["PUT"])
-def update_aliyah_status(parsha_title: str, aliyah_number: int):
+@app.route(
+    "/api/users/<user_id>/parshiot/<parsha_title>/aliyot/<int:aliyah_number>",
+    methods=["PUT"],
+)
+def update_aliyah_status(
+    parsha_title: str, aliyah_number: int, user_id: Optional[str] = None
+):
     """
     Update completion status of an aliyah.
 
     Request body:
         {"is_complete": true/false}
     """
-    data = request.get_json()
-    is_complete = data.get("is_complete", False)
-
+    data = request.get_json(silent=True)
+    is_complete = data.get("is_complete") if isinstance(data, dict) else None
+    if not isinstance(is_complete, bool):
+        return jsonify({"error": "'is_complete' must be true or false"}), 400
+    if (parsha_title, aliyah_number) not in load_catalog().by_key:
+        return (
+            jsonify({"error": f"Unknown aliyah: {parsha_title} {aliyah_number}"}),
+            400,
+        )
+
+    tracker = get_tracker(user_id)
     if is_complete:
         tracker.mark_complete(parsha_title, aliyah_number)
     else:
@@ -105,74 +504,465 @@ def update_aliyah_status(parsha_title: str, aliyah_number: int):
     return jsonify({"success": True})
 
 
+@app.route("/api/aliyot", methods=["PATCH"])
+@app.route("/api/users/<user_id>/aliyot", methods=["PATCH"])
+def bulk_update_aliyot(user_id: Optional[str] = None):
+    """
+    Update completion status of many aliyot with a single persist.
+
+    Request body (one of):
+        {"updates": [{"parsha": "...", "aliyah": 1, "is_complete": true}, ...]}
+        {"parsha": "...", "is_complete": true/false}
+        {"book": "Numbers", "is_complete": true/false}
+
+    is_complete is required, so a missing flag never un-marks a whole book.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+
+    if "updates" in data:
+        if not isinstance(data["updates"], list):
+            return jsonify({"error": "'updates' must be a list"}), 400
+        by_key = load_catalog().by_key
+        try:
+            updates = [
+                (u["parsha"], int(u["aliyah"]), u.get("is_complete"))
+                for u in data["updates"]
+            ]
+        except (KeyError, TypeError, ValueError):
+            return (
+                jsonify({"error": "Each update needs 'parsha' and 'aliyah'"}),
+                400,
+            )
+        for parsha, aliyah, is_complete in updates:
+            if not isinstance(is_complete, bool):
+                return jsonify({"error": "'is_complete' must be true or false"}), 400
+            if (parsha, aliyah) not in by_key:
+                return (
+                    jsonify({"error": f"Unknown aliyah: {parsha} {aliyah}"}),
+                    400,
+                )
+    elif "parsha" in data or "book" in data:
+        is_complete = data.get("is_complete")
+        if not isinstance(is_complete, bool):
+            return jsonify({"error": "'is_complete' must be true or false"}), 400
+        catalog = load_catalog()
+        if "parsha" in data:
+            parsha = catalog.by_title.get(data["parsha"])
+            if parsha is None:
+                return jsonify({"error": "Parsha not found"}), 404
+            selected = (parsha,)
+        else:
+            selected = catalog.by_book.get(data["book"])
+            if not selected:
+                return jsonify({"error": "Book not found"}), 404
+        updates = [
+            (aliyah.parsha_title, aliyah.number, is_complete)
+            for parsha in selected
+            for aliyah in parsha.aliyot
+        ]
+    else:
+        return (
+            jsonify({"error": "Provide 'updates', 'parsha' or 'book'"}),
+            400,
+        )
+
+    updated = get_tracker(user_id).apply_updates(updates)
+    return jsonify({"success": True, "updated": updated})
+
+
 @app.route("/api/stats", methods=["GET"])
-def get_statistics():
+@app.route("/api/users/<user_id>/stats", methods=["GET"])
+@conditional
+def get_statistics(user_id: Optional[str] = None):
     """
     Get overall reading statistics.
 
-    Returns word count, verse count, and aliyah count for completed readings.
+    Returns word count, verse count, and aliyah count for completed readings,
+    overall and broken down per book and per parsha.
+    """
+    return jsonify(get_stats(get_tracker(user_id)).summary())
+
+
+@app.route("/api/schedule", methods=["GET"])
+@app.route("/api/users/<user_id>/schedule", methods=["GET"])
+def get_schedule(user_id: Optional[str] = None):
+    """
+    Get the current and upcoming weekly readings with progress for each.
+
+    Query params:
+        date: ISO date to look ahead from (default: today)
+        count: Number of readings (default 1, at most 60)
+        israel: "true" for the Israel reading schedule
+    """
+    calendar = load_calendar_index()
+    if calendar is None:
+        return jsonify({"error": "Calendar index not initialized"}), 503
+
+    try:
+        day = date.fromisoformat(request.args.get("date", date.today().isoformat()))
+        count = min(max(int(request.args.get("count", 1)), 1), 60)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    israel = request.args.get("israel", "").lower() in ("1", "true", "yes")
+
+    readings = calendar.upcoming(
+        day.isoformat(), count, "israel" if israel else "diaspora"
+    )
+
+    tracker = get_tracker(user_id)
+    with tracker.lock:
+        by_parsha = get_stats(tracker).summary()["by_parsha"]
+        for reading in readings:
+            reading["progress"] = {
+                title: by_parsha.get(title) for title in reading["parshiot"]
+            }
+
+    return jsonify({"date": day.isoformat(), "readings": readings})
+
+
+@app.route("/api/analytics", methods=["GET"])
+@app.route("/api/users/<user_id>/analytics", methods=["GET"])
+def get_reading_analytics(user_id: Optional[str] = None):
     """
-    torah_data = load_torah_data()
-    enriched_data = merge_progress_with_data(torah_data)
+    Get reading history: words, verses and aliyot per day and week, the
+    rolling reading rate, streaks and the projected completion date.
+
+    Query params:
+        window: Days in the rolling rate window (default 30, at most 365)
+        today: ISO date to compute the rate and projection from (default: today)
+    """
+    try:
+        window = min(max(int(request.args.get("window", 30)), 1), 365)
+        today = date.fromisoformat(request.args.get("today", date.today().isoformat()))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    tracker = get_tracker(user_id)
+    with tracker.lock:
+        return jsonify(get_analytics(tracker).summary(today, window))
 
-    total_aliyot = 0
-    completed_aliyot = 0
-    total_verses = 0
-    completed_verses = 0
-    total_words = 0
-    completed_words = 0
 
-    for parsha in enriched_data:
-        for aliyah in parsha["aliyot"]:
-            total_aliyot += 1
-            total_verses += aliyah["verse_count"]
-            total_words += aliyah.get("word_count", 0)
+@app.route("/api/plan", methods=["GET"])
+@app.route("/api/users/<user_id>/plan", methods=["GET"])
+def get_plan(user_id: Optional[str] = None):
+    """
+    Get a daily reading plan for the unfinished aliyot, balanced by words.
+
+    Query params:
+        by: ISO date to finish by (required)
+        start: ISO date of the first reading day (default: today)
+        book: Only plan this book, e.g. "Numbers"
+        parsha: Only plan this parsha, by title
+    """
+    tracker = get_tracker(user_id)
+    try:
+        end = date.fromisoformat(request.args.get("by", ""))
+        start = date.fromisoformat(request.args.get("start", date.today().isoformat()))
+        with tracker.lock:
+            plan = get_planner(tracker).plan(
+                start, end, request.args.get("book"), request.args.get("parsha")
+            )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(plan)
+
+
+@app.route("/api/progress", methods=["GET"])
+@app.route("/api/users/<user_id>/progress", methods=["GET"])
+@conditional
+def get_progress(user_id: Optional[str] = None):
+    """
+    Get compact completion state for every aliyah.
+
+    Slots follow canonical parsha order (ALL_54_PARSHIOT) then aliyah number.
 
-            if aliyah["is_complete"]:
-                completed_aliyot += 1
-                completed_verses += aliyah["verse_count"]
-                completed_words += aliyah.get("word_count", 0)
+    Query params:
+        encoding: "bitset" (default, base64 MSB-first bits) or "rle"
+            (run lengths alternating incomplete/complete)
+    """
+    tracker = get_tracker(user_id)
+    catalog = load_catalog()
+    if tracker.slot_count != len(catalog.by_key):
+        tracker.bind_slots([aliyah.key for aliyah in catalog.aliyot()])
+
+    encoding = request.args.get("encoding", "bitset")
+    if encoding == "bitset":
+        data = base64.b64encode(tracker.progress_bits()).decode("ascii")
+    elif encoding == "rle":
+        data = tracker.progress_runs()
+    else:
+        return jsonify({"error": f"Unknown encoding: {encoding}"}), 400
 
     return jsonify(
         {
-            "total": {
-                "aliyot": total_aliyot,
-                "verses": total_verses,
-                "words": total_words,
-            },
-            "completed": {
-                "aliyot": completed_aliyot,
-                "verses": completed_verses,
-                "words": completed_words,
-            },
-            "percentage": {
-                "aliyot": (
-                    round(completed_aliyot / total_aliyot * 100, 1)
-                    if total_aliyot > 0
-                    else 0
-                ),
-                "verses": (
-                    round(completed_verses / total_verses * 100, 1)
-                    if total_verses > 0
-                    else 0
-                ),
-                "words": (
-                    round(completed_words / total_words * 100, 1)
-                    if total_words > 0
-                    else 0
-                ),
-            },
+            "version": tracker.version,
+            "count": tracker.slot_count,
+            "encoding": encoding,
+            "data": data,
         }
     )
 
 
+@app.route("/api/counts", methods=["GET"])
+def get_range_counts():
+    """
+    Get word and verse counts for an arbitrary verse range.
+
+    Query params:
+        range: Verse range like "Genesis 1:1-2:3"
+    """
+    verse_index = load_verse_index()
+    if verse_index is None:
+        return jsonify({"error": "Verse index not initialized"}), 503
+
+    try:
+        verse_range = parse_verse_range(request.args.get("range", ""))
+        counts = verse_index.count_range(verse_range)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"range": verse_range["raw"], **counts})
+
+
+@app.route("/api/verses", methods=["GET"])
+@app.route("/api/users/<user_id>/verses", methods=["GET"])
+def get_verses(user_id: Optional[str] = None):
+    """Get read verse ranges and word-weighted completion per book."""
+    verse_progress = get_verse_progress(user_id)
+    if verse_progress is None:
+        return jsonify({"error": "Verse index not initialized"}), 503
+
+    with get_tracker(user_id).lock:
+        return jsonify(verse_progress.summary())
+
+
+@app.route("/api/verses", methods=["PUT"])
+@app.route("/api/users/<user_id>/verses", methods=["PUT"])
+def update_verses(user_id: Optional[str] = None):
+    """
+    Mark a verse range as read or unread.
+
+    Request body:
+        {"range": "Genesis 1:1-1:13", "is_complete": true/false}
+    """
+    verse_progress = get_verse_progress(user_id)
+    if verse_progress is None:
+        return jsonify({"error": "Verse index not initialized"}), 503
+
+    data = request.get_json(silent=True) or {}
+    is_complete = data.get("is_complete", True)
+    if not isinstance(is_complete, bool):
+        return jsonify({"error": "'is_complete' must be a boolean"}), 400
+    try:
+        verse_range = parse_verse_range(str(data.get("range", "")))
+        with get_tracker(user_id).lock:
+            verse_progress.mark_range(
+                verse_range["book"],
+                verse_range["start_chapter"],
+                verse_range["start_verse"],
+                verse_range["end_chapter"],
+                verse_range["end_verse"],
+                is_complete,
+            )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"success": True})
+
+
+@app.route("/api/cycles", methods=["GET"])
+def list_cycles():
+    """List the reading cycles with their portion counts."""
+    cycles = load_reading_cycles()
+    if cycles is None:
+        return jsonify({"error": "Verse index not initialized"}), 503
+
+    return jsonify(
+        [
+            {
+                "name": cycle.name,
+                "description": cycle.description,
+                "portions": len(cycle),
+            }
+            for cycle in cycles.values()
+        ]
+    )
+
+
+def get_cycle(name: str):
+    """
+    Get a reading cycle and its verse progress for a request.
+
+    Returns:
+        (cycle, verse_progress, None), or (None, None, error response)
+    """
+    cycles = load_reading_cycles()
+    verse_progress = get_verse_progress(request.view_args.get("user_id"))
+    if cycles is None or verse_progress is None:
+        return None, None, (jsonify({"error": "Verse index not initialized"}), 503)
+    if name not in cycles:
+        return None, None, (jsonify({"error": f"Unknown cycle: {name}"}), 404)
+    return cycles[name], verse_progress, None
+
+
+@app.route("/api/cycles/<name>", methods=["GET"])
+@app.route("/api/users/<user_id>/cycles/<name>", methods=["GET"])
+def get_cycle_progress(name: str, user_id: Optional[str] = None):
+    """Get per-portion progress through a reading cycle."""
+    cycle, verse_progress, error = get_cycle(name)
+    if error is not None:
+        return error
+
+    with get_tracker(user_id).lock:
+        return jsonify(cycle.summary(verse_progress))
+
+
+@app.route("/api/cycles/<name>/portions", methods=["PUT"])
+@app.route("/api/users/<user_id>/cycles/<name>/portions", methods=["PUT"])
+def update_cycle_portion(name: str, user_id: Optional[str] = None):
+    """
+    Mark a portion of a reading cycle as read or unread.
+
+    Its verses are marked in the shared verse progress, so every cycle
+    covering them sees the change.
+
+    Request body:
+        {"label": "Parashat Bereshit", "number": 1, "is_complete": true/false}
+    """
+    cycle, verse_progress, error = get_cycle(name)
+    if error is not None:
+        return error
+
+    data = request.get_json(silent=True) or {}
+    label = data.get("label")
+    number = data.get("number")
+    is_complete = data.get("is_complete", True)
+    if (
+        not isinstance(label, str)
+        or not isinstance(number, int)
+        or isinstance(number, bool)
+        or not isinstance(is_complete, bool)
+    ):
+        return jsonify({"error": "Invalid label, number or is_complete"}), 400
+
+    try:
+        portion = cycle.portion(label, number)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+    with get_tracker(user_id).lock:
+        verse_progress.mark(portion.book, portion.start, portion.end, is_complete)
+
+    return jsonify({"success": True})
+
+
+@app.route("/api/events", methods=["GET"])
+@app.route("/api/users/<user_id>/events", methods=["GET"])
+def stream_events(user_id: Optional[str] = None):
+    """
+    Stream progress changes as Server-Sent Events.
+
+    Each "progress" event carries {parsha, aliyah, is_complete,
+    date_completed, version}. Reconnecting clients send Last-Event-ID and
+    receive the events they missed; a "reset" event means too much was
+    missed and the client should reload /api/parshiot.
+
+    At most MAX_EVENT_STREAMS streams are open at once; beyond that the
+    request gets a 503 with Retry-After.
+
+    Query params:
+        timeout: Seconds before the stream ends (default and maximum 25)
+    """
+    tracker = get_tracker(user_id)
+    events = get_events(tracker)
+    seq = events.resume_point(request.headers.get("Last-Event-ID"))
+    try:
+        timeout = float(request.args.get("timeout", EVENTS_MAX_SECONDS))
+    except ValueError:
+        return jsonify({"error": "Invalid timeout"}), 400
+    if not _event_streams.acquire(blocking=False):
+        response = jsonify({"error": "Too many open event streams"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(EVENTS_RETRY_AFTER_SECONDS)
+        return response
+    deadline = time.monotonic() + min(max(timeout, 0.0), EVENTS_MAX_SECONDS)
+
+    def reset(seq: int) -> str:
+        data = json.dumps({"version": tracker.version})
+        return f"id: {events.event_id(seq)}\nevent: reset\ndata: {data}\n\n"
+
+    def generate():
+        nonlocal seq
+        yield "retry: 3000\n\n"
+        if seq is None:
+            seq = events.seq
+            yield reset(seq)
+
+        idle_since = time.monotonic()
+        while True:
+            batch = events.since(seq)
+            if batch is None:
+                seq = events.seq
+                yield reset(seq)
+                continue
+
+            for seq, event in batch:
+                data = json.dumps(event, ensure_ascii=False)
+                yield f"id: {events.event_id(seq)}\nevent: progress\ndata: {data}\n\n"
+            if batch:
+                idle_since = time.monotonic()
+
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            if now - idle_since >= EVENTS_KEEPALIVE_SECONDS:
+                idle_since = now
+                yield ": keep-alive\n\n"
+
+            # Publishes writes made by other worker processes, if any
+            tracker.load_progress()
+            events.wait(seq, min(EVENTS_POLL_SECONDS, deadline - now))
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    if user_id is not None:
+        # The stream outlives the request, so it keeps its own hold
+        users.acquire(user_id)
+
+    def close():
+        _event_streams.release()
+        if user_id is not None:
+            users.release(user_id)
+
+    response.call_on_close(close)
+    return response
+
+
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Get request, cache and storage metrics in the Prometheus text format.
+
+    Metrics are kept per server process.
+    """
+    return app.response_class(
+        REGISTRY.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.route("/api/health", methods=["GET"])
 def health_check():
     """Health check endpoint."""
     return jsonify(
         {
             "status": "healthy",
-            "data_initialized": TORAH_DATA_FILE.exists(),
+            "data_initialized": CATALOG_FILE.exists() or TORAH_DATA_FILE.exists(),
         }
     )
 
@@ -0,0 +1,127 @@
+"""
+Response compression with Accept-Encoding negotiation.
+
+Brotli is used when the optional brotli package is installed, gzip
+otherwise. Responses identified by an ETag (the catalog and stats
+endpoints) are compressed once per encoding at a high level and cached
+until their ETag changes; other responses are compressed on the fly at a
+fast level, and only if they are large enough to benefit.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+# Smaller bodies are sent as they are
+MIN_COMPRESS_BYTES = 1024
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain", "text/html")
+
+# (cached, on the fly) levels; brotli 11 is too slow to redo on every change
+_LEVELS = {"br": (9, 4), "gzip": (9, 5)}
+
+
+def should_compress(response) -> bool:
+    """Whether a response is worth compressing on its way out."""
+    return (
+        response.status_code == 200
+        and not response.is_streamed
+        and response.content_encoding is None
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and (response.content_length or 0) >= MIN_COMPRESS_BYTES
+    )
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Encodings this server can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encodings) -> Optional[str]:
+    """
+    Pick the encoding for a response.
+
+    Args:
+        accept_encodings: Parsed Accept-Encoding header (request.accept_encodings)
+
+    Returns:
+        "br", "gzip", or None to send the body uncompressed
+    """
+    return accept_encodings.best_match(supported_encodings())
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """
+    Compress a body.
+
+    Args:
+        body: Uncompressed bytes
+        encoding: "br" or "gzip"
+        cached: Use the slower, denser level for bodies that are reused
+
+    Returns:
+        Compressed bytes
+    """
+    level = _LEVELS[encoding][0 if cached else 1]
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class CompressionCache:
+    """Compressed bodies by key and encoding, least recently used dropped."""
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Args:
+            max_entries: Number of compressed bodies kept
+        """
+        self.max_entries = max_entries
+        # (key, encoding) -> (mimetype, compressed body)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str, encoding: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Get a cached body.
+
+        Args:
+            key: Identifies the uncompressed body, e.g. path and ETag
+            encoding: "br" or "gzip"
+
+        Returns:
+            (mimetype, compressed body), or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get((key, encoding))
+            if entry is not None:
+                self._entries.move_to_end((key, encoding))
+            return entry
+
+    def store(self, key: str, encoding: str, mimetype: str, body: bytes) -> bytes:
+        """
+        Compress a body densely and cache it.
+
+        Args:
+            key: Identifies the uncompressed body
+            encoding: "br" or "gzip"
+            mimetype: Response mimetype, returned by later lookups
+            body: Uncompressed body
+
+        Returns:
+            Compressed body
+        """
+        # Compressed outside the lock; concurrent misses store the same bytes
+        compressed = compress(body, encoding, cached=True)
+        with self._lock:
+            self._entries[(key, encoding)] = (mimetype, compressed)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
@@ -0,0 +1,107 @@
+"""
+Sorted calendar of weekly Torah readings.
+
+Built offline from Hebcal responses by initialize_data.py for both the
+diaspora and the Israel schedule. Each schedule is a list of ISO dates in
+ascending order with the title read on that date and the individual
+parshiot it covers: two in weeks when a combined reading such as "Parashat
+Matot-Masei" is read. The readings on or after any date are found with one
+bisect.
+"""
+
+import json
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+SCHEDULES = ("diaspora", "israel")
+
+# (ISO date, title, individual parsha titles)
+Entry = Tuple[str, str, Tuple[str, ...]]
+
+
+class CalendarIndex:
+    """Weekly readings by date for the diaspora and Israel schedules."""
+
+    def __init__(self, schedules: Dict[str, Iterable[Entry]]):
+        """
+        Build the index.
+
+        Args:
+            schedules: Schedule name -> (date, title, parshiot) entries in any
+                       order (hebcal_fetcher.stream_calendar_entries); the first
+                       entry seen for a date is kept
+        """
+        self._dates: Dict[str, List[str]] = {}
+        self._entries: Dict[str, List[Entry]] = {}
+        for name, entries in schedules.items():
+            by_date: Dict[str, Entry] = {}
+            for entry in entries:
+                by_date.setdefault(entry[0], entry)
+            dates = sorted(by_date)
+            self._dates[name] = dates
+            self._entries[name] = [by_date[date] for date in dates]
+
+    def __len__(self) -> int:
+        return sum(len(dates) for dates in self._dates.values())
+
+    def upcoming(
+        self, date: str, count: int = 1, schedule: str = "diaspora"
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the readings on or after a date.
+
+        Args:
+            date: ISO date (YYYY-MM-DD)
+            count: Maximum number of readings
+            schedule: "diaspora" or "israel"
+
+        Returns:
+            Readings in date order, each with date, title, the individual
+            parshiot read and whether they are combined
+        """
+        if schedule not in self._dates:
+            raise ValueError(f"Unknown schedule: {schedule}")
+
+        start = bisect_left(self._dates[schedule], date)
+        return [
+            {
+                "date": day,
+                "title": title,
+                "parshiot": list(parshiot),
+                "combined": len(parshiot) > 1,
+            }
+            for day, title, parshiot in self._entries[schedule][start : start + count]
+        ]
+
+    @classmethod
+    def load(cls, path: Path) -> "CalendarIndex":
+        """Load an index saved with save()."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            {name: [_unpack(row) for row in rows] for name, rows in data.items()}
+        )
+
+    def save(self, path: Path) -> None:
+        """
+        Save each schedule as compact JSON rows.
+
+        A row is [date, title], followed by the individual parshiot when the
+        reading is combined.
+        """
+        data = {
+            name: [
+                [date, title] + (list(parshiot) if len(parshiot) > 1 else [])
+                for date, title, parshiot in entries
+            ]
+            for name, entries in self._entries.items()
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _unpack(row: Sequence[str]) -> Entry:
+    """Convert a saved row back to an entry."""
+    date, title, *parshiot = row
+    return date, title, tuple(parshiot) or (title,)
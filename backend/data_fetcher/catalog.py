@@ -0,0 +1,699 @@
+"""
+Immutable Torah reading catalog.
+
+The catalog is loaded once from torah_readings_complete.json into frozen,
+__slots__-based records indexed by parsha title and (title, aliyah) key.
+Progress is overlaid when building a response, never written into the
+catalog, so it can be shared safely between request threads.
+
+Each parsha's static JSON is serialized to bytes once, on first render,
+with gaps where the per-aliyah progress fields go. Rendering a response only
+encodes those small progress fields and joins the precomputed fragments.
+
+initialize_data.py also saves the catalog as a compact binary file (see
+Catalog.save_binary) of uint32 columns and an interned string table. It is
+memory-mapped, so worker processes share its pages, and records are only
+decoded from the columns when first used. The header records the size,
+modification time and digest of the JSON the file was built from, so a
+binary catalog left over from older data is detected.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import mmap
+import struct
+import sys
+from array import array
+from functools import cached_property
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# Binary catalog header: magic, format version, string/parsha/aliyah counts,
+# the byte length of the string blob, and the size, modification time (ns)
+# and SHA-256 of the source JSON
+CATALOG_MAGIC = b"TRCB"
+CATALOG_VERSION = 3
+_HEADER = struct.Struct("<4sHxxIIIIQQ32s")
+# Source fields of a catalog saved without a source file
+_NO_SOURCE = (0, 0, bytes(32))
+
+# uint32 columns of the parsha and aliyah tables, stored column by column.
+# String fields hold indexes into the string table.
+_PARSHA_COLUMNS = (
+    "name",
+    "title",
+    "date",
+    "torah_portion",
+    "book",
+    "book_order",
+    "start_chapter",
+    "aliyah_count",
+)
+_ALIYAH_COLUMNS = (
+    "number",
+    "verses",
+    "book",
+    "start_chapter",
+    "start_verse",
+    "end_chapter",
+    "end_verse",
+    "raw",
+    "verse_count",
+    "word_count",
+)
+# String index standing in for None
+_NULL = 0xFFFFFFFF
+
+
+class _Frozen:
+    """Base for records whose attributes can't change after construction."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _init(self, **fields) -> None:
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+
+# Progress fields for an aliyah that hasn't been completed
+_INCOMPLETE_JSON = b',"is_complete":false,"date_completed":null'
+
+
+def _dumps(value) -> str:
+    """Serialize compactly, matching the fragment encoding."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _progress_json(entry: Optional[Dict]) -> bytes:
+    """Encode the is_complete/date_completed fields for one aliyah."""
+    if not entry or not entry["is_complete"]:
+        return _INCOMPLETE_JSON
+    return b',"is_complete":true,"date_completed":' + _dumps(
+        entry["date_completed"]
+    ).encode("utf-8")
+
+
+def _splice(fragments: Tuple[bytes, ...], keys: Tuple, progress: Mapping) -> bytes:
+    """Interleave pre-serialized fragments with per-aliyah progress fields."""
+    parts = [fragments[0]]
+    for key, fragment in zip(keys, fragments[1:]):
+        parts.append(_progress_json(progress.get(key)))
+        parts.append(fragment)
+    return b"".join(parts)
+
+
+class Aliyah(_Frozen):
+    """A single aliyah and its verse/word counts."""
+
+    __slots__ = (
+        "parsha_title",
+        "number",
+        "verses",
+        "parsed",
+        "verse_count",
+        "word_count",
+    )
+
+    def __init__(
+        self,
+        parsha_title: str,
+        number: int,
+        verses: str,
+        parsed: Mapping,
+        verse_count: int,
+        word_count: int,
+    ):
+        self._init(
+            parsha_title=parsha_title,
+            number=number,
+            verses=verses,
+            parsed=MappingProxyType(dict(parsed)),
+            verse_count=verse_count,
+            word_count=word_count,
+        )
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        """Progress key for this aliyah."""
+        return (self.parsha_title, self.number)
+
+    def to_dict(self, entry: Optional[Dict] = None) -> Dict:
+        """
+        Build the JSON-ready aliyah dict with progress overlaid.
+
+        Args:
+            entry: Progress entry for this aliyah, or None if not started
+
+        Returns:
+            Aliyah dict including is_complete and date_completed
+        """
+        return {
+            "number": self.number,
+            "verses": self.verses,
+            "parsed": dict(self.parsed),
+            "verse_count": self.verse_count,
+            "word_count": self.word_count,
+            "is_complete": entry["is_complete"] if entry else False,
+            "date_completed": entry["date_completed"] if entry else None,
+        }
+
+
+class Parsha(_Frozen):
+    """A weekly Torah portion and its aliyot."""
+
+    __slots__ = (
+        "name",
+        "title",
+        "date",
+        "torah_portion",
+        "book",
+        "book_order",
+        "start_chapter",
+        "aliyot",
+        "_fragments",
+        "_keys",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        title: str,
+        date: Optional[str],
+        torah_portion: Optional[str],
+        book: str,
+        book_order: int,
+        start_chapter: int,
+        aliyot: Tuple[Aliyah, ...],
+    ):
+        self._init(
+            name=name,
+            title=title,
+            date=date,
+            torah_portion=torah_portion,
+            book=book,
+            book_order=book_order,
+            start_chapter=start_chapter,
+            aliyot=tuple(aliyot),
+            _fragments=None,
+            _keys=tuple(aliyah.key for aliyah in aliyot),
+        )
+
+    @property
+    def fragments(self) -> Tuple[bytes, ...]:
+        """Pre-serialized JSON around the progress fields, built on first use."""
+        if self._fragments is None:
+            # Racing threads build identical fragments; either may win
+            self._init(_fragments=self._build_fragments())
+        return self._fragments
+
+    def _build_fragments(self) -> Tuple[bytes, ...]:
+        """
+        Pre-serialize the static JSON around each aliyah's progress fields.
+
+        Returns:
+            len(aliyot) + 1 byte strings; progress for aliyah i goes between
+            fragment i and fragment i + 1
+        """
+        static = self.to_data()
+        aliyot = static.pop("aliyot")
+        head = _dumps(static)[:-1] + ',"aliyot":['
+
+        fragments = []
+        for i, fields in enumerate(aliyot):
+            head += ("," if i else "") + _dumps(fields)[:-1]
+            fragments.append(head.encode("utf-8"))
+            head = "}"
+
+        fragments.append((head + "]}").encode("utf-8"))
+        return tuple(fragments)
+
+    def render(self, progress: Mapping) -> bytes:
+        """
+        Render this parsha as JSON bytes with progress overlaid.
+
+        Args:
+            progress: Dict mapping (parsha_name, aliyah_number) to progress data
+
+        Returns:
+            UTF-8 JSON equivalent to ``to_dict(progress)``
+        """
+        return _splice(self.fragments, self._keys, progress)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Parsha":
+        """Build a Parsha from a torah_readings_complete.json entry."""
+        aliyot = tuple(
+            Aliyah(
+                parsha_title=data["title"],
+                number=aliyah["number"],
+                verses=aliyah["verses"],
+                parsed=aliyah["parsed"],
+                verse_count=aliyah["verse_count"],
+                word_count=aliyah.get("word_count", 0),
+            )
+            for aliyah in data["aliyot"]
+        )
+        return cls(
+            name=data["name"],
+            title=data["title"],
+            date=data.get("date"),
+            torah_portion=data.get("torah_portion"),
+            book=data["book"],
+            book_order=data["book_order"],
+            start_chapter=data["start_chapter"],
+            aliyot=aliyot,
+        )
+
+    def to_data(self) -> Dict:
+        """Build the torah_readings_complete.json entry, without progress."""
+        data = self.to_dict({})
+        for aliyah in data["aliyot"]:
+            del aliyah["is_complete"], aliyah["date_completed"]
+        return data
+
+    def to_dict(self, progress: Mapping) -> Dict:
+        """
+        Build the JSON-ready parsha dict with progress overlaid.
+
+        Args:
+            progress: Dict mapping (parsha_name, aliyah_number) to progress data
+
+        Returns:
+            Parsha dict in the torah_readings_complete.json shape
+        """
+        return {
+            "name": self.name,
+            "title": self.title,
+            "date": self.date,
+            "torah_portion": self.torah_portion,
+            "book": self.book,
+            "book_order": self.book_order,
+            "start_chapter": self.start_chapter,
+            "aliyot": [
+                aliyah.to_dict(progress.get(aliyah.key)) for aliyah in self.aliyot
+            ],
+        }
+
+
+class Catalog:
+    """All parshiot in canonical order, with lookup indexes."""
+
+    def __init__(self, parshiot: Sequence[Parsha]):
+        """
+        Index a sequence of parshiot.
+
+        The records and indexes are built on first use, so a lazily decoded
+        sequence (see from_binary) is only read when needed.
+
+        Args:
+            parshiot: Parsha records in canonical order
+        """
+        self._records = parshiot
+        self._fragments: Optional[Tuple[bytes, ...]] = None
+
+    @cached_property
+    def parshiot(self) -> Tuple[Parsha, ...]:
+        """Parsha records in canonical order."""
+        return tuple(self._records)
+
+    @cached_property
+    def by_title(self) -> Dict[str, Parsha]:
+        """Parsha by title."""
+        return {p.title: p for p in self.parshiot}
+
+    @cached_property
+    def by_key(self) -> Dict[Tuple[str, int], Aliyah]:
+        """Aliyah by (parsha title, aliyah number)."""
+        return {aliyah.key: aliyah for p in self.parshiot for aliyah in p.aliyot}
+
+    @cached_property
+    def by_book(self) -> Dict[str, Tuple[Parsha, ...]]:
+        """Parshiot of each book, in order."""
+        by_book: Dict[str, Tuple[Parsha, ...]] = {}
+        for parsha in self.parshiot:
+            by_book[parsha.book] = by_book.get(parsha.book, ()) + (parsha,)
+        return by_book
+
+    @cached_property
+    def _keys(self) -> Tuple[Tuple[str, int], ...]:
+        return tuple(key for parsha in self.parshiot for key in parsha._keys)
+
+    def _build_fragments(self) -> Tuple[bytes, ...]:
+        """Flatten every parsha's fragments into one array-level sequence."""
+        fragments = [b"["]
+        for i, parsha in enumerate(self.parshiot):
+            separator = b"," if i else b""
+            fragments[-1] += separator + parsha.fragments[0]
+            fragments.extend(parsha.fragments[1:])
+        fragments[-1] += b"]"
+        return tuple(fragments)
+
+    @classmethod
+    def from_json(cls, path: Path) -> "Catalog":
+        """
+        Load the catalog from a torah_readings_complete.json file.
+
+        Args:
+            path: Path to the JSON file
+
+        Returns:
+            Catalog (empty if the file doesn't exist)
+        """
+        if not Path(path).exists():
+            return cls([])
+
+        with open(path, "r", encoding="utf-8") as f:
+            return cls([Parsha.from_dict(p) for p in json.load(f)])
+
+    def save_json(self, path: Path) -> None:
+        """Export the catalog as pretty-printed torah_readings_complete.json."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                [p.to_data() for p in self.parshiot], f, ensure_ascii=False, indent=2
+            )
+
+    @classmethod
+    def from_binary(cls, path: Path, source: Optional[Path] = None) -> "Catalog":
+        """
+        Memory-map a catalog written by save_binary.
+
+        Only the header is read here; records are decoded on first use.
+
+        Args:
+            path: Path to the binary catalog
+            source: JSON the catalog should have been built from; if both
+                exist, it must still have the size and modification time
+                recorded in the header, or failing that the same digest
+
+        Returns:
+            Catalog (empty if the file doesn't exist)
+
+        Raises:
+            ValueError: If the file isn't a binary catalog of this version,
+                or was built from a different source
+        """
+        if not Path(path).exists():
+            return cls([])
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"{path} is not a version {CATALOG_VERSION} catalog")
+            # The mapping stays valid after the file is closed
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, *counts, size, mtime_ns, digest = _HEADER.unpack_from(buffer)
+        if magic != CATALOG_MAGIC or version != CATALOG_VERSION:
+            raise ValueError(f"{path} is not a version {CATALOG_VERSION} catalog")
+        if (
+            source is not None
+            and (size, mtime_ns, digest) != _NO_SOURCE
+            and Path(source).exists()
+            and not _same_source(source, size, mtime_ns, digest)
+        ):
+            raise ValueError(f"{path} was built from a different {source}")
+
+        return cls(_CatalogFile(buffer, *counts))
+
+    def save_binary(self, path: Path, source: Optional[Path] = None) -> None:
+        """
+        Atomically save the catalog in the compact binary format.
+
+        Layout: header, string offsets, parsha columns, aliyah columns (all
+        little-endian uint32), then the UTF-8 string blob. Every distinct
+        string is stored once.
+
+        Args:
+            path: Destination path
+            source: JSON the catalog was built from, whose size,
+                modification time and digest are stored so from_binary can
+                detect a stale file
+        """
+        strings: Dict[str, int] = {}
+
+        def intern(value: Optional[str]) -> int:
+            if value is None:
+                return _NULL
+            return strings.setdefault(value, len(strings))
+
+        parsha_rows = []
+        aliyah_rows = []
+        for parsha in self.parshiot:
+            parsha_rows.append(
+                (
+                    intern(parsha.name),
+                    intern(parsha.title),
+                    intern(parsha.date),
+                    intern(parsha.torah_portion),
+                    intern(parsha.book),
+                    parsha.book_order,
+                    parsha.start_chapter,
+                    len(parsha.aliyot),
+                )
+            )
+            for aliyah in parsha.aliyot:
+                parsed = aliyah.parsed
+                aliyah_rows.append(
+                    (
+                        aliyah.number,
+                        intern(aliyah.verses),
+                        intern(parsed["book"]),
+                        parsed["start_chapter"],
+                        parsed["start_verse"],
+                        parsed["end_chapter"],
+                        parsed["end_verse"],
+                        intern(parsed.get("raw", aliyah.verses)),
+                        aliyah.verse_count,
+                        aliyah.word_count,
+                    )
+                )
+
+        encoded = [value.encode("utf-8") for value in strings]
+        strings_blob = b"".join(encoded)
+
+        # Columns are stored column by column: all values of the first
+        # field, then all values of the second, and so on
+        sections = [
+            _offsets(encoded),
+            array("I", (v for column in zip(*parsha_rows) for v in column)),
+            array("I", (v for column in zip(*aliyah_rows) for v in column)),
+        ]
+        if sys.byteorder == "big":
+            for section in sections:
+                section.byteswap()
+
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    CATALOG_MAGIC,
+                    CATALOG_VERSION,
+                    len(strings),
+                    len(parsha_rows),
+                    len(aliyah_rows),
+                    len(strings_blob),
+                    *(_NO_SOURCE if source is None else _source_fields(source)),
+                )
+            )
+            for section in sections:
+                f.write(section.tobytes())
+            f.write(strings_blob)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+
+    def __iter__(self) -> Iterator[Parsha]:
+        return iter(self.parshiot)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def aliyot(self) -> Iterator[Aliyah]:
+        """Iterate over every aliyah in canonical order."""
+        for parsha in self.parshiot:
+            yield from parsha.aliyot
+
+    def render(self, progress: Mapping) -> bytes:
+        """
+        Render all parshiot as a JSON array with progress overlaid.
+
+        Args:
+            progress: Dict mapping (parsha_name, aliyah_number) to progress data
+
+        Returns:
+            UTF-8 JSON bytes
+        """
+        if self._fragments is None:
+            self._fragments = self._build_fragments()
+        return _splice(self._fragments, self._keys, progress)
+
+
+class _CatalogFile(Sequence):
+    """Parsha records of a mapped binary catalog, each decoded on first access."""
+
+    def __init__(
+        self,
+        buffer: mmap.mmap,
+        n_strings: int,
+        n_parshiot: int,
+        n_aliyot: int,
+        strings_len: int,
+    ):
+        view = memoryview(buffer)
+        offset = _HEADER.size
+        sizes = (
+            n_strings + 1,
+            len(_PARSHA_COLUMNS) * n_parshiot,
+            len(_ALIYAH_COLUMNS) * n_aliyot,
+        )
+        tables = []
+        for size in sizes:
+            tables.append(_uint32s(view[offset : offset + 4 * size]))
+            offset += 4 * size
+        if offset + strings_len > len(view):
+            raise ValueError("Binary catalog is truncated")
+        self._string_offsets, self._parsha_table, self._aliyah_table = tables
+        self._strings_blob = view[offset : offset + strings_len]
+        self._n_parshiot = n_parshiot
+        self._n_aliyot = n_aliyot
+        self._strings: List[Optional[str]] = [None] * n_strings
+        self._records: List[Optional[Parsha]] = [None] * n_parshiot
+
+        # Index of each parsha's first aliyah, from the aliyah_count column
+        counts = _PARSHA_COLUMNS.index("aliyah_count") * n_parshiot
+        self._first_aliyah = [0]
+        for count in self._parsha_table[counts : counts + n_parshiot]:
+            self._first_aliyah.append(self._first_aliyah[-1] + count)
+
+    def __len__(self) -> int:
+        return self._n_parshiot
+
+    def __getitem__(self, index: int) -> Parsha:
+        index = range(self._n_parshiot)[index]
+        record = self._records[index]
+        if record is None:
+            # Racing threads decode identical records; either may win
+            record = self._records[index] = self._decode(index)
+        return record
+
+    def _text(self, index: int) -> Optional[str]:
+        """Decode an interned string, or None for the null index."""
+        if index == _NULL:
+            return None
+        text = self._strings[index]
+        if text is None:
+            start, end = self._string_offsets[index : index + 2]
+            text = self._strings[index] = str(self._strings_blob[start:end], "utf-8")
+        return text
+
+    def _decode(self, p: int) -> Parsha:
+        """Build parsha p and its aliyot from the columns."""
+        row = dict(zip(_PARSHA_COLUMNS, self._parsha_table[p :: self._n_parshiot]))
+        title = self._text(row["title"])
+
+        aliyot = []
+        for a in range(self._first_aliyah[p], self._first_aliyah[p + 1]):
+            cols = dict(zip(_ALIYAH_COLUMNS, self._aliyah_table[a :: self._n_aliyot]))
+            aliyot.append(
+                Aliyah(
+                    parsha_title=title,
+                    number=cols["number"],
+                    verses=self._text(cols["verses"]),
+                    parsed={
+                        "book": self._text(cols["book"]),
+                        "start_chapter": cols["start_chapter"],
+                        "start_verse": cols["start_verse"],
+                        "end_chapter": cols["end_chapter"],
+                        "end_verse": cols["end_verse"],
+                        "raw": self._text(cols["raw"]),
+                    },
+                    verse_count=cols["verse_count"],
+                    word_count=cols["word_count"],
+                )
+            )
+
+        return Parsha(
+            name=self._text(row["name"]),
+            title=title,
+            date=self._text(row["date"]),
+            torah_portion=self._text(row["torah_portion"]),
+            book=self._text(row["book"]),
+            book_order=row["book_order"],
+            start_chapter=row["start_chapter"],
+            aliyot=tuple(aliyot),
+        )
+
+
+def source_digest(path: Path) -> bytes:
+    """SHA-256 of a source JSON file, as stored in binary catalog headers."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def _source_fields(path: Path) -> Tuple[int, int, bytes]:
+    """Size, modification time (ns) and digest of a source JSON file."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, source_digest(path)
+
+
+def _same_source(path: Path, size: int, mtime_ns: int, digest: bytes) -> bool:
+    """
+    Whether a source file still matches the fields in a catalog header.
+
+    An unchanged size and modification time is taken as a match. The digest
+    is only computed when they differ, e.g. after a fresh checkout.
+    """
+    stat = os.stat(path)
+    if stat.st_size != size:
+        return False
+    return stat.st_mtime_ns == mtime_ns or source_digest(path) == digest
+
+
+def _offsets(items: Sequence[bytes]) -> array:
+    """Start offset of each item in their concatenation, plus the total."""
+    offsets = array("I", [0])
+    for item in items:
+        offsets.append(offsets[-1] + len(item))
+    return offsets
+
+
+def _uint32s(view: memoryview) -> Sequence[int]:
+    """Read little-endian uint32s, without copying on little-endian hosts."""
+    if sys.byteorder == "little":
+        return view.cast("I")
+    values = array("I")
+    values.frombytes(view)
+    values.byteswap()
+    return values
+
+
+def main() -> None:
+    """Convert the catalog between torah_readings_complete.json and binary."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("command", choices=["build", "export"])
+    parser.add_argument("json_path", help="torah_readings_complete.json")
+    parser.add_argument("binary_path", help="Binary catalog file")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        catalog = Catalog.from_json(args.json_path)
+        catalog.save_binary(args.binary_path, source=args.json_path)
+        print(f"Saved {len(catalog)} parshiot to {args.binary_path}")
+    else:
+        catalog = Catalog.from_binary(args.binary_path)
+        catalog.save_json(args.json_path)
+        print(f"Exported {len(catalog)} parshiot to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,11 @@ Fetch Torah reading aliyah structure from Hebcal API.
 Enhanced version that fetches all 54 individual parshiot and organizes by book.
 """
 
+import codecs
 import json
 import re
-from typing import Any, Dict, List
+from contextlib import closing
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 import requests
 
@@ -74,7 +76,8 @@ ALL_54_PARSHIOT = [
     "Parashat V'Zot HaBerachah",
 ]
 
-# Parshiot that are sometimes combined (to exclude from results)
+# Parshiot that are sometimes combined (excluded from the catalog, but kept
+# in the calendar index)
 COMBINED_PARSHIOT = [
     "Parashat Vayakhel-Pekudei",
     "Parashat Tazria-Metzora",
@@ -86,6 +89,34 @@ COMBINED_PARSHIOT = [
 ]
 
 
+# Read on Simchat Torah, so never a weekly reading in the calendar
+CALENDAR_PARSHIOT = [
+    title for title in ALL_54_PARSHIOT if title != "Parashat V'Zot HaBerachah"
+]
+
+HEBCAL_URL = "https://www.hebcal.com/hebcal"
+# Years covered per request; Hebcal limits the size of one response
+SPAN_YEARS = 4
+CHUNK_SIZE = 1 << 16
+
+
+def split_combined(title: str) -> Tuple[str, ...]:
+    """
+    Get the individual parshiot read under a calendar title.
+
+    Args:
+        title: Parsha title, e.g. 'Parashat Matot-Masei' or 'Parashat Noach'
+
+    Returns:
+        Tuple of individual titles, e.g. ('Parashat Matot', 'Parashat Masei')
+    """
+    if title not in COMBINED_PARSHIOT:
+        return (title,)
+    # Split on the hyphen between parts; titles like Lech-Lecha aren't combined
+    first, second = title[len("Parashat ") :].split("-")
+    return (f"Parashat {first}", f"Parashat {second}")
+
+
 def parse_verse_range(verse_range: str) -> Dict[str, Any]:
     """
     Parse a verse range string like 'Exodus 1:1-1:17' into structured data.
@@ -125,25 +156,200 @@ def parse_verse_range(verse_range: str) -> Dict[str, Any]:
     }
 
 
-def fetch_torah_readings_multi_year(years: List[int]) -> List[Dict[str, Any]]:
+def year_spans(years: List[int], span: int = SPAN_YEARS) -> List[Tuple[int, int]]:
+    """
+    Group years into runs of consecutive years, at most span years each.
+
+    Args:
+        years: Gregorian years in the order they should be fetched
+        span: Maximum years per run
+
+    Returns:
+        (first, last) year pairs, inclusive
+    """
+    spans: List[Tuple[int, int]] = []
+    for year in years:
+        if spans and year == spans[-1][1] + 1 and year - spans[-1][0] < span:
+            spans[-1] = (spans[-1][0], year)
+        else:
+            spans.append((year, year))
+    return spans
+
+
+def hebcal_params(first: int, last: int, israel: bool = False) -> Dict[str, Any]:
+    """
+    Query for the weekly readings from the start of one year to the end of another.
+
+    Everything except the Torah readings is switched off, so the response
+    carries little besides parashat items.
+    """
+    params = {
+        "v": 1,
+        "cfg": "json",
+        "start": f"{first}-01-01",
+        "end": f"{last}-12-31",
+        "s": "on",
+        "maj": "off",
+        "min": "off",
+        "mod": "off",
+        "nx": "off",
+        "mf": "off",
+        "ss": "off",
+    }
+    if israel:
+        params["i"] = "on"
+    return params
+
+
+def iter_json_items(chunks: Iterable[bytes], key: str = "items") -> Iterator[Any]:
+    """
+    Incrementally decode the elements of a top-level JSON array.
+
+    Only the elements seen so far and one partial element are held in
+    memory, so a large response is parsed as it arrives. Elements may be any
+    JSON value; each is yielded once the "," or "]" after it has arrived.
+
+    Args:
+        chunks: Raw UTF-8 response body, in pieces of any size
+        key: Name of the top-level array
+
+    Yields:
+        Decoded array elements, in order
+
+    Raises:
+        ValueError: If the body ends before the array does, or the array
+            is malformed
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    start_re = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    buffer = ""
+    pos = 0
+    in_array = False
+
+    for chunk in chunks:
+        buffer = buffer[pos:] + text.decode(chunk)
+        pos = 0
+        if not in_array:
+            match = start_re.search(buffer)
+            if match is None:
+                continue
+            pos = match.end()
+            in_array = True
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Partial element; wait for the next chunk
+                break
+            # A number cut off by a chunk boundary still decodes, as a shorter
+            # one, so an element only counts once the delimiter after it is in
+            while end < len(buffer) and buffer[end] in " \t\r\n":
+                end += 1
+            if end == len(buffer):
+                break
+            if buffer[end] not in ",]":
+                raise ValueError(f"Malformed {key!r} array")
+            pos = end
+            yield item
+
+    if in_array:
+        raise ValueError(f"Response ended inside the {key!r} array")
+
+
+def iter_hebcal_items(
+    years: List[int], session=None, israel: bool = False, span: int = SPAN_YEARS
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the parashat items for a range of years, in date order.
+
+    One request is made per span of consecutive years, and only when the
+    caller gets that far: closing the iterator stops reading the current
+    response and skips the remaining requests.
+
+    Args:
+        years: Gregorian years, in the order to fetch them
+        session: Optional client with an iter_bytes(url, params) method (such
+                 as http_cache.CachedSession); plain requests is used otherwise
+        israel: Use the Israel reading schedule instead of the diaspora one
+        span: Maximum years per request
+
+    Yields:
+        Hebcal items whose category is "parashat"
+    """
+    for first, last in year_spans(years, span):
+        params = hebcal_params(first, last, israel)
+        if session is not None:
+            chunks = session.iter_bytes(HEBCAL_URL, params)
+        else:
+            chunks = _stream(HEBCAL_URL, params)
+
+        try:
+            for item in iter_json_items(chunks):
+                if item.get("category") == "parashat":
+                    yield item
+        finally:
+            chunks.close()
+
+
+def _stream(url: str, params: Dict[str, Any]) -> Iterator[bytes]:
+    """GET a URL with plain requests and yield the body as it arrives."""
+    with requests.get(url, params=params, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        yield from response.iter_content(CHUNK_SIZE)
+
+
+def stream_calendar_entries(
+    years: List[int], session=None, israel: bool = False
+) -> List[Tuple[str, str, Tuple[str, ...]]]:
+    """
+    Fetch every weekly reading for a range of years (see iter_hebcal_items),
+    combined ones included.
+
+    Returns:
+        (ISO date, title, individual parsha titles) tuples
+    """
+    return _entries(iter_hebcal_items(years, session, israel))
+
+
+def _entries(items: Iterable[Dict[str, Any]]) -> List[Tuple[str, str, Tuple[str, ...]]]:
+    """Calendar entries for the dated parashat items."""
+    return [
+        (item["date"][:10], item["title"], split_combined(item["title"]))
+        for item in items
+        if item.get("category") == "parashat" and item.get("date")
+    ]
+
+
+def fetch_torah_readings_multi_year(
+    years: List[int], session=None
+) -> List[Dict[str, Any]]:
     """
     Fetch Torah readings across multiple years to get all 54 parshiot.
 
+    Years are streamed in the given order, so the first occurrence of each
+    parsha wins, and fetching stops once every parsha that appears in the
+    calendar has been found.
+
     Args:
         years: List of Gregorian years to fetch
+        session: Optional client with an iter_bytes(url, params) method
 
     Returns:
         List of unique parsha dictionaries
     """
     all_readings = {}
 
-    for year in years:
-        url = f"https://www.hebcal.com/hebcal?v=1&cfg=json&s=on&year={year}"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-
-        for item in data.get("items", []):
+    items = iter_hebcal_items(years, session)
+    with closing(items):
+        for item in items:
             if item.get("category") == "parashat" and "leyning" in item:
                 leyning = item["leyning"]
                 title = item.get("title")
@@ -198,6 +404,8 @@ def fetch_torah_readings_multi_year(years: List[int]) -> List[Dict[str, Any]]:
                     }
 
                     all_readings[title] = parsha
+                    if len(all_readings) == len(CALENDAR_PARSHIOT):
+                        break
 
     # Sort by the canonical order from ALL_54_PARSHIOT
     sorted_readings = []
@@ -0,0 +1,180 @@
+"""
+Rate-limited HTTP client with an on-disk response cache.
+
+Used by the data initialization pipeline so that reruns only fetch what is
+missing, concurrent workers share one connection pool, and a recorded cache
+directory can replay a full build offline.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class OfflineCacheMiss(RuntimeError):
+    """Raised in offline mode when a response isn't in the cache."""
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least 1/rate seconds apart."""
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: Maximum calls per second (0 or less disables limiting)
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the next call is allowed."""
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+
+        if start > now:
+            time.sleep(start - now)
+
+
+class CachedSession:
+    """GET client backed by a requests.Session and a disk cache."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        offline: bool = False,
+        rate: float = 10.0,
+        pool_size: int = 8,
+        session: Optional[requests.Session] = None,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            cache_dir: Directory holding cached responses
+            offline: Serve only from the cache, never the network
+            rate: Maximum network requests per second across all threads
+            pool_size: Connections kept open per host
+            session: Session to use for network requests
+        """
+        self.cache_dir = Path(cache_dir)
+        self.offline = offline
+        self.limiter = RateLimiter(rate)
+        self.hits = 0
+        self.misses = 0
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def _cache_path(self, url: str, params: Optional[Dict]) -> Path:
+        """Get the cache file for a request."""
+        key = json.dumps([url, params or {}], sort_keys=True)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def get_json(self, url: str, params: Optional[Dict] = None) -> Any:
+        """
+        GET a URL and decode the JSON body, using the cache when possible.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+
+        Returns:
+            Decoded JSON response
+        """
+        path = self._cache_path(url, params)
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                self.hits += 1
+                return json.load(f)["body"]
+
+        if self.offline:
+            raise OfflineCacheMiss(f"Not cached: {url} {params or ''}")
+
+        self.limiter.wait()
+        response = self.session.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        body = response.json()
+        self.misses += 1
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "params": params, "body": body}, f)
+        os.replace(tmp_path, path)
+
+        return body
+
+    def iter_bytes(
+        self, url: str, params: Optional[Dict] = None, chunk_size: int = 1 << 16
+    ) -> Iterator[bytes]:
+        """
+        GET a URL and yield the raw body as it arrives, using the cache when possible.
+
+        The body is cached once complete. If the caller closes the iterator
+        early, the response is closed without reading the rest, and the part
+        read so far is kept as a partial body: offline sessions replay it, so
+        a rerun stopping at the same point works without the network, while
+        online sessions fetch the full body again.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            chunk_size: Bytes per chunk
+
+        Yields:
+            Chunks of the response body
+        """
+        path = self._cache_path(url, params).with_suffix(".body")
+        partial_path = path.with_suffix(".partial")
+        if self.offline and not path.exists() and partial_path.exists():
+            path = partial_path
+        if path.exists():
+            self.hits += 1
+            with open(path, "rb") as f:
+                yield from iter(lambda: f.read(chunk_size), b"")
+            return
+
+        if self.offline:
+            raise OfflineCacheMiss(f"Not cached: {url} {params or ''}")
+
+        self.limiter.wait()
+        self.misses += 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+
+        try:
+            with self.session.get(
+                url, params=params, timeout=30, stream=True
+            ) as response, open(tmp_path, "wb") as f:
+                response.raise_for_status()
+                try:
+                    for chunk in response.iter_content(chunk_size):
+                        f.write(chunk)
+                        yield chunk
+                except GeneratorExit:
+                    # Stopped early; leaving the block closes the response
+                    path = partial_path
+            os.replace(tmp_path, path)
+            if path != partial_path:
+                partial_path.unlink(missing_ok=True)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
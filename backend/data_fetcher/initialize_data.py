@@ -3,13 +3,22 @@ Initialize complete Torah reading data with all 54 parshiot.
 Handles special cases: Matot, Masei (usually combined), and V'Zot HaBerachah (Simchat Torah).
 """
 
+import argparse
 import json
 from pathlib import Path
 from typing import Dict
 
-from hebcal_fetcher import (ALL_54_PARSHIOT, fetch_torah_readings_multi_year,
-                            parse_verse_range)
-from sefaria_fetcher import count_words_and_verses_in_aliyah
+from calendar_index import CalendarIndex
+from catalog import Catalog, Parsha
+from hebcal_fetcher import (
+    ALL_54_PARSHIOT,
+    fetch_torah_readings_multi_year,
+    parse_verse_range,
+    stream_calendar_entries,
+)
+from http_cache import CachedSession
+from sefaria_fetcher import ChapterStore, count_hebrew_words_batch
+from verse_index import TORAH_CHAPTERS, VerseIndex
 
 
 def add_special_parshiot(readings_dict: Dict) -> Dict:
@@ -65,15 +74,61 @@ def add_special_parshiot(readings_dict: Dict) -> Dict:
     return readings_dict
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(__file__).parent.parent.parent / "data" / "http_cache",
+        help="Directory for cached Hebcal/Sefaria responses",
+    )
+    parser.add_argument(
+        "--chapter-dir",
+        type=Path,
+        default=Path(__file__).parent.parent.parent / "data" / "chapters",
+        help="Directory for the chapter-level Hebrew text store",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only use cached responses (e.g. recorded fixtures)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Concurrent HTTP requests"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=10.0, help="Maximum requests per second"
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
     """Fetch and save complete Torah reading data with all 54 parshiot."""
+    args = parse_args()
     data_dir = Path(__file__).parent.parent.parent / "data"
     data_dir.mkdir(exist_ok=True)
 
     output_file = data_dir / "torah_readings_complete.json"
+    session = CachedSession(
+        args.cache_dir, offline=args.offline, rate=args.rate, pool_size=args.workers
+    )
 
     print("Step 1: Fetching Torah reading structure from Hebcal...")
-    readings_list = fetch_torah_readings_multi_year(list(range(2014, 2031)))
+    years = list(range(2014, 2031))
+    # Streams multi-year spans and stops once every parsha has been seen
+    readings_list = fetch_torah_readings_multi_year(years, session)
+
+    # Every week's reading, combined parshiot included, for /api/schedule;
+    # the spans read above come from the cache
+    calendar = CalendarIndex(
+        {
+            "diaspora": stream_calendar_entries(years, session),
+            "israel": stream_calendar_entries(years, session, israel=True),
+        }
+    )
+    calendar.save(data_dir / "calendar_index.json")
+    print(f"Calendar index: {len(calendar)} weekly readings")
 
     # Convert to dict for easier manipulation
     readings_dict = {r["title"]: r for r in readings_list}
@@ -94,34 +149,45 @@ def main() -> None:
     print(f"\nTotal parshiot: {len(ordered_readings)}")
 
     print("\nStep 3: Enriching with word counts from Sefaria...")
-    print("This may take several minutes...")
-
-    for i, parsha in enumerate(ordered_readings):
-        print(f"\nProcessing {i+1}/{len(ordered_readings)}: {parsha['title']}")
-
-        # Skip V'Zot HaBerachah word counting for now if no aliyot
-        if len(parsha["aliyot"]) == 0:
-            print("  Skipping (no aliyot structure available)")
-            continue
-
-        for aliyah in parsha["aliyot"]:
-            print(f"  Aliyah {aliyah['number']}: {aliyah['verses']}")
-            try:
-                counts = count_words_and_verses_in_aliyah(aliyah["parsed"])
-                aliyah["word_count"] = counts["word_count"]
-                aliyah["verse_count"] = counts["verse_count"]
-                print(
-                    f"    -> {counts['word_count']} words, {counts['verse_count']} verses"
-                )
-            except Exception as e:
-                print(f"    -> Error: {e}")
-                aliyah["word_count"] = 0
-                aliyah["verse_count"] = 0
+
+    aliyot = [aliyah for parsha in ordered_readings for aliyah in parsha["aliyot"]]
+
+    # Each chapter is fetched once into the store, tokenized into a per-verse
+    # index, and every aliyah is then counted with prefix sums
+    store = ChapterStore(args.chapter_dir, session=session)
+    store.prefetch(
+        ((book, ch) for book, n in TORAH_CHAPTERS.items() for ch in range(1, n + 1)),
+        max_workers=args.workers,
+    )
+    print(f"Chapter store: {store.fetches} chapters fetched")
+
+    verse_index = VerseIndex.from_chapter_store(store, count_hebrew_words_batch)
+    verse_index.save(data_dir / "verse_index.json")
+
+    for aliyah in aliyot:
+        try:
+            counts = verse_index.count_range(aliyah["parsed"])
+        except ValueError as e:
+            print(f"  Error counting {aliyah['verses']}: {e}")
+            counts = {"word_count": 0, "verse_count": 0}
+        aliyah["word_count"] = counts["word_count"]
+        aliyah["verse_count"] = counts["verse_count"]
+        print(
+            f"  {aliyah['verses']}: "
+            f"{counts['word_count']} words, {counts['verse_count']} verses"
+        )
+
+    print(f"\nHTTP cache: {session.hits} hits, {session.misses} fetched")
 
     print(f"\nStep 4: Saving to {output_file}")
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(ordered_readings, f, ensure_ascii=False, indent=2)
 
+    # The API loads the compact binary catalog; the JSON is kept as an export
+    catalog = Catalog([Parsha.from_dict(p) for p in ordered_readings])
+    catalog.save_binary(data_dir / "catalog.bin", source=output_file)
+    print(f"Saved binary catalog to {data_dir / 'catalog.bin'}")
+
     print("\nDone! Data initialization complete.")
 
     # Print summary
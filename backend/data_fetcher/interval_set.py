@@ -0,0 +1,111 @@
+"""
+Sorted set of disjoint half-open integer intervals.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Tuple
+
+
+class IntervalSet:
+    """
+    Set of integers stored as merged, sorted [start, end) intervals.
+
+    Insert and remove locate the affected intervals by binary search and
+    splice them in one step; adjacent and overlapping intervals are merged.
+    """
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def add(self, start: int, end: int) -> None:
+        """
+        Insert [start, end), merging with overlapping or touching intervals.
+
+        Args:
+            start: First value
+            end: One past the last value
+        """
+        if end <= start:
+            return
+
+        # Intervals ending at or after start, and starting at or before end,
+        # touch the new one and are merged into it
+        first = bisect_left(self._ends, start)
+        last = bisect_right(self._starts, end)
+        if first < last:
+            start = min(start, self._starts[first])
+            end = max(end, self._ends[last - 1])
+
+        self._starts[first:last] = [start]
+        self._ends[first:last] = [end]
+
+    def remove(self, start: int, end: int) -> None:
+        """
+        Remove [start, end), splitting intervals that straddle it.
+
+        Args:
+            start: First value
+            end: One past the last value
+        """
+        if end <= start:
+            return
+
+        first = bisect_right(self._ends, start)
+        last = bisect_left(self._starts, end)
+        if first >= last:
+            return
+
+        starts: List[int] = []
+        ends: List[int] = []
+        if self._starts[first] < start:
+            starts.append(self._starts[first])
+            ends.append(start)
+        if self._ends[last - 1] > end:
+            starts.append(end)
+            ends.append(self._ends[last - 1])
+
+        self._starts[first:last] = starts
+        self._ends[first:last] = ends
+
+    def overlapping(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """
+        Iterate over the parts of stored intervals inside [start, end).
+
+        Args:
+            start: First value
+            end: One past the last value
+
+        Yields:
+            Clipped (start, end) intervals
+        """
+        first = bisect_right(self._ends, start)
+        last = bisect_left(self._starts, end)
+        for i in range(first, last):
+            yield max(start, self._starts[i]), min(end, self._ends[i])
+
+    def covered(self, start: int, end: int) -> int:
+        """Count how many values in [start, end) are in the set."""
+        return sum(e - s for s, e in self.overlapping(start, end))
+
+    def contains(self, start: int, end: int) -> bool:
+        """Whether every value in [start, end) is in the set."""
+        if end <= start:
+            return True
+        i = bisect_right(self._starts, start) - 1
+        return i >= 0 and self._ends[i] >= end
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(zip(self._starts, self._ends))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def total(self) -> int:
+        """Number of values in the set."""
+        return sum(e - s for s, e in self)
@@ -0,0 +1,176 @@
+"""
+Reading history analytics.
+
+Completed aliyot are bucketed by the day (and ISO week) of their
+date_completed. The buckets are kept up to date by subscribing to
+ProgressTracker, so reading rates, streaks and the projected finish date
+are derived from at most one bucket per active day instead of rescanning
+progress on each request.
+"""
+
+import math
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from backend.data_fetcher.catalog import Catalog
+from backend.data_fetcher.progress_stats import METRICS
+
+# Summaries kept per (today, window); all are dropped when the limit is hit
+MAX_CACHED_SUMMARIES = 16
+
+
+class ProgressAnalytics:
+    """Completed aliyot, verses and words per day and per week."""
+
+    def __init__(self, catalog: Catalog, progress: Dict):
+        """
+        Bucket the completed aliyot in progress by completion date.
+
+        Args:
+            catalog: Torah reading catalog
+            progress: Dict mapping (parsha_name, aliyah_number) to progress data
+        """
+        # key -> (verse_count, word_count)
+        self._weights: Dict[Tuple[str, int], Tuple[int, int]] = {
+            aliyah.key: (aliyah.verse_count, aliyah.word_count)
+            for aliyah in catalog.aliyot()
+        }
+        self.total_words = sum(words for _, words in self._weights.values())
+        self.completed_words = 0
+
+        # ISO date -> [aliyot, verses, words]; days is kept sorted
+        self.by_day: Dict[str, List[int]] = {}
+        self.by_week: Dict[str, List[int]] = {}
+        self.days: List[str] = []
+        self._summaries: Dict[Tuple[date, int], Dict] = {}
+
+        for key, entry in progress.items():
+            if entry["is_complete"]:
+                self._adjust(key, entry, 1)
+
+    def apply(self, key: tuple, old: Optional[Dict], new: Dict) -> None:
+        """
+        Apply a single progress change (ProgressTracker listener).
+
+        Args:
+            key: (parsha_name, aliyah_number) tuple
+            old: Previous progress entry, or None
+            new: New progress entry
+        """
+        if old and old["is_complete"]:
+            self._adjust(key, old, -1)
+        if new["is_complete"]:
+            self._adjust(key, new, 1)
+
+    def _adjust(self, key: tuple, entry: Dict, sign: int) -> None:
+        """Add or remove one completed aliyah from its day and week buckets."""
+        weights = self._weights.get(key)
+        if weights is None:
+            return
+
+        verses, words = weights
+        self.completed_words += sign * words
+        self._summaries.clear()
+
+        day = (entry.get("date_completed") or "")[:10]
+        try:
+            week = _week_of(date.fromisoformat(day))
+        except ValueError:
+            # Completed without a usable date: counted, but not on the timeline
+            return
+
+        if day not in self.by_day:
+            self.by_day[day] = [0, 0, 0]
+            insort(self.days, day)
+        for buckets, bucket_key in ((self.by_day, day), (self.by_week, week)):
+            counts = buckets.setdefault(bucket_key, [0, 0, 0])
+            counts[0] += sign
+            counts[1] += sign * verses
+            counts[2] += sign * words
+
+        if self.by_day[day][0] == 0:
+            del self.by_day[day]
+            del self.days[bisect_left(self.days, day)]
+        if self.by_week[week][0] == 0:
+            del self.by_week[week]
+
+    def words_between(self, first: date, last: date) -> int:
+        """Words completed from first to last, inclusive."""
+        start = bisect_left(self.days, first.isoformat())
+        end = bisect_left(self.days, (last + timedelta(days=1)).isoformat())
+        return sum(self.by_day[day][2] for day in self.days[start:end])
+
+    def streaks(self, today: date) -> Tuple[int, int]:
+        """
+        Get the current and longest runs of consecutive reading days.
+
+        The current streak ends on today, or on yesterday if nothing has been
+        read yet today; days after today don't count towards it.
+
+        Returns:
+            (current, longest) in days
+        """
+        longest = run = current = 0
+        previous = None
+        for day in map(date.fromisoformat, self.days):
+            run = run + 1 if previous and day - previous == timedelta(days=1) else 1
+            longest = max(longest, run)
+            if 0 <= (today - day).days <= 1:
+                current = run
+            previous = day
+
+        return current, longest
+
+    def summary(self, today: date, window: int = 30) -> Dict:
+        """
+        Get the reading history with rate, streaks and projected finish.
+
+        Args:
+            today: Day the rolling window and projection end on
+            window: Rolling window for the reading rate, in days
+
+        Returns:
+            Dict with daily and weekly buckets, rate, streaks and projection
+        """
+        key = (today, window)
+        if key in self._summaries:
+            return self._summaries[key]
+
+        recent = self.words_between(today - timedelta(days=window - 1), today)
+        rate = recent / window
+        remaining = self.total_words - self.completed_words
+        current, longest = self.streaks(today)
+
+        projected = None
+        if remaining <= 0:
+            projected = self.days[-1] if self.days else today.isoformat()
+        elif rate > 0:
+            projected = (
+                today + timedelta(days=math.ceil(remaining / rate))
+            ).isoformat()
+
+        if len(self._summaries) >= MAX_CACHED_SUMMARIES:
+            self._summaries.clear()
+        summary = {
+            "daily": [
+                {"date": day, **dict(zip(METRICS, self.by_day[day]))}
+                for day in self.days
+            ],
+            "weekly": [
+                {"week": week, **dict(zip(METRICS, counts))}
+                for week, counts in sorted(self.by_week.items())
+            ],
+            "rate": {"window_days": window, "words_per_day": round(rate, 1)},
+            "streak": {"current": current, "longest": longest},
+            "remaining_words": remaining,
+            "projected_completion": projected,
+        }
+        self._summaries[key] = summary
+        return summary
+
+
+def _week_of(day: date) -> str:
+    """ISO week label, e.g. "2025-W52"."""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
@@ -0,0 +1,96 @@
+"""
+Live progress change feed.
+
+ProgressEvents subscribes to a ProgressTracker and keeps a bounded backlog of
+small delta events (parsha, aliyah, state, version), each with a sequence
+number. Readers such as the /api/events stream block until there is
+something newer than the last event they saw, and can resume after a
+reconnect as long as the events they missed are still in the backlog.
+"""
+
+import secrets
+import threading
+import weakref
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class ProgressEvents:
+    """Sequenced backlog of progress changes with blocking reads."""
+
+    def __init__(self, tracker, backlog: int = 256):
+        """
+        Args:
+            tracker: ProgressTracker whose changes are recorded (held weakly)
+            backlog: Number of recent events kept for resuming readers
+        """
+        self._tracker = weakref.ref(tracker)
+        # Identifies this feed in event ids, so ids from a previous process
+        # are recognized as unresumable
+        self.token = secrets.token_hex(4)
+        self.seq = 0
+        self._events: Deque[Tuple[int, Dict]] = deque(maxlen=backlog)
+        self._condition = threading.Condition()
+
+    def publish(self, key: tuple, old: Optional[Dict], new: Dict) -> None:
+        """Record a progress change and wake waiting readers (listener)."""
+        tracker = self._tracker()
+        event = {
+            "parsha": key[0],
+            "aliyah": key[1],
+            "is_complete": new["is_complete"],
+            "date_completed": new["date_completed"],
+            "version": tracker.version if tracker is not None else None,
+        }
+        with self._condition:
+            self.seq += 1
+            self._events.append((self.seq, event))
+            self._condition.notify_all()
+
+    def event_id(self, seq: int) -> str:
+        """Format a sequence number as an SSE event id."""
+        return f"{self.token}-{seq}"
+
+    def resume_point(self, event_id: Optional[str]) -> Optional[int]:
+        """
+        Get the sequence number to resume after from a client's last event id.
+
+        Args:
+            event_id: Last-Event-ID sent by the client, if any
+
+        Returns:
+            Sequence number, the current one if no id was given, or None if
+            the id belongs to another feed and the client must reload
+        """
+        if not event_id:
+            return self.seq
+        token, _, seq = event_id.rpartition("-")
+        if token != self.token or not seq.isdigit() or int(seq) > self.seq:
+            return None
+        return int(seq)
+
+    def since(self, seq: int) -> Optional[List[Tuple[int, Dict]]]:
+        """
+        Get the events after a sequence number.
+
+        Returns:
+            (seq, event) pairs in order, or None if some of them have already
+            dropped out of the backlog
+        """
+        with self._condition:
+            if seq >= self.seq:
+                return []
+            if not self._events or self._events[0][0] > seq + 1:
+                return None
+            return [item for item in self._events if item[0] > seq]
+
+    def wait(self, seq: int, timeout: float) -> Optional[List[Tuple[int, Dict]]]:
+        """
+        Block until there are events after seq, or the timeout passes.
+
+        Returns:
+            Same as since(); empty if the timeout passed with no events
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.seq > seq, timeout)
+        return self.since(seq)
@@ -0,0 +1,129 @@
+"""
+Per-user progress trackers with bounded memory.
+
+Each user's progress lives in its own store, sharded into subdirectories by
+a hash prefix of the user id so no single directory grows without bound.
+Trackers are created lazily on first access and kept in an LRU; once the
+limit is reached, the least recently used user nobody holds is closed and
+dropped. A held tracker stays loaded, so there is never more than one
+tracker writing a user's store.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+from backend.data_fetcher.progress_tracker import ProgressTracker
+
+# User ids are used in file names, so keep them to a safe alphabet. Dots are
+# excluded so an id can't name another store's suffix, e.g. "alice.verses"
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_valid_user_id(user_id: str) -> bool:
+    """Check whether a user id is safe to use as a storage key."""
+    return bool(USER_ID_PATTERN.match(user_id))
+
+
+def user_store_path(root: Path, user_id: str, suffix: str = ".csv") -> Path:
+    """
+    Get the sharded storage path for a user.
+
+    Args:
+        root: Directory holding all user shards
+        user_id: User identifier (see is_valid_user_id)
+        suffix: File extension for the storage backend
+
+    Returns:
+        Path like root/ab/<user_id><suffix>
+    """
+    shard = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:2]
+    return root / shard / f"{user_id}{suffix}"
+
+
+class TrackerRegistry:
+    """LRU of lazily loaded per-user ProgressTrackers."""
+
+    def __init__(
+        self,
+        factory: Callable[[str], ProgressTracker],
+        max_loaded: int = 256,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            factory: Creates the tracker for a user id
+            max_loaded: Number of trackers kept in memory; more stay loaded
+                while they are held
+        """
+        self.factory = factory
+        self.max_loaded = max(1, max_loaded)
+        self._trackers: "OrderedDict[str, ProgressTracker]" = OrderedDict()
+        self._holds: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, user_id: str) -> ProgressTracker:
+        """
+        Get a user's tracker, loading it if needed, and hold it loaded.
+
+        Every acquire() must be paired with a release().
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            The user's ProgressTracker
+        """
+        with self._lock:
+            tracker = self._trackers.get(user_id)
+            if tracker is None:
+                tracker = self.factory(user_id)
+                self._trackers[user_id] = tracker
+            else:
+                self._trackers.move_to_end(user_id)
+            self._holds[user_id] = self._holds.get(user_id, 0) + 1
+            self._evict_idle()
+        return tracker
+
+    def release(self, user_id: str) -> None:
+        """Drop a hold taken with acquire(), evicting idle trackers if needed."""
+        with self._lock:
+            holds = self._holds.pop(user_id) - 1
+            if holds:
+                self._holds[user_id] = holds
+            self._evict_idle()
+
+    def _evict_idle(self) -> None:
+        """Close least recently used trackers nobody holds, down to the limit."""
+        excess = len(self._trackers) - self.max_loaded
+        for user_id in list(self._trackers):
+            if excess <= 0:
+                break
+            if user_id in self._holds:
+                continue
+            # Closed under the registry lock so a reload can't open the store
+            # while it is being flushed. Nobody holds an idle tracker, so
+            # nobody holds its lock either.
+            self._trackers.pop(user_id).close()
+            excess -= 1
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._trackers
+
+    def __len__(self) -> int:
+        return len(self._trackers)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._trackers))
+
+    def close(self) -> None:
+        """Flush and close every loaded tracker."""
+        with self._lock:
+            for tracker in self._trackers.values():
+                tracker.close()
+            self._trackers.clear()
+            self._holds.clear()
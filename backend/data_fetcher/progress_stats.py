@@ -0,0 +1,119 @@
+"""
+Incrementally maintained reading statistics.
+
+Totals are computed once from the reading catalog. Completed counts are kept
+up to date by subscribing to ProgressTracker, so each toggle costs O(1) and
+reading the statistics never rescans the aliyot.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from backend.data_fetcher.catalog import Catalog
+
+# Index into the [aliyot, verses, words] count lists
+METRICS = ("aliyot", "verses", "words")
+
+
+class ProgressStats:
+    """Running totals of aliyot, verses and words, overall and per book/parsha."""
+
+    def __init__(self, catalog: Catalog, progress: Dict):
+        """
+        Build totals from the catalog and completed counts from progress.
+
+        Args:
+            catalog: Torah reading catalog
+            progress: Dict mapping (parsha_name, aliyah_number) to progress data
+        """
+        # key -> (book, parsha title, verse_count, word_count)
+        self._weights: Dict[Tuple[str, int], Tuple[str, str, int, int]] = {}
+        self.total = [0, 0, 0]
+        self.completed = [0, 0, 0]
+        self.by_book: Dict[str, Dict[str, List[int]]] = {}
+        self.by_parsha: Dict[str, Dict[str, List[int]]] = {}
+        self._summary: Optional[Dict] = None
+
+        for parsha in catalog:
+            book = self.by_book.setdefault(
+                parsha.book, {"total": [0, 0, 0], "completed": [0, 0, 0]}
+            )
+            section = self.by_parsha.setdefault(
+                parsha.title, {"total": [0, 0, 0], "completed": [0, 0, 0]}
+            )
+            for aliyah in parsha.aliyot:
+                verses = aliyah.verse_count
+                words = aliyah.word_count
+                self._weights[aliyah.key] = (parsha.book, parsha.title, verses, words)
+                for counts in (self.total, book["total"], section["total"]):
+                    _add(counts, 1, verses, words)
+
+        for key, entry in progress.items():
+            if entry["is_complete"]:
+                self._adjust(key, 1)
+
+    def apply(self, key: tuple, old: Optional[Dict], new: Dict) -> None:
+        """
+        Apply a single progress change (ProgressTracker listener).
+
+        Args:
+            key: (parsha_name, aliyah_number) tuple
+            old: Previous progress entry, or None
+            new: New progress entry
+        """
+        was_complete = bool(old and old["is_complete"])
+        if new["is_complete"] != was_complete:
+            self._adjust(key, 1 if new["is_complete"] else -1)
+
+    def _adjust(self, key: tuple, sign: int) -> None:
+        """Add or remove one aliyah's weights from the completed counts."""
+        weights = self._weights.get(key)
+        if weights is None:
+            return
+
+        book, title, verses, words = weights
+        for counts in (
+            self.completed,
+            self.by_book[book]["completed"],
+            self.by_parsha[title]["completed"],
+        ):
+            _add(counts, sign, sign * verses, sign * words)
+        self._summary = None
+
+    def summary(self) -> Dict:
+        """
+        Get statistics in the /api/stats response shape (cached between changes).
+
+        Returns:
+            Dict with total, completed, percentage and per-book/parsha breakdowns
+        """
+        if self._summary is None:
+            summary = _format(self.total, self.completed)
+            summary["by_book"] = {
+                book: _format(counts["total"], counts["completed"])
+                for book, counts in self.by_book.items()
+            }
+            summary["by_parsha"] = {
+                title: _format(counts["total"], counts["completed"])
+                for title, counts in self.by_parsha.items()
+            }
+            self._summary = summary
+        return self._summary
+
+
+def _add(counts: List[int], aliyot: int, verses: int, words: int) -> None:
+    """Add deltas to an [aliyot, verses, words] list in place."""
+    counts[0] += aliyot
+    counts[1] += verses
+    counts[2] += words
+
+
+def _format(total: List[int], completed: List[int]) -> Dict:
+    """Format count lists as total/completed/percentage dicts."""
+    return {
+        "total": dict(zip(METRICS, total)),
+        "completed": dict(zip(METRICS, completed)),
+        "percentage": {
+            name: round(done / whole * 100, 1) if whole > 0 else 0
+            for name, whole, done in zip(METRICS, total, completed)
+        },
+    }
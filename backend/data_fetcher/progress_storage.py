@@ -0,0 +1,512 @@
+"""
+Storage backends for reading progress.
+
+ProgressTracker keeps progress in memory and delegates persistence to a
+ProgressStorage. Two backends are provided:
+
+- CsvJournalStorage: CSV snapshot plus an append-only journal (single process)
+- SqliteStorage: SQLite database in WAL mode, safe for several worker
+  processes sharing one file (concurrent readers, serialized writers)
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+)
+
+CSV_HEADER = ["parsha_name", "aliyah_number", "is_complete", "date_completed"]
+
+# (key, entry) pairs passed to ProgressStorage.write
+Changes = Sequence[Tuple[Tuple[str, int], Dict]]
+
+
+class ProgressStorage:
+    """Interface for persisting progress entries."""
+
+    def load(self) -> Dict:
+        """
+        Read all stored progress.
+
+        Returns:
+            Dict mapping (parsha_name, aliyah_number) to progress data
+        """
+        raise NotImplementedError
+
+    def write(self, changes: Changes, progress: Dict) -> None:
+        """
+        Persist a batch of changed entries.
+
+        Args:
+            changes: (key, entry) pairs that changed, in order
+            progress: Full progress state after the changes
+        """
+        raise NotImplementedError
+
+    def has_external_changes(self) -> bool:
+        """Whether another process has written since the last load or write."""
+        return False
+
+    def transaction(self) -> ContextManager:
+        """
+        Make a load-check-write sequence atomic with respect to other processes.
+
+        Backends used by a single process need no cross-process locking.
+        """
+        return nullcontext()
+
+    def modified_at(self) -> datetime:
+        """Time of the last persisted change."""
+        return datetime.now(timezone.utc)
+
+    def sync(self) -> None:
+        """Force buffered writes to stable storage."""
+
+    def compact(self, progress: Dict) -> None:
+        """Rewrite storage in its most compact form."""
+
+    def close(self) -> None:
+        """Flush pending writes and release resources."""
+
+
+class CsvJournalStorage(ProgressStorage):
+    """
+    CSV snapshot plus an append-only journal.
+
+    Each change appends one event line to the journal, so a write costs O(1)
+    instead of rewriting every row. The journal is replayed over the snapshot
+    on load and periodically compacted back into the snapshot.
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        fsync_every: int = 8,
+        compact_every: int = 500,
+    ):
+        """
+        Initialize CSV storage.
+
+        Args:
+            csv_path: Path to the CSV snapshot file
+            fsync_every: Number of journal events between fsync calls
+            compact_every: Number of journal events that triggers compaction
+        """
+        self.csv_path = Path(csv_path)
+        self.journal_path = self.csv_path.with_suffix(".journal")
+        self.fsync_every = max(1, fsync_every)
+        self.compact_every = max(1, compact_every)
+        self._journal: Optional[TextIO] = None
+        self._journal_events = 0
+        self._unsynced_events = 0
+        self._ensure_csv_exists()
+
+    def _ensure_csv_exists(self):
+        """Create CSV file with headers if it doesn't exist."""
+        if not self.csv_path.exists():
+            self.csv_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(CSV_HEADER)
+
+    def load(self) -> Dict:
+        """Load the CSV snapshot and replay the journal over it."""
+        progress = read_csv(self.csv_path)
+        self._journal_events = self._replay_journal(progress)
+        return progress
+
+    def _replay_journal(self, progress: Dict) -> int:
+        """
+        Apply journal events on top of the loaded snapshot.
+
+        A torn final line (from a crash mid-append) is ignored, and
+        dropped before the next append (see _open_journal).
+
+        Args:
+            progress: Progress dict to update in place
+
+        Returns:
+            Number of events replayed
+        """
+        if not self.journal_path.exists():
+            return 0
+
+        events = 0
+        with open(self.journal_path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) != len(CSV_HEADER):
+                    continue
+                parsha_name, aliyah_number, is_complete, date_completed = row
+                try:
+                    key = (parsha_name, int(aliyah_number))
+                except ValueError:
+                    continue
+                progress[key] = _entry_from_row(is_complete, date_completed)
+                events += 1
+
+        return events
+
+    def write(self, changes: Changes, progress: Dict) -> None:
+        """
+        Append changes to the journal.
+
+        Lines are flushed to the OS once per batch; fsync is batched every
+        ``fsync_every`` events. Compaction runs once the journal grows past
+        ``compact_every`` events.
+        """
+        if self._journal is None:
+            self._journal = self._open_journal()
+
+        writer = csv.writer(self._journal)
+        for key, entry in changes:
+            writer.writerow(_row_for(key, entry))
+        self._journal.flush()
+        self._journal_events += len(changes)
+        self._unsynced_events += len(changes)
+
+        if self._unsynced_events >= self.fsync_every:
+            self.sync()
+
+        if self._journal_events >= self.compact_every:
+            self.compact(progress)
+
+    def _open_journal(self) -> TextIO:
+        """
+        Open the journal for appending.
+
+        A torn final line is truncated first; otherwise the next event would
+        be appended to it and both would be dropped on replay.
+        """
+        if self.journal_path.exists():
+            with open(self.journal_path, "rb+") as f:
+                end = f.seek(0, os.SEEK_END)
+                keep = end
+                while keep > 0:
+                    start = max(0, keep - 4096)
+                    f.seek(start)
+                    newline = f.read(keep - start).rfind(b"\n")
+                    if newline != -1 or start == 0:
+                        keep = start + newline + 1
+                        break
+                    keep = start
+                if keep != end:
+                    f.truncate(keep)
+
+        return open(self.journal_path, "a", newline="", encoding="utf-8")
+
+    def modified_at(self) -> datetime:
+        """Get the latest modification time of the snapshot and journal."""
+        mtimes = [
+            path.stat().st_mtime
+            for path in (self.csv_path, self.journal_path)
+            if path.exists()
+        ]
+        if not mtimes:
+            return datetime.now(timezone.utc)
+        return datetime.fromtimestamp(max(mtimes), timezone.utc)
+
+    def sync(self) -> None:
+        """Force buffered journal events to stable storage."""
+        if self._journal is not None and self._unsynced_events:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        self._unsynced_events = 0
+
+    def compact(self, progress: Dict) -> None:
+        """
+        Fold the journal into a fresh CSV snapshot and truncate the journal.
+
+        The snapshot is written to a temporary file and atomically renamed,
+        so a crash never leaves a torn snapshot. Replaying a stale journal
+        over the new snapshot is harmless because events carry full state.
+        """
+        write_csv(self.csv_path, progress)
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+
+        self._journal_events = 0
+        self._unsynced_events = 0
+
+    def close(self) -> None:
+        """Flush pending journal events and release the journal file."""
+        if self._journal is not None:
+            self.sync()
+            self._journal.close()
+            self._journal = None
+
+
+class SqliteStorage(ProgressStorage):
+    """
+    Progress stored in a SQLite database using write-ahead logging.
+
+    WAL lets any number of worker processes read while one writes. Each
+    batch is written in a single IMMEDIATE transaction, so writers are
+    serialized by SQLite rather than overwriting each other's files.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 10.0):
+        """
+        Open (and create if needed) the progress database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            timeout: Seconds to wait for another writer's lock
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Reentrant so loads and writes can run inside transaction()
+        self._lock = threading.RLock()
+        self._in_transaction = False
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS progress (
+                parsha_name TEXT NOT NULL,
+                aliyah_number INTEGER NOT NULL,
+                is_complete INTEGER NOT NULL,
+                date_completed TEXT,
+                modified_at REAL NOT NULL,
+                PRIMARY KEY (parsha_name, aliyah_number)
+            )
+            """)
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self) -> int:
+        """Get SQLite's counter of commits made by other connections."""
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self) -> Dict:
+        """Read every row into a progress dict."""
+        with self._lock:
+            # Read the version first so a commit racing the SELECT triggers
+            # another reload rather than being missed
+            self._data_version = self._read_data_version()
+            rows = self._conn.execute(
+                "SELECT parsha_name, aliyah_number, is_complete, date_completed "
+                "FROM progress"
+            ).fetchall()
+
+        return {
+            (parsha_name, aliyah_number): {
+                "is_complete": bool(is_complete),
+                "date_completed": date_completed,
+            }
+            for parsha_name, aliyah_number, is_complete, date_completed in rows
+        }
+
+    def write(self, changes: Changes, progress: Dict) -> None:
+        """Upsert changed rows in one transaction."""
+        now = datetime.now(timezone.utc).timestamp()
+        rows = [
+            (
+                parsha_name,
+                aliyah_number,
+                int(entry["is_complete"]),
+                entry["date_completed"],
+                now,
+            )
+            for (parsha_name, aliyah_number), entry in changes
+        ]
+
+        with self._lock:
+            if self._in_transaction:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO progress VALUES (?, ?, ?, ?, ?)", rows
+                )
+                return
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO progress VALUES (?, ?, ?, ?, ?)", rows
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Hold SQLite's write lock across a load-check-write sequence.
+
+        Other processes can't commit until the block ends, so loads inside it
+        see their latest writes and the block's writes can't interleave.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._in_transaction = True
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+            finally:
+                self._in_transaction = False
+
+    def has_external_changes(self) -> bool:
+        """Check whether another connection has committed since our last read."""
+        with self._lock:
+            return self._read_data_version() != self._data_version
+
+    def modified_at(self) -> datetime:
+        """Time of the most recent row change."""
+        with self._lock:
+            latest = self._conn.execute(
+                "SELECT MAX(modified_at) FROM progress"
+            ).fetchone()[0]
+        if latest is None:
+            return datetime.now(timezone.utc)
+        return datetime.fromtimestamp(latest, timezone.utc)
+
+    def is_empty(self) -> bool:
+        """Whether the database has no progress rows yet."""
+        with self._lock:
+            return (
+                self._conn.execute("SELECT 1 FROM progress LIMIT 1").fetchone() is None
+            )
+
+    def import_csv(self, csv_path: str) -> int:
+        """
+        One-shot import of progress from the CSV (and journal) format.
+
+        Args:
+            csv_path: Path to a progress.csv snapshot
+
+        Returns:
+            Number of rows imported
+        """
+        progress = CsvJournalStorage(csv_path).load()
+        self.write(sorted(progress.items()), progress)
+        return len(progress)
+
+    def export_csv(self, csv_path: str) -> int:
+        """
+        Export all progress to a CSV snapshot.
+
+        Args:
+            csv_path: Destination path
+
+        Returns:
+            Number of rows exported
+        """
+        progress = self.load()
+        write_csv(Path(csv_path), progress)
+        return len(progress)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def read_csv(csv_path: Path) -> Dict:
+    """
+    Read a progress CSV snapshot.
+
+    Args:
+        csv_path: Path to the CSV file
+
+    Returns:
+        Dict mapping (parsha_name, aliyah_number) to progress data
+    """
+    progress = {}
+    if not csv_path.exists():
+        return progress
+
+    with open(csv_path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            key = (row["parsha_name"], int(row["aliyah_number"]))
+            progress[key] = _entry_from_row(row["is_complete"], row["date_completed"])
+
+    return progress
+
+
+def write_csv(csv_path: Path, progress: Dict) -> None:
+    """
+    Atomically write a progress dict to a CSV snapshot.
+
+    Args:
+        csv_path: Destination path
+        progress: Dict mapping (parsha_name, aliyah_number) to progress data
+    """
+    tmp_path = csv_path.with_name(csv_path.name + ".tmp")
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+
+        for key, data in sorted(progress.items()):
+            writer.writerow(_row_for(key, data))
+
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, csv_path)
+
+
+def _entry_from_row(is_complete: str, date_completed: str) -> Dict:
+    """Build a progress entry from CSV string fields."""
+    return {
+        "is_complete": is_complete.lower() == "true",
+        "date_completed": date_completed if date_completed else None,
+    }
+
+
+def _row_for(key: tuple, entry: Dict) -> List:
+    """Build a CSV row from a progress key and entry."""
+    parsha_name, aliyah_number = key
+    return [
+        parsha_name,
+        aliyah_number,
+        entry["is_complete"],
+        entry["date_completed"] or "",
+    ]
+
+
+def main() -> None:
+    """Import progress from CSV into SQLite, or export it back to CSV."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("db_path", help="SQLite progress database")
+    parser.add_argument("csv_path", help="progress.csv snapshot")
+    args = parser.parse_args()
+
+    storage = SqliteStorage(args.db_path)
+    try:
+        if args.command == "import":
+            count = storage.import_csv(args.csv_path)
+            print(f"Imported {count} rows into {args.db_path}")
+        else:
+            count = storage.export_csv(args.csv_path)
+            print(f"Exported {count} rows to {args.csv_path}")
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,141 @@
 """
-Manage reading progress tracking in CSV format.
+Manage reading progress tracking.
+
+Progress is held in memory and persisted through a pluggable ProgressStorage
+(see progress_storage). The default is a CSV snapshot plus an append-only
+journal; SqliteStorage supports several worker processes sharing one store.
+
+A tracker may be shared by the threads of a server. Reads and writes of the
+cached progress, and the listeners they trigger, run under the tracker's
+lock; code reading a listener's derived state should hold it as well.
 """
 
-import csv
-from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Optional
+import secrets
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.data_fetcher.progress_storage import CsvJournalStorage, ProgressStorage
+from backend.metrics import STORAGE_SECONDS, record_cache
+
+# Called as listener(key, old_entry, new_entry) after each state change.
+# old_entry is None when the key had no prior progress.
+ProgressListener = Callable[[tuple, Optional[Dict], Dict], None]
 
 
 class ProgressTracker:
-    """Track Torah reading progress in a CSV file."""
+    """Track Torah reading progress."""
 
-    def __init__(self, csv_path: str):
+    def __init__(
+        self,
+        csv_path: Optional[str] = None,
+        fsync_every: int = 8,
+        compact_every: int = 500,
+        storage: Optional[ProgressStorage] = None,
+    ):
         """
         Initialize progress tracker.
 
         Args:
-            csv_path: Path to the CSV file for storing progress
+            csv_path: Path to the CSV file for storing progress (ignored if
+                storage is given)
+            fsync_every: Number of journal events between fsync calls
+            compact_every: Number of journal events that triggers compaction
+            storage: Storage backend; defaults to CsvJournalStorage(csv_path)
         """
-        self.csv_path = Path(csv_path)
+        if storage is None:
+            if csv_path is None:
+                raise ValueError("Either csv_path or storage is required")
+            storage = CsvJournalStorage(csv_path, fsync_every, compact_every)
+
+        self.storage = storage
+        self._backend = type(storage).__name__
+        # Reentrant: listeners and load_progress run inside apply_updates
+        self.lock = threading.RLock()
         self._progress_cache: Optional[Dict] = None
-        self._ensure_csv_exists()
-
-    def _ensure_csv_exists(self):
-        """Create CSV file with headers if it doesn't exist."""
-        if not self.csv_path.exists():
-            self.csv_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    ["parsha_name", "aliyah_number", "is_complete", "date_completed"]
-                )
+        self._listeners: List[Tuple[ProgressListener, bool]] = []
+        # Bumped on every state change; paired with a per-instance token so
+        # validators from a previous process are never mistaken as current.
+        self.version = 0
+        self.instance_token = secrets.token_hex(4)
+        self.last_modified = datetime.now(timezone.utc)
+        # Completion bits in canonical slot order (see bind_slots)
+        self._slots: Dict[tuple, int] = {}
+        self._bits = bytearray()
+
+    def subscribe(self, listener: ProgressListener, external: bool = True) -> None:
+        """
+        Register a callback invoked after every progress change.
+
+        Args:
+            listener: Callable taking (key, old_entry, new_entry)
+            external: Also call it for changes written by other processes;
+                pass False for listeners that themselves write shared state
+                the other process has already updated
+        """
+        self._listeners.append((listener, external))
+
+    def bind_slots(self, keys: Sequence[tuple]) -> None:
+        """
+        Assign each progress key a fixed position in a packed completion bitset.
+
+        Args:
+            keys: (parsha_name, aliyah_number) tuples in canonical order
+        """
+        with self.lock:
+            self._slots = {key: slot for slot, key in enumerate(keys)}
+            self._bits = bytearray((len(keys) + 7) // 8)
+            for key, entry in self.load_progress().items():
+                self._set_bit(key, entry["is_complete"])
+
+    @property
+    def slot_count(self) -> int:
+        """Number of keys bound with bind_slots."""
+        return len(self._slots)
+
+    def _set_bit(self, key: tuple, is_complete: bool) -> None:
+        """Update the completion bit for a key (most significant bit first)."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return
+        mask = 0x80 >> (slot % 8)
+        if is_complete:
+            self._bits[slot // 8] |= mask
+        else:
+            self._bits[slot // 8] &= ~mask
+
+    def progress_bits(self) -> bytes:
+        """
+        Get completion state as a packed bitset in bound slot order.
+
+        Returns:
+            Bytes where bit i (MSB first) is set if slot i is complete
+        """
+        return bytes(self._bits)
+
+    def progress_runs(self) -> List[int]:
+        """
+        Get completion state as run lengths in bound slot order.
+
+        Runs alternate incomplete/complete, starting with incomplete (so the
+        first run may be 0).
+
+        Returns:
+            List of run lengths summing to slot_count
+        """
+        runs = []
+        current = False
+        length = 0
+        bits = self._bits
+        for slot in range(len(self._slots)):
+            bit = bool(bits[slot // 8] & (0x80 >> (slot % 8)))
+            if bit != current:
+                runs.append(length)
+                current = bit
+                length = 0
+            length += 1
+        runs.append(length)
+        return runs
 
     def mark_complete(self, parsha_name: str, aliyah_number: int) -> None:
         """
@@ -40,16 +145,7 @@ class ProgressTracker:
             parsha_name: Name of the parsha
             aliyah_number: Aliyah number (1-7)
         """
-        progress = self.load_progress()
-
-        # Check if already marked
-        key = (parsha_name, aliyah_number)
-        if key not in progress or not progress[key]["is_complete"]:
-            progress[key] = {
-                "is_complete": True,
-                "date_completed": datetime.now().isoformat(),
-            }
-            self._save_progress(progress)
+        self.apply_updates([(parsha_name, aliyah_number, True)])
 
     def mark_incomplete(self, parsha_name: str, aliyah_number: int) -> None:
         """
@@ -59,65 +155,149 @@ class ProgressTracker:
             parsha_name: Name of the parsha
             aliyah_number: Aliyah number (1-7)
         """
-        progress = self.load_progress()
-        key = (parsha_name, aliyah_number)
+        self.apply_updates([(parsha_name, aliyah_number, False)])
+
+    def apply_updates(self, updates: Iterable[Tuple[str, int, bool]]) -> int:
+        """
+        Apply a batch of completion changes and persist them once.
+
+        Updates that don't change state are skipped. All changed entries are
+        handed to storage together at the end of the batch, so a whole book
+        costs one write rather than one per aliyah.
+
+        The batch is atomic: the tracker lock keeps other threads out, and the
+        storage transaction keeps other processes from writing between the
+        state checks and the write.
+
+        Args:
+            updates: Iterable of (parsha_name, aliyah_number, is_complete)
+
+        Returns:
+            Number of aliyot whose state changed
+        """
+        updates = list(updates)
+        now = datetime.now().isoformat()
+        changes = []
+
+        with self.lock:
+            try:
+                with self.storage.transaction():
+                    progress = self.load_progress()
+                    for parsha_name, aliyah_number, is_complete in updates:
+                        key = (parsha_name, aliyah_number)
+                        current = progress.get(key)
 
-        if key in progress:
-            progress[key] = {"is_complete": False, "date_completed": None}
-            self._save_progress(progress)
+                        if is_complete:
+                            # Check if already marked
+                            if current is not None and current["is_complete"]:
+                                continue
+                            entry = {"is_complete": True, "date_completed": now}
+                        else:
+                            if current is None or not current["is_complete"]:
+                                continue
+                            entry = {"is_complete": False, "date_completed": None}
+
+                        progress[key] = entry
+                        changes.append((key, current, entry))
+
+                    if changes:
+                        with self._timed("write"):
+                            self.storage.write(
+                                [(key, new) for key, _, new in changes], progress
+                            )
+            except Exception:
+                # Undo the cached changes that never reached storage
+                for key, old_entry, _ in reversed(changes):
+                    if old_entry is None:
+                        progress.pop(key, None)
+                    else:
+                        progress[key] = old_entry
+                raise
+
+            if changes:
+                self._publish(changes)
+
+        return len(changes)
+
+    def _publish(
+        self, changes: List[Tuple[tuple, Optional[Dict], Dict]], external: bool = False
+    ) -> None:
+        """Update derived state and notify listeners of applied changes."""
+        self.version += len(changes)
+        self.last_modified = datetime.now(timezone.utc)
+
+        for key, old_entry, new_entry in changes:
+            self._set_bit(key, new_entry["is_complete"])
+            for listener, wants_external in self._listeners:
+                if wants_external or not external:
+                    listener(key, old_entry, new_entry)
 
     def load_progress(self) -> Dict:
         """
-        Load all progress from CSV (cached).
+        Load all progress from storage (cached).
+
+        If the storage reports writes from another process, the cache is
+        refreshed in place and the differences are published as changes.
 
         Returns:
             Dict mapping (parsha_name, aliyah_number) to progress data
         """
-        if self._progress_cache is not None:
+        with self.lock:
+            if self._progress_cache is not None:
+                external = self.storage.has_external_changes()
+                record_cache("progress", not external)
+                if external:
+                    self._refresh()
+                return self._progress_cache
+
+            record_cache("progress", False)
+            with self._timed("load"):
+                self._progress_cache = self.storage.load()
+            self.last_modified = self.storage.modified_at()
             return self._progress_cache
 
-        progress = {}
+    def _refresh(self) -> None:
+        """Reload from storage and publish entries that changed externally."""
+        progress = self._progress_cache
+        with self._timed("load"):
+            latest = self.storage.load()
+        changes = []
 
-        if not self.csv_path.exists():
-            self._progress_cache = progress
-            return progress
+        for key, entry in latest.items():
+            current = progress.get(key)
+            if current != entry:
+                progress[key] = entry
+                changes.append((key, current, entry))
 
-        with open(self.csv_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                key = (row["parsha_name"], int(row["aliyah_number"]))
-                progress[key] = {
-                    "is_complete": row["is_complete"].lower() == "true",
-                    "date_completed": (
-                        row["date_completed"] if row["date_completed"] else None
-                    ),
-                }
+        for key in progress.keys() - latest.keys():
+            entry = {"is_complete": False, "date_completed": None}
+            changes.append((key, progress.pop(key), entry))
 
-        self._progress_cache = progress
-        return progress
+        if changes:
+            self._publish(changes, external=True)
 
-    def _save_progress(self, progress: Dict) -> None:
-        """
-        Save progress dict to CSV and update cache.
+    def _timed(self, operation: str):
+        """Context manager recording how long a storage operation takes."""
+        return STORAGE_SECONDS.time(self._backend, operation)
 
-        Args:
-            progress: Dict mapping (parsha_name, aliyah_number) to progress data
-        """
-        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                ["parsha_name", "aliyah_number", "is_complete", "date_completed"]
-            )
-
-            for (parsha_name, aliyah_number), data in sorted(progress.items()):
-                writer.writerow(
-                    [
-                        parsha_name,
-                        aliyah_number,
-                        data["is_complete"],
-                        data["date_completed"] or "",
-                    ]
-                )
-
-        # Update cache
-        self._progress_cache = progress
+    @property
+    def etag(self) -> str:
+        """Opaque validator identifying the current progress state."""
+        return f"{self.instance_token}-{self.version}"
+
+    def sync(self) -> None:
+        """Force buffered writes to stable storage."""
+        with self.lock, self._timed("sync"):
+            self.storage.sync()
+
+    def compact(self) -> None:
+        """Rewrite storage in its most compact form."""
+        with self.lock:
+            progress = self.load_progress()
+            with self._timed("compact"):
+                self.storage.compact(progress)
+
+    def close(self) -> None:
+        """Flush pending writes and release storage resources."""
+        with self.lock:
+            self.storage.close()
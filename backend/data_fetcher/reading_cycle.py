@@ -0,0 +1,298 @@
+"""
+Reading cycles over the shared verse index.
+
+A cycle is an ordered list of portions, each a labelled verse range: the
+annual cycle's aliyot, one year of a triennial cycle, or any custom
+division. Cycle files hold only the boundaries, as [label, number,
+"Book C:V-C:V"] rows, so a cycle costs a few kilobytes; verse and word
+counts come from the VerseIndex.
+
+Progress for every cycle is read from verse-level progress (see
+verse_progress), so verses read in one cycle count towards any other cycle
+covering them.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from backend.data_fetcher.catalog import Catalog
+from backend.data_fetcher.hebcal_fetcher import parse_verse_range
+from backend.data_fetcher.reading_plan import linear_partition
+from backend.data_fetcher.verse_index import VerseIndex
+from backend.data_fetcher.verse_progress import VerseProgress, format_counts
+
+ANNUAL = "annual"
+
+
+class Portion(NamedTuple):
+    """One reading of a cycle, as a half-open verse ordinal range."""
+
+    label: str
+    number: int
+    book: str
+    start: int
+    end: int
+
+
+class ReadingCycle:
+    """Named, ordered portions resolved against a verse index."""
+
+    def __init__(
+        self,
+        name: str,
+        portions: Sequence[Portion],
+        verse_index: VerseIndex,
+        description: str = "",
+    ):
+        """
+        Args:
+            name: Cycle name, used in API paths
+            portions: Portions in reading order
+            verse_index: Index the portion ordinals refer to
+            description: Free-form description
+        """
+        self.name = name
+        self.description = description
+        self.portions: Tuple[Portion, ...] = tuple(portions)
+        self.verse_index = verse_index
+        self._by_key = {(p.label, p.number): p for p in self.portions}
+
+    def __len__(self) -> int:
+        return len(self.portions)
+
+    def portion(self, label: str, number: int) -> Portion:
+        """
+        Look up a portion.
+
+        Raises:
+            ValueError: If the cycle has no such portion
+        """
+        try:
+            return self._by_key[(label, number)]
+        except KeyError:
+            raise ValueError(f"{self.name} has no portion {label} {number}") from None
+
+    def reference(self, portion: Portion) -> str:
+        """Format a portion's range, e.g. "Genesis 1:1-2:3"."""
+        book = self.verse_index.book(portion.book)
+        start_ch, start_v = book.reference(portion.start)
+        end_ch, end_v = book.reference(portion.end - 1)
+        return f"{portion.book} {start_ch}:{start_v}-{end_ch}:{end_v}"
+
+    @classmethod
+    def from_rows(
+        cls,
+        name: str,
+        rows: Sequence[Sequence],
+        verse_index: VerseIndex,
+        description: str = "",
+    ) -> "ReadingCycle":
+        """
+        Build a cycle from [label, number, range] rows.
+
+        Raises:
+            ValueError: If a range can't be parsed or isn't in the index
+        """
+        portions = []
+        for label, number, verse_range in rows:
+            parsed = parse_verse_range(verse_range)
+            start, end = verse_index.book(parsed["book"]).span(
+                parsed["start_chapter"],
+                parsed["start_verse"],
+                parsed["end_chapter"],
+                parsed["end_verse"],
+            )
+            portions.append(Portion(label, int(number), parsed["book"], start, end))
+        return cls(name, portions, verse_index, description)
+
+    @classmethod
+    def from_catalog(
+        cls, catalog: Catalog, verse_index: VerseIndex, name: str = ANNUAL
+    ) -> "ReadingCycle":
+        """The catalog's aliyot as a cycle (the annual cycle)."""
+        return cls.from_rows(
+            name,
+            [
+                (aliyah.parsha_title, aliyah.number, aliyah.verses)
+                for aliyah in catalog.aliyot()
+            ],
+            verse_index,
+            "Weekly parsha, seven aliyot each",
+        )
+
+    @classmethod
+    def load(cls, path: Path, verse_index: VerseIndex) -> "ReadingCycle":
+        """Load a cycle saved with save(); the name defaults to the file stem."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls.from_rows(
+            data.get("name", Path(path).stem),
+            data["portions"],
+            verse_index,
+            data.get("description", ""),
+        )
+
+    def save(self, path: Path) -> None:
+        """Save the cycle's boundaries as compact JSON rows."""
+        data = {
+            "name": self.name,
+            "description": self.description,
+            "portions": [[p.label, p.number, self.reference(p)] for p in self.portions],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    def split(
+        self, name: str, parts: int, part: int, per_part: int = 7
+    ) -> "ReadingCycle":
+        """
+        Derive a cycle reading one of several slices of each label's verses.
+
+        Each label's range is cut into parts contiguous slices of about
+        equal word count, and slice number part (1-based) is divided into
+        per_part portions, also balanced by words. With parts=3 this gives
+        triennial-style years.
+
+        Args:
+            name: Name of the new cycle
+            parts: Number of slices per label
+            part: Slice to read (1-based)
+            per_part: Portions per slice
+
+        Returns:
+            New ReadingCycle over the same verse index
+        """
+        if not 1 <= part <= parts:
+            raise ValueError(f"part must be between 1 and {parts}")
+
+        portions = []
+        for label, book_name, start, end in self._label_spans():
+            book = self.verse_index.book(book_name)
+            weights = [book.words_between(i, i + 1) for i in range(start, end)]
+            _, cuts = linear_partition(weights, parts)
+            first, last = cuts[part - 1], cuts[part]
+            _, inner = linear_partition(weights[first:last], per_part)
+            for number, (a, b) in enumerate(zip(inner, inner[1:]), 1):
+                if b > a:
+                    portions.append(
+                        Portion(
+                            label,
+                            number,
+                            book_name,
+                            start + first + a,
+                            start + first + b,
+                        )
+                    )
+
+        description = f"Part {part} of {parts} of each {self.name} reading"
+        return ReadingCycle(name, portions, self.verse_index, description)
+
+    def _label_spans(self) -> List[Tuple[str, str, int, int]]:
+        """(label, book, start, end) covering each label's portions, in order."""
+        spans: Dict[str, Tuple[str, int, int]] = {}
+        for p in self.portions:
+            book, start, end = spans.get(p.label, (p.book, p.start, p.end))
+            spans[p.label] = (book, min(start, p.start), max(end, p.end))
+        return [(label, *span) for label, span in spans.items()]
+
+    def summary(self, verse_progress: VerseProgress) -> Dict:
+        """
+        Get each portion's reading progress and the cycle totals.
+
+        A portion is complete when every verse in it has been read.
+
+        Args:
+            verse_progress: Read verses, in the same verse index
+
+        Returns:
+            Dict with the cycle name, portions and portion/verse/word totals
+        """
+        verse_progress.refresh()
+        totals = {"portions": [0, 0], "verses": [0, 0], "words": [0, 0]}
+        portions = []
+        for p in self.portions:
+            words = self.verse_index.book(p.book).words_between(p.start, p.end)
+            read_verses, read_words = verse_progress.read_in(p.book, p.start, p.end)
+            is_complete = read_verses == p.end - p.start
+
+            for metric, done, whole in (
+                ("portions", int(is_complete), 1),
+                ("verses", read_verses, p.end - p.start),
+                ("words", read_words, words),
+            ):
+                totals[metric][0] += done
+                totals[metric][1] += whole
+            portions.append(
+                {
+                    "label": p.label,
+                    "number": p.number,
+                    "range": self.reference(p),
+                    "verse_count": p.end - p.start,
+                    "word_count": words,
+                    "read": {"verses": read_verses, "words": read_words},
+                    "is_complete": is_complete,
+                }
+            )
+
+        return {
+            "cycle": self.name,
+            "description": self.description,
+            "portions": portions,
+            "total": format_counts(totals),
+        }
+
+
+def load_cycles(
+    cycle_dir: Path, verse_index: VerseIndex, catalog: Catalog
+) -> Dict[str, ReadingCycle]:
+    """
+    Get the annual cycle plus every cycle file in a directory.
+
+    Args:
+        cycle_dir: Directory of *.json cycle files (may not exist)
+        verse_index: Shared verse index
+        catalog: Catalog the annual cycle is built from
+
+    Returns:
+        Cycle name -> ReadingCycle, annual first
+    """
+    cycles = {ANNUAL: ReadingCycle.from_catalog(catalog, verse_index)}
+    for path in sorted(Path(cycle_dir).glob("*.json")):
+        cycle = ReadingCycle.load(path, verse_index)
+        cycles[cycle.name] = cycle
+    return cycles
+
+
+def main() -> None:
+    """Export the annual cycle, or derive triennial-style cycles from it."""
+    data_dir = Path(__file__).parent.parent.parent / "data"
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("command", choices=["export", "split"])
+    parser.add_argument("output", type=Path, help="Cycle file to write")
+    parser.add_argument("--name", help="Cycle name (default: output file stem)")
+    parser.add_argument("--parts", type=int, default=3)
+    parser.add_argument("--part", type=int, default=1)
+    parser.add_argument("--per-part", type=int, default=7)
+    parser.add_argument("--catalog", type=Path, default=data_dir / "catalog.bin")
+    parser.add_argument(
+        "--verse-index", type=Path, default=data_dir / "verse_index.json"
+    )
+    args = parser.parse_args()
+
+    verse_index = VerseIndex.load(args.verse_index)
+    cycle = ReadingCycle.from_catalog(Catalog.from_binary(args.catalog), verse_index)
+    name = args.name or args.output.stem
+    if args.command == "split":
+        cycle = cycle.split(name, args.parts, args.part, args.per_part)
+    else:
+        cycle.name = name
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    cycle.save(args.output)
+    print(f"Saved {len(cycle)} portions of {cycle.name} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Paced reading plans.
+
+A plan splits the aliyot a reader hasn't finished, in reading order, into
+one contiguous portion per day up to a target date. Portions are balanced
+by word count with an optimal linear partition: the smallest possible
+maximum daily load is found by binary search over prefix sums, then each day
+is cut as close as possible to an even share of what remains without ever
+exceeding that load.
+
+ReadingPlanner subscribes to ProgressTracker, so completed aliyot drop out
+of the plan as they are toggled and cached plans are recomputed on demand.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from backend.data_fetcher.catalog import Aliyah, Catalog
+
+# Longest plan accepted, in days
+MAX_PLAN_DAYS = 3660
+# Plans kept per planner; the least recently used is dropped
+MAX_CACHED_PLANS = 16
+
+
+def linear_partition(weights: Sequence[int], parts: int) -> Tuple[int, List[int]]:
+    """
+    Split a sequence into contiguous parts minimizing the largest part sum.
+
+    Args:
+        weights: Non-negative item weights, in order
+        parts: Number of parts (some may be empty if there are fewer items)
+
+    Returns:
+        (largest part sum, cuts) where part d is weights[cuts[d]:cuts[d + 1]]
+        and len(cuts) == parts + 1
+    """
+    if parts < 1:
+        raise ValueError("parts must be at least 1")
+
+    n = len(weights)
+    prefix = [0] + list(accumulate(weights))
+    if n == 0:
+        return 0, [0] * (parts + 1)
+
+    # Binary search for the smallest limit that fits in the given parts
+    low, high = max(weights), prefix[-1]
+    while low < high:
+        mid = (low + high) // 2
+        if _parts_needed(prefix, mid, n) <= parts:
+            high = mid
+        else:
+            low = mid + 1
+    limit = low
+
+    # need[i]: fewest parts covering weights[i:] without exceeding the limit
+    need = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        need[i] = 1 + need[_reach(prefix, i, limit)]
+
+    cuts = [0]
+    i = 0
+    for days_left in range(parts, 1, -1):
+        # Any end in [first, last] keeps the part within the limit and leaves
+        # a suffix that still fits in the remaining parts
+        last = _reach(prefix, i, limit)
+        first = _first_fitting(need, i, last, days_left - 1)
+
+        # Cut closest to an even share of what remains
+        target = prefix[i] + (prefix[n] - prefix[i]) / days_left
+        j = bisect_left(prefix, target, first, last + 1)
+        candidates = [c for c in (j - 1, j) if first <= c <= last]
+        i = min(candidates, key=lambda c: abs(prefix[c] - target))
+        cuts.append(i)
+
+    cuts.append(n)
+    return limit, cuts
+
+
+def _reach(prefix: List[int], i: int, limit: int) -> int:
+    """Farthest end j with sum(weights[i:j]) <= limit."""
+    return bisect_right(prefix, prefix[i] + limit, i) - 1
+
+
+def _parts_needed(prefix: List[int], limit: int, n: int) -> int:
+    """Fewest parts covering every item without exceeding the limit."""
+    count = 0
+    i = 0
+    while i < n:
+        i = _reach(prefix, i, limit)
+        count += 1
+    return count
+
+
+def _first_fitting(need: List[int], low: int, high: int, parts: int) -> int:
+    """Smallest j in [low, high] with need[j] <= parts (need is non-increasing)."""
+    while low < high:
+        mid = (low + high) // 2
+        if need[mid] <= parts:
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+class ReadingPlanner:
+    """Builds plans from a tracker's unfinished aliyot, cached between changes."""
+
+    def __init__(self, catalog: Catalog, progress: Dict):
+        """
+        Args:
+            catalog: Torah reading catalog
+            progress: Dict mapping (parsha_name, aliyah_number) to progress data
+        """
+        self.catalog = catalog
+        self.completed: Set[Tuple[str, int]] = {
+            key for key, entry in progress.items() if entry["is_complete"]
+        }
+        self._plans: "OrderedDict[tuple, Dict]" = OrderedDict()
+
+    def apply(self, key: tuple, old: Optional[Dict], new: Dict) -> None:
+        """Record a progress change (ProgressTracker listener)."""
+        if new["is_complete"]:
+            self.completed.add(key)
+        else:
+            self.completed.discard(key)
+        self._plans.clear()
+
+    def plan(
+        self,
+        start: date,
+        end: date,
+        book: Optional[str] = None,
+        parsha: Optional[str] = None,
+    ) -> Dict:
+        """
+        Plan the unfinished aliyot from start to end, inclusive.
+
+        Args:
+            start: First reading day
+            end: Last reading day
+            book: Only plan this book
+            parsha: Only plan this parsha (by title)
+
+        Returns:
+            Dict with the plan window, remaining totals, the largest daily
+            word load and one entry per day
+
+        Raises:
+            ValueError: If the dates or scope are invalid
+        """
+        key = (start, end, book, parsha)
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            return plan
+
+        plan = self._plans[key] = self._build(start, end, book, parsha)
+        if len(self._plans) > MAX_CACHED_PLANS:
+            self._plans.popitem(last=False)
+        return plan
+
+    def _scope(self, book: Optional[str], parsha: Optional[str]) -> List[Aliyah]:
+        """Unfinished aliyot in reading order, limited to a book or parsha."""
+        if parsha is not None:
+            selected = self.catalog.by_title.get(parsha)
+            if selected is None:
+                raise ValueError(f"Unknown parsha: {parsha}")
+            parshiot = (selected,)
+        elif book is not None:
+            parshiot = self.catalog.by_book.get(book, ())
+            if not parshiot:
+                raise ValueError(f"Unknown book: {book}")
+        else:
+            parshiot = self.catalog.parshiot
+
+        return [
+            aliyah
+            for p in parshiot
+            for aliyah in p.aliyot
+            if aliyah.key not in self.completed
+        ]
+
+    def _build(
+        self, start: date, end: date, book: Optional[str], parsha: Optional[str]
+    ) -> Dict:
+        days = (end - start).days + 1
+        if days < 1:
+            raise ValueError("The target date is before the start date")
+        if days > MAX_PLAN_DAYS:
+            raise ValueError(f"Plans are limited to {MAX_PLAN_DAYS} days")
+
+        aliyot = self._scope(book, parsha)
+        words = [aliyah.word_count for aliyah in aliyot]
+        limit, cuts = linear_partition(words, days)
+
+        schedule = []
+        for d in range(days):
+            portion = aliyot[cuts[d] : cuts[d + 1]]
+            schedule.append(
+                {
+                    "date": (start + timedelta(days=d)).isoformat(),
+                    "words": sum(words[cuts[d] : cuts[d + 1]]),
+                    "verses": sum(aliyah.verse_count for aliyah in portion),
+                    "aliyot": [
+                        {
+                            "parsha": aliyah.parsha_title,
+                            "aliyah": aliyah.number,
+                            "verses": aliyah.verses,
+                            "word_count": aliyah.word_count,
+                        }
+                        for aliyah in portion
+                    ],
+                }
+            )
+
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "days": days,
+            "remaining": {"aliyot": len(aliyot), "words": sum(words)},
+            "max_words_per_day": limit,
+            "schedule": schedule,
+        }
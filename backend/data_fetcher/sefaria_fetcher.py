@@ -2,39 +2,85 @@
 Fetch Hebrew Torah text from Sefaria API and count words.
 """
 
+import json
+import os
 import re
+import threading
 import time
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import requests
 
+# Markup removed before counting: <br> and HTML entities (&nbsp;, &thinsp;)
+# separate words; other tags (such as <small> around a small letter) may sit
+# inside a word and are dropped without a gap, as are markers like {פ}
+_SEPARATOR_RE = re.compile(r"<br\s*/?>|&(?:#\d+|#x[0-9a-fA-F]+|\w+);")
+_INLINE_RE = re.compile(r"<[^>]*>|\{[^}]*\}")
 
-def count_hebrew_words(text: str) -> int:
+# A word is a whitespace-delimited token with at least one letter or digit,
+# so a stand-alone paseq (׀) or sof pasuq (׃) isn't one. With split_maqaf,
+# the maqaf (U+05BE) delimits words as well.
+_WORD_RE = re.compile(r"[^\w\s]*\w\S*")
+_WORD_OR_MAQAF_RE = re.compile(r"[^\w\s\u05be]*\w[^\s\u05be]*")
+
+
+def count_hebrew_words(text: str, split_maqaf: bool = False) -> int:
     """
     Count words in Hebrew text.
 
-    Hebrew words are separated by spaces, but we need to handle:
-    - Punctuation marks
-    - Cantillation marks
-    - Special markers like {פ}
+    Words are whitespace-delimited tokens, except that:
+    - Tokens without a letter or digit, such as a stand-alone paseq (׀)
+      or sof pasuq (׃), aren't counted
+    - HTML tags and entities and markers like {פ} are removed first;
+      <br> and entities separate words, other markup doesn't
+    - Cantillation marks and niqqud are part of the word they sit on
 
     Args:
         text: Hebrew text string
+        split_maqaf: Count words joined by a maqaf separately
 
     Returns:
         Number of words in the text
     """
-    # Remove special markers like {פ}
-    text = re.sub(r"\{[^}]+\}", "", text)
+    return count_hebrew_words_batch([text], split_maqaf)[0]
+
+
+def count_hebrew_words_batch(
+    texts: Iterable[str], split_maqaf: bool = False
+) -> List[int]:
+    """
+    Count words in many Hebrew texts, such as all verses of a chapter.
 
-    # Split by whitespace and filter empty strings
-    words = [w.strip() for w in text.split() if w.strip()]
+    Words are counted by iterating a precompiled pattern over each text,
+    without building token lists, and markup patterns only run on texts
+    that contain markup; results are identical to calling
+    count_hebrew_words on each text.
 
-    return len(words)
+    Args:
+        texts: Hebrew text strings
+        split_maqaf: Count words joined by a maqaf separately
+
+    Returns:
+        Word count of each text, in order
+    """
+    separators = _SEPARATOR_RE.sub
+    inline = _INLINE_RE.sub
+    words = (_WORD_OR_MAQAF_RE if split_maqaf else _WORD_RE).finditer
+    counts = []
+    for text in texts:
+        # Most verses have no markup, so skip the substitutions for them
+        if "&" in text or "<br" in text:
+            text = separators(" ", text)
+        if "<" in text or "{" in text:
+            text = inline("", text)
+        counts.append(sum(1 for _ in words(text)))
+    return counts
 
 
 def fetch_hebrew_text(
-    book: str, chapter: int, start_verse: int, end_verse: int
+    book: str, chapter: int, start_verse: int, end_verse: int, session=None
 ) -> Dict:
     """
     Fetch Hebrew text for a range of verses from Sefaria.
@@ -44,6 +90,8 @@ def fetch_hebrew_text(
         chapter: Chapter number
         start_verse: Starting verse number
         end_verse: Ending verse number
+        session: Optional client with a get_json(url, params) method (such as
+                 http_cache.CachedSession); plain requests is used otherwise
 
     Returns:
         Dict with Hebrew text array and metadata
@@ -57,10 +105,13 @@ def fetch_hebrew_text(
     url = f"https://www.sefaria.org/api/texts/{ref}"
 
     # Use context=0 to get only the requested verses without surrounding context
-    response = requests.get(url, params={"context": 0})
-    response.raise_for_status()
-
-    data = response.json()
+    params = {"context": 0}
+    if session is not None:
+        data = session.get_json(url, params)
+    else:
+        response = requests.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
 
     return {
         "ref": data.get("ref"),
@@ -69,83 +120,209 @@ def fetch_hebrew_text(
     }
 
 
-def count_words_and_verses_in_aliyah(verse_range: Dict) -> Dict[str, int]:
+def fetch_chapter(book: str, chapter: int, session=None) -> List[str]:
+    """
+    Fetch the Hebrew text of a whole chapter from Sefaria.
+
+    Args:
+        book: Book name (e.g., 'Genesis', 'Exodus')
+        chapter: Chapter number
+        session: Optional client with a get_json(url, params) method
+
+    Returns:
+        List of Hebrew verse strings
+    """
+    url = f"https://www.sefaria.org/api/texts/{book}.{chapter}"
+    params = {"context": 0}
+    if session is not None:
+        data = session.get_json(url, params)
+    else:
+        response = requests.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+
+    hebrew = data.get("he", [])
+    return hebrew if isinstance(hebrew, list) else [hebrew]
+
+
+class ChapterStore:
+    """
+    Chapter-granular store of Hebrew Torah text.
+
+    Each chapter is fetched from Sefaria at most once and saved as
+    ``<store_dir>/<book>/<chapter>.json``. Verse ranges, including ones that
+    span chapters, are served by slicing the stored chapters.
+    """
+
+    def __init__(self, store_dir: Path, session=None):
+        """
+        Initialize the store.
+
+        Args:
+            store_dir: Directory holding saved chapters
+            session: Optional client with a get_json(url, params) method
+        """
+        self.store_dir = Path(store_dir)
+        self.session = session
+        self.fetches = 0
+        self._chapters: Dict[Tuple[str, int], List[str]] = {}
+        self._locks: Dict[Tuple[str, int], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, book: str, chapter: int) -> Path:
+        return self.store_dir / book / f"{chapter}.json"
+
+    def chapter(self, book: str, chapter: int) -> List[str]:
+        """
+        Get all verses of a chapter, fetching and saving it on first use.
+
+        Args:
+            book: Book name
+            chapter: Chapter number
+
+        Returns:
+            List of Hebrew verse strings
+        """
+        key = (book, chapter)
+        verses = self._chapters.get(key)
+        if verses is not None:
+            return verses
+
+        # One lock per chapter so concurrent callers don't fetch it twice
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            verses = self._chapters.get(key)
+            if verses is not None:
+                return verses
+
+            path = self._path(book, chapter)
+            if path.exists():
+                with open(path, "r", encoding="utf-8") as f:
+                    verses = json.load(f)
+            else:
+                verses = fetch_chapter(book, chapter, self.session)
+                self.fetches += 1
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(verses, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+
+            self._chapters[key] = verses
+            return verses
+
+    def prefetch(
+        self, chapters: Iterable[Tuple[str, int]], max_workers: int = 8
+    ) -> None:
+        """
+        Load many chapters concurrently.
+
+        Args:
+            chapters: (book, chapter) pairs
+            max_workers: Number of concurrent fetches
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(lambda key: self.chapter(*key), set(chapters)))
+
+    def verses(self, verse_range: Dict) -> List[str]:
+        """
+        Get the verses of a parsed range by slicing stored chapters.
+
+        Args:
+            verse_range: Parsed verse range dict from hebcal_fetcher
+
+        Returns:
+            List of Hebrew verse strings in the range
+        """
+        book = verse_range["book"]
+        start_ch = verse_range["start_chapter"]
+        end_ch = verse_range["end_chapter"]
+
+        verses = []
+        for ch in range(start_ch, end_ch + 1):
+            text = self.chapter(book, ch)
+            first = verse_range["start_verse"] if ch == start_ch else 1
+            last = verse_range["end_verse"] if ch == end_ch else len(text)
+            verses.extend(text[first - 1 : last])
+        return verses
+
+
+def _count_range(
+    book: str, chapter: int, start_verse: int, end_verse: int, session=None
+) -> Dict[str, int]:
+    """
+    Fetch one chapter range and count its words and verses.
+
+    Without a session, sleeps briefly after the request to be respectful to
+    the API; a session is expected to apply its own rate limit.
+    """
+    data = fetch_hebrew_text(book, chapter, start_verse, end_verse, session)
+    hebrew_verses = data["hebrew"]
+
+    if session is None:
+        time.sleep(0.1)
+
+    if not isinstance(hebrew_verses, list):
+        hebrew_verses = [hebrew_verses]
+
+    return {
+        "word_count": sum(count_hebrew_words_batch(hebrew_verses)),
+        "verse_count": len(hebrew_verses),
+    }
+
+
+def count_words_and_verses_in_aliyah(
+    verse_range: Dict, session=None, store: Optional[ChapterStore] = None
+) -> Dict[str, int]:
     """
     Count Hebrew words and verses in an aliyah by fetching text from Sefaria.
 
     Args:
         verse_range: Parsed verse range dict from hebcal_fetcher
+        session: Optional client with a get_json(url, params) method
+        store: Chapter store to slice text from instead of fetching the
+               range directly
 
     Returns:
         Dict with 'word_count' and 'verse_count'
     """
+    if store is not None:
+        verses = store.verses(verse_range)
+        return {
+            "word_count": sum(count_hebrew_words_batch(verses)),
+            "verse_count": len(verses),
+        }
+
     book = verse_range["book"]
     start_ch = verse_range["start_chapter"]
     start_v = verse_range["start_verse"]
     end_ch = verse_range["end_chapter"]
     end_v = verse_range["end_verse"]
 
-    total_words = 0
-    total_verses = 0
-
     # Handle single chapter case
     if start_ch == end_ch:
         try:
-            data = fetch_hebrew_text(book, start_ch, start_v, end_v)
-            hebrew_verses = data["hebrew"]
-
-            if isinstance(hebrew_verses, list):
-                total_verses = len(hebrew_verses)
-                for verse in hebrew_verses:
-                    total_words += count_hebrew_words(verse)
-            else:
-                total_verses = 1
-                total_words += count_hebrew_words(hebrew_verses)
-
-            # Small delay to be respectful to the API
-            time.sleep(0.1)
-
+            return _count_range(book, start_ch, start_v, end_v, session)
         except Exception as e:
             print(f"Error fetching {book} {start_ch}:{start_v}-{end_v}: {e}")
             return {"word_count": 0, "verse_count": 0}
 
-    else:
-        # Multi-chapter case - fetch each chapter separately
-        # First chapter (from start_v to end)
-        try:
-            data = fetch_hebrew_text(book, start_ch, start_v, 999)
-            hebrew_verses = data["hebrew"]
-            if isinstance(hebrew_verses, list):
-                total_verses += len(hebrew_verses)
-                for verse in hebrew_verses:
-                    total_words += count_hebrew_words(verse)
-            time.sleep(0.1)
-        except Exception as e:
-            print(f"Error fetching {book} {start_ch}:{start_v}-end: {e}")
-
-        # Middle chapters (if any)
-        for ch in range(start_ch + 1, end_ch):
-            try:
-                data = fetch_hebrew_text(book, ch, 1, 999)
-                hebrew_verses = data["hebrew"]
-                if isinstance(hebrew_verses, list):
-                    total_verses += len(hebrew_verses)
-                    for verse in hebrew_verses:
-                        total_words += count_hebrew_words(verse)
-                time.sleep(0.1)
-            except Exception as e:
-                print(f"Error fetching {book} {ch}: {e}")
-
-        # Last chapter (from 1 to end_v)
+    # Multi-chapter case - fetch each chapter separately: the first from
+    # start_v to the end, middle chapters whole, the last from 1 to end_v
+    ranges = [(start_ch, start_v, 999)]
+    ranges += [(ch, 1, 999) for ch in range(start_ch + 1, end_ch)]
+    ranges.append((end_ch, 1, end_v))
+
+    total_words = 0
+    total_verses = 0
+    for ch, first, last in ranges:
         try:
-            data = fetch_hebrew_text(book, end_ch, 1, end_v)
-            hebrew_verses = data["hebrew"]
-            if isinstance(hebrew_verses, list):
-                total_verses += len(hebrew_verses)
-                for verse in hebrew_verses:
-                    total_words += count_hebrew_words(verse)
-            time.sleep(0.1)
+            counts = _count_range(book, ch, first, last, session)
+            total_words += counts["word_count"]
+            total_verses += counts["verse_count"]
         except Exception as e:
-            print(f"Error fetching {book} {end_ch}:1-{end_v}: {e}")
+            print(f"Error fetching {book} {ch}:{first}-{last}: {e}")
 
     return {"word_count": total_words, "verse_count": total_verses}
@@ -0,0 +1,213 @@
+"""
+Per-verse word counts for the Torah with prefix sums.
+
+Every verse in a book gets an ordinal (0-based, in reading order). For each
+book the index keeps the ordinal of each chapter's first verse and a prefix
+sum of word counts, so the word and verse count of any range, such as a
+custom split, a triennial portion or a maftir, is an O(1) lookup with no
+network access.
+"""
+
+import json
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Number of chapters in each book of the Torah (187 in total)
+TORAH_CHAPTERS = {
+    "Genesis": 50,
+    "Exodus": 40,
+    "Leviticus": 27,
+    "Numbers": 36,
+    "Deuteronomy": 34,
+}
+
+
+class BookIndex:
+    """Verse ordinals and word-count prefix sums for one book."""
+
+    __slots__ = ("name", "chapter_starts", "prefix")
+
+    def __init__(self, name: str, chapters: List[List[int]]):
+        """
+        Build the index for a book.
+
+        Args:
+            name: Book name
+            chapters: Word count of each verse, grouped by chapter
+        """
+        self.name = name
+        # chapter_starts[c - 1] is the ordinal of verse c:1; the final entry
+        # is the total number of verses in the book
+        self.chapter_starts = array("I", [0])
+        self.prefix = array("I", [0])
+        for verses in chapters:
+            self.chapter_starts.append(self.chapter_starts[-1] + len(verses))
+            for words in verses:
+                self.prefix.append(self.prefix[-1] + words)
+
+    @property
+    def chapter_count(self) -> int:
+        return len(self.chapter_starts) - 1
+
+    @property
+    def verse_total(self) -> int:
+        return self.chapter_starts[-1]
+
+    def chapter_length(self, chapter: int) -> int:
+        """Number of verses in a chapter."""
+        self._check_chapter(chapter)
+        return self.chapter_starts[chapter] - self.chapter_starts[chapter - 1]
+
+    def _check_chapter(self, chapter: int) -> None:
+        if not 1 <= chapter <= self.chapter_count:
+            raise ValueError(f"{self.name} has no chapter {chapter}")
+
+    def ordinal(self, chapter: int, verse: int) -> int:
+        """
+        Get the 0-based position of a verse within the book.
+
+        Args:
+            chapter: Chapter number
+            verse: Verse number within the chapter
+
+        Returns:
+            Verse ordinal
+        """
+        if not 1 <= verse <= self.chapter_length(chapter):
+            raise ValueError(f"{self.name} {chapter} has no verse {verse}")
+        return self.chapter_starts[chapter - 1] + verse - 1
+
+    def reference(self, ordinal: int) -> Tuple[int, int]:
+        """
+        Get the (chapter, verse) of a verse ordinal.
+
+        Args:
+            ordinal: 0-based verse position within the book
+
+        Returns:
+            (chapter, verse) tuple
+        """
+        if not 0 <= ordinal < self.verse_total:
+            raise ValueError(f"{self.name} has no verse ordinal {ordinal}")
+        # Binary search for the chapter containing the ordinal
+        low, high = 0, self.chapter_count
+        while high - low > 1:
+            mid = (low + high) // 2
+            if self.chapter_starts[mid] <= ordinal:
+                low = mid
+            else:
+                high = mid
+        return low + 1, ordinal - self.chapter_starts[low] + 1
+
+    def words_between(self, start: int, end: int) -> int:
+        """
+        Count words in the half-open ordinal range [start, end).
+
+        Args:
+            start: First verse ordinal
+            end: Ordinal one past the last verse
+
+        Returns:
+            Total word count
+        """
+        return self.prefix[end] - self.prefix[start]
+
+    def span(
+        self, start_chapter: int, start_verse: int, end_chapter: int, end_verse: int
+    ) -> Tuple[int, int]:
+        """
+        Convert an inclusive chapter:verse range to a half-open ordinal range.
+
+        Returns:
+            (start, end) ordinals with end exclusive
+        """
+        start = self.ordinal(start_chapter, start_verse)
+        end = self.ordinal(end_chapter, end_verse) + 1
+        if end <= start:
+            raise ValueError(
+                f"Empty range {self.name} {start_chapter}:{start_verse}-"
+                f"{end_chapter}:{end_verse}"
+            )
+        return start, end
+
+
+class VerseIndex:
+    """Per-verse word counts for all five books."""
+
+    def __init__(self, books: Dict[str, List[List[int]]]):
+        """
+        Build the index.
+
+        Args:
+            books: Book name -> per-chapter lists of per-verse word counts
+        """
+        self.books = {
+            name: BookIndex(name, chapters) for name, chapters in books.items()
+        }
+        self._raw = books
+
+    def book(self, name: str) -> BookIndex:
+        """Get the index for a book."""
+        try:
+            return self.books[name]
+        except KeyError:
+            raise ValueError(f"Unknown book: {name}") from None
+
+    def count_range(self, verse_range: Dict) -> Dict[str, int]:
+        """
+        Count words and verses in a parsed verse range.
+
+        Args:
+            verse_range: Parsed verse range dict from hebcal_fetcher
+
+        Returns:
+            Dict with 'word_count' and 'verse_count'
+        """
+        book = self.book(verse_range["book"])
+        start, end = book.span(
+            verse_range["start_chapter"],
+            verse_range["start_verse"],
+            verse_range["end_chapter"],
+            verse_range["end_verse"],
+        )
+        return {
+            "word_count": book.words_between(start, end),
+            "verse_count": end - start,
+        }
+
+    @classmethod
+    def from_chapter_store(
+        cls, store, count_words: Callable[[List[str]], List[int]]
+    ) -> "VerseIndex":
+        """
+        Build the index by tokenizing every chapter in a ChapterStore.
+
+        Args:
+            store: sefaria_fetcher.ChapterStore
+            count_words: Batch word counter returning one count per verse
+                         (count_hebrew_words_batch)
+
+        Returns:
+            VerseIndex covering the whole Torah
+        """
+        return cls(
+            {
+                book: [
+                    count_words(store.chapter(book, ch))
+                    for ch in range(1, chapters + 1)
+                ]
+                for book, chapters in TORAH_CHAPTERS.items()
+            }
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "VerseIndex":
+        """Load an index saved with save()."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path: Path) -> None:
+        """Save per-verse word counts as compact JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self._raw, f, separators=(",", ":"))
@@ -0,0 +1,458 @@
+"""
+Verse-level reading progress.
+
+Read verses are kept per book as an IntervalSet of verse ordinals from the
+VerseIndex, so partial aliyot can be recorded and completion is measured in
+words via the index's prefix sums. Verses marked individually are appended
+to a CSV log that is replayed on load and compacted into one row per
+interval.
+
+Complete aliyot stay in the ProgressTracker: the verses read are the logged
+ranges plus the ranges of the tracker's complete aliyot, so un-marking an
+aliyah keeps the verses that were marked on their own. Marking verses keeps
+the tracker in step: an aliyah whose verses are all read is marked
+complete, and a complete aliyah losing a verse is marked incomplete.
+
+Several worker processes may share one log: appends and compaction hold an
+exclusive lock on a sibling .lock file, and each process reads the rows the
+others appended (or reloads after another process compacts) before writing
+and before summarizing.
+"""
+
+import csv
+import io
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, TextIO, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: the log is single-process only
+    fcntl = None
+
+from backend.data_fetcher.catalog import Catalog
+from backend.data_fetcher.interval_set import IntervalSet
+from backend.data_fetcher.progress_tracker import ProgressTracker
+from backend.data_fetcher.verse_index import VerseIndex
+
+LOG_HEADER = ["op", "book", "start", "end", "timestamp"]
+
+
+Span = Tuple[str, int, int]
+
+
+class VerseProgress:
+    """Per-book sets of read verses, persisted as an append-only log."""
+
+    def __init__(
+        self,
+        log_path: Path,
+        verse_index: VerseIndex,
+        catalog: Catalog,
+        compact_every: int = 1000,
+    ):
+        """
+        Load verse progress from its log.
+
+        Args:
+            log_path: CSV log of range inserts and removals
+            verse_index: Per-verse word-count index
+            catalog: Reading catalog, used to map aliyot to verse ranges
+            compact_every: Number of log rows that triggers compaction
+        """
+        self.log_path = Path(log_path)
+        self.verse_index = verse_index
+        self.catalog = catalog
+        self.compact_every = max(1, compact_every)
+        self.lock_path = self.log_path.with_name(self.log_path.name + ".lock")
+        # Verses marked individually, as logged
+        self.books: Dict[str, IntervalSet] = {
+            name: IntervalSet() for name in verse_index.books
+        }
+        self.tracker: Optional[ProgressTracker] = None
+        # Complete aliyot of the attached tracker, and their verses per book
+        self._complete: Dict[tuple, Span] = {}
+        self._aliyot: Dict[str, IntervalSet] = {
+            name: IntervalSet() for name in verse_index.books
+        }
+        # Union of both sets, rebuilt per book after a change
+        self._read: Dict[str, IntervalSet] = {}
+        self._spans: Dict[str, List[Tuple[tuple, int, int]]] = {}
+        for aliyah in catalog.aliyot():
+            span = self.aliyah_span(aliyah.key)
+            if span is not None:
+                book, start, end = span
+                self._spans.setdefault(book, []).append((aliyah.key, start, end))
+        self._log: Optional[TextIO] = None
+        self._log_rows = 0
+        # Read handle on the log and the byte offset applied so far; holding
+        # it open keeps a replaced log's inode from being reused
+        self._reader: Optional[BinaryIO] = None
+        self._offset = 0
+        self.refresh()
+
+    def attach(self, tracker: ProgressTracker) -> None:
+        """
+        Count a tracker's complete aliyot as read and keep them in step.
+
+        Args:
+            tracker: Aliyah-level progress of the same reader
+        """
+        with tracker.lock:
+            self.tracker = tracker
+            for key, entry in tracker.load_progress().items():
+                if entry["is_complete"]:
+                    self._set_aliyah(key, True)
+            tracker.subscribe(self.on_aliyah_change)
+
+    def refresh(self) -> None:
+        """Catch up with changes made by other processes."""
+        if self.tracker is not None:
+            self.tracker.load_progress()
+        self._refresh_log()
+
+    def _refresh_log(self) -> None:
+        """
+        Apply rows appended to the log since it was last read.
+
+        The log is reloaded from the start if it was replaced (compacted) or
+        truncated by another process.
+        """
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return
+        if self._reading(stat):
+            if stat.st_size == self._offset:
+                return
+        else:
+            # Our append handle, if any, points at the replaced file
+            self.close()
+            self.books = {name: IntervalSet() for name in self.verse_index.books}
+            self._read = {}
+            self._reader = open(self.log_path, "rb")
+            self._offset = 0
+            self._log_rows = 0
+
+        self._reader.seek(self._offset)
+        data = self._reader.read()
+        # A concurrent append may still be writing its last line
+        data = data[: data.rfind(b"\n") + 1]
+        self._offset += len(data)
+        self._log_rows += self._replay(data.decode("utf-8"))
+
+    def _reading(self, stat: os.stat_result) -> bool:
+        """Whether the read handle is on the current log and not past its end."""
+        if self._reader is None:
+            return False
+        reader = os.fstat(self._reader.fileno())
+        return (reader.st_dev, reader.st_ino) == (stat.st_dev, stat.st_ino) and (
+            stat.st_size >= self._offset
+        )
+
+    def _mark_read(self) -> None:
+        """Record our own writes as read; the caller holds the lock."""
+        stat = os.stat(self.log_path)
+        if not self._reading(stat):
+            if self._reader is not None:
+                self._reader.close()
+            self._reader = open(self.log_path, "rb")
+        self._offset = stat.st_size
+
+    def _replay(self, text: str) -> int:
+        """Apply log rows. Returns the number of rows applied."""
+        rows = 0
+        for row in csv.reader(io.StringIO(text, newline="")):
+            if len(row) != len(LOG_HEADER) or row[0] not in ("add", "remove"):
+                continue
+            op, book, start, end, _ = row
+            try:
+                self._apply(op, book, int(start), int(end))
+            except (ValueError, KeyError):
+                continue
+            rows += 1
+        return rows
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """Hold the log's cross-process lock and catch up with other writers."""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh_log()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _apply(self, op: str, book: str, start: int, end: int) -> None:
+        intervals = self.books[book]
+        if op == "add":
+            intervals.add(start, end)
+        else:
+            intervals.remove(start, end)
+        self._read.pop(book, None)
+
+    def _set_aliyah(self, key: tuple, is_complete: bool) -> Optional[Span]:
+        """Add or drop a complete aliyah's verses. Returns its span if changed."""
+        span = self.aliyah_span(key)
+        if span is None or (key in self._complete) == is_complete:
+            return None
+        book = span[0]
+        if is_complete:
+            self._complete[key] = span
+            self._aliyot[book].add(span[1], span[2])
+        else:
+            del self._complete[key]
+            # Rebuilt rather than removed, in case aliyot overlap
+            self._aliyot[book] = IntervalSet()
+            for other_book, start, end in self._complete.values():
+                if other_book == book:
+                    self._aliyot[book].add(start, end)
+        self._read.pop(book, None)
+        return span
+
+    def _read_set(self, book: str) -> IntervalSet:
+        """Verses of a book read individually or as part of a complete aliyah."""
+        read = self._read.get(book)
+        if read is None:
+            read = IntervalSet()
+            for intervals in (self.books[book], self._aliyot[book]):
+                for start, end in intervals:
+                    read.add(start, end)
+            self._read[book] = read
+        return read
+
+    def aliyah_span(self, key: tuple) -> Optional[Span]:
+        """
+        Get the verse ordinal range of an aliyah.
+
+        Args:
+            key: (parsha_name, aliyah_number) tuple
+
+        Returns:
+            (book, start, end) with end exclusive, or None if unknown
+        """
+        aliyah = self.catalog.by_key.get(key)
+        if aliyah is None:
+            return None
+        parsed = aliyah.parsed
+        try:
+            start, end = self.verse_index.book(parsed["book"]).span(
+                parsed["start_chapter"],
+                parsed["start_verse"],
+                parsed["end_chapter"],
+                parsed["end_verse"],
+            )
+        except ValueError:
+            return None
+        return parsed["book"], start, end
+
+    def on_aliyah_change(self, key: tuple, old: Optional[Dict], new: Dict) -> None:
+        """
+        ProgressTracker listener counting an aliyah's verses as read or not.
+
+        An aliyah marked incomplete whose verses were all marked on their own
+        has them removed, so it doesn't still read as complete.
+        """
+        span = self._set_aliyah(key, new["is_complete"])
+        if span is None or new["is_complete"]:
+            return
+        with self._exclusive():
+            if self._read_set(span[0]).contains(span[1], span[2]):
+                self._write([("remove",) + span])
+
+    def read_in(self, book: str, start: int, end: int) -> Tuple[int, int]:
+        """
+        Count the read verses and words in a half-open ordinal range.
+
+        Call refresh() first to include other processes' changes.
+
+        Returns:
+            (verses, words) read
+        """
+        index = self.verse_index.book(book)
+        verses = words = 0
+        for s, e in self._read_set(book).overlapping(start, end):
+            verses += e - s
+            words += index.words_between(s, e)
+        return verses, words
+
+    def mark_range(
+        self,
+        book: str,
+        start_chapter: int,
+        start_verse: int,
+        end_chapter: int,
+        end_verse: int,
+        is_complete: bool,
+    ) -> None:
+        """
+        Mark an inclusive chapter:verse range as read or unread.
+
+        Raises:
+            ValueError: If the range isn't valid for the book
+        """
+        start, end = self.verse_index.book(book).span(
+            start_chapter, start_verse, end_chapter, end_verse
+        )
+        self.mark(book, start, end, is_complete)
+
+    def mark(self, book: str, start: int, end: int, is_complete: bool) -> None:
+        """
+        Mark a half-open ordinal range as read or unread.
+
+        Aliyot of the attached tracker are kept in step: those now fully read
+        are marked complete, and complete ones losing verses are marked
+        incomplete with their other verses kept as read.
+        """
+        op = "add" if is_complete else "remove"
+        if self.tracker is None:
+            self.record([(op, book, start, end)])
+            return
+
+        with self.tracker.lock:
+            self.refresh()
+            touched = [
+                (key, span_start, span_end)
+                for key, span_start, span_end in self._spans.get(book, ())
+                if span_start < end and start < span_end
+            ]
+            if is_complete:
+                self.record([(op, book, start, end)])
+                read = self._read_set(book)
+                updates = [
+                    key + (True,)
+                    for key, span_start, span_end in touched
+                    if key not in self._complete and read.contains(span_start, span_end)
+                ]
+            else:
+                done = [span for span in touched if span[0] in self._complete]
+                self.record(
+                    [("add", book, s, e) for _, s, e in done] + [(op, book, start, end)]
+                )
+                updates = [key + (False,) for key, _, _ in done]
+            self.tracker.apply_updates(updates)
+
+    def record(self, ops: List[Tuple[str, str, int, int]]) -> None:
+        """
+        Apply and log a batch of (op, book, start, end) changes.
+
+        Only individually marked verses change; mark() keeps aliyot in step.
+
+        Args:
+            ops: Changes with op "add" or "remove" and end exclusive
+        """
+        with self._exclusive():
+            self._write(ops)
+
+    def _write(self, ops: List[Tuple[str, str, int, int]]) -> None:
+        """Apply and log changes; the caller holds the cross-process lock."""
+        if self._log is None:
+            is_new = not self.log_path.exists()
+            self._log = open(self.log_path, "a", newline="", encoding="utf-8")
+            if is_new:
+                csv.writer(self._log).writerow(LOG_HEADER)
+
+        now = datetime.now().isoformat()
+        writer = csv.writer(self._log)
+        for op, book, start, end in ops:
+            self._apply(op, book, start, end)
+            writer.writerow([op, book, start, end, now])
+        self._log.flush()
+        self._log_rows += len(ops)
+        self._mark_read()
+
+        if self._log_rows >= self.compact_every:
+            self._compact()
+
+    def compact(self) -> None:
+        """Rewrite the log as one "add" row per stored interval."""
+        with self._exclusive():
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the log; the caller holds the cross-process lock."""
+        self.close()
+
+        now = datetime.now().isoformat()
+        tmp_path = self.log_path.with_name(self.log_path.name + ".tmp")
+        rows = 0
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(LOG_HEADER)
+            for book, intervals in self.books.items():
+                for start, end in intervals:
+                    writer.writerow(["add", book, start, end, now])
+                    rows += 1
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.log_path)
+        self._mark_read()
+        self._log_rows = rows
+
+    def close(self) -> None:
+        """Release the log file."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def summary(self) -> Dict:
+        """
+        Get read ranges and word/verse completion per book and overall.
+
+        Returns:
+            Dict with "books" (ranges plus counts per book) and "total"
+        """
+        self.refresh()
+        books = {}
+        totals = {"verses": [0, 0], "words": [0, 0]}
+
+        for name in self.books:
+            intervals = self._read_set(name)
+            book = self.verse_index.book(name)
+            read_verses = 0
+            read_words = 0
+            ranges = []
+            for start, end in intervals:
+                read_verses += end - start
+                read_words += book.words_between(start, end)
+                ranges.append(_format_range(book, start, end))
+
+            counts = {
+                "verses": [read_verses, book.verse_total],
+                "words": [read_words, book.prefix[-1]],
+            }
+            for metric, (done, whole) in counts.items():
+                totals[metric][0] += done
+                totals[metric][1] += whole
+            books[name] = {"ranges": ranges, **format_counts(counts)}
+
+        return {"books": books, "total": format_counts(totals)}
+
+
+def _format_range(book, start: int, end: int) -> str:
+    """Format a half-open ordinal range as "C:V-C:V"."""
+    start_ch, start_v = book.reference(start)
+    end_ch, end_v = book.reference(end - 1)
+    return f"{start_ch}:{start_v}-{end_ch}:{end_v}"
+
+
+def format_counts(counts: Dict[str, List[int]]) -> Dict:
+    """Format [completed, total] pairs as completed/total/percentage dicts."""
+    return {
+        "completed": {metric: done for metric, (done, _) in counts.items()},
+        "total": {metric: whole for metric, (_, whole) in counts.items()},
+        "percentage": {
+            metric: round(done / whole * 100, 1) if whole > 0 else 0
+            for metric, (done, whole) in counts.items()
+        },
+    }
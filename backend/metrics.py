@@ -0,0 +1,227 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms keep one series per label combination, created on
+first use. Recording a value is a dict lookup, a bisect into the bucket
+bounds and a few additions under the metric's lock, so instrumenting every
+request and storage call costs microseconds. Each server process keeps its
+own metrics; with several gunicorn workers, each scrape sees one worker.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Bucket upper bounds, in seconds and bytes
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)
+
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        """
+        Args:
+            name: Metric name, ending in _total
+            help_text: One-line description
+            labels: Label names, in the order values are passed
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Add to the series for the given label values."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Current value of a series (0 if it hasn't been recorded)."""
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> List[str]:
+        """Exposition lines for every series."""
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_labels(self.labels, key)} {_number(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram:
+    """Bucketed distribution per label combination."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        """
+        Args:
+            name: Metric name
+            help_text: One-line description
+            labels: Label names, in the order values are passed
+            buckets: Ascending bucket upper bounds (+Inf is implied)
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one value in the series for the given label values."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        """Observe the duration of a block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def count(self, *label_values: str) -> int:
+        """Number of values recorded in a series."""
+        series = self._series.get(label_values)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> List[str]:
+        """Exposition lines (cumulative buckets, sum and count) per series."""
+        with self._lock:
+            series = sorted((key, list(counts)) for key, counts in self._series.items())
+
+        lines = []
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        for key, counts in series:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _labels(self.labels + ("le",), key + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_number(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        """Add a metric and return it."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format a label set, e.g. '{route="/api/stats",method="GET"}'."""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Format a sample value without a trailing .0 for whole numbers."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time to handle a request, by route template",
+        ("route", "method"),
+    )
+)
+REQUESTS = REGISTRY.register(
+    Counter(
+        "http_requests_total",
+        "Requests handled, by route template and status",
+        ("route", "method", "status"),
+    )
+)
+RESPONSE_BYTES = REGISTRY.register(
+    Histogram(
+        "http_response_size_bytes",
+        "Response body size (streamed responses excluded)",
+        ("route",),
+        SIZE_BUCKETS,
+    )
+)
+CACHE_LOOKUPS = REGISTRY.register(
+    Counter(
+        "cache_lookups_total",
+        "Lookups in in-memory caches, by cache and hit or miss",
+        ("cache", "result"),
+    )
+)
+STORAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "progress_storage_duration_seconds",
+        "Time spent in progress storage, by backend and operation",
+        ("backend", "operation"),
+    )
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
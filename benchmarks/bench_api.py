@@ -0,0 +1,201 @@
+"""
+Benchmark the API and ProgressTracker across progress file sizes.
+
+Runs offline against the Flask test client with a throwaway progress file
+per size: empty, one row per aliyah, and stress sizes padded with rows for
+unknown parshiot (as left behind by renamed titles). Each case reports the
+mean, median and 95th percentile time per call; --json writes the results,
+and --compare prints the change from an earlier --json run.
+
+Usage:
+    uv run python -m benchmarks.bench_api [--sizes 0,378,5000,20000]
+        [--repeat N] [--json PATH] [--compare PATH]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict
+
+from backend.api import app as app_module
+from backend.data_fetcher.catalog import Catalog
+from backend.data_fetcher.progress_storage import write_csv
+from backend.data_fetcher.progress_tracker import ProgressTracker
+
+DEFAULT_SIZES = "0,378,5000,20000"
+
+
+def write_progress(path: Path, rows: int, catalog: Catalog) -> None:
+    """
+    Write a progress snapshot with the given number of rows.
+
+    Catalog aliyot come first, every other one complete; rows beyond the
+    catalog belong to unknown parshiot.
+    """
+    keys = [aliyah.key for aliyah in catalog.aliyot()][:rows]
+    keys += [
+        (f"Parashat Synthetic {i // 7}", i % 7 + 1) for i in range(rows - len(keys))
+    ]
+    now = datetime.now().isoformat()
+    write_csv(
+        path,
+        {
+            key: {
+                "is_complete": i % 2 == 0,
+                "date_completed": now if i % 2 == 0 else None,
+            }
+            for i, key in enumerate(keys)
+        },
+    )
+
+
+def measure(run: Callable[[int], object], repeat: int) -> Dict[str, float]:
+    """
+    Time repeated calls after one warm-up call.
+
+    Args:
+        run: Called with the iteration number
+        repeat: Number of timed calls
+
+    Returns:
+        Dict with calls, mean_ms, p50_ms, p95_ms and ops_per_sec
+    """
+    run(-1)
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        run(i)
+        times.append(time.perf_counter() - start)
+
+    times.sort()
+    mean = statistics.mean(times)
+    return {
+        "calls": repeat,
+        "mean_ms": round(mean * 1000, 4),
+        "p50_ms": round(times[len(times) // 2] * 1000, 4),
+        "p95_ms": round(times[int(len(times) * 0.95)] * 1000, 4),
+        "ops_per_sec": round(1 / mean, 1),
+    }
+
+
+def bench_size(
+    client, catalog: Catalog, directory: Path, rows: int, repeat: int
+) -> Dict[str, Dict[str, float]]:
+    """Run every case against a progress file with the given number of rows."""
+    path = directory / f"progress-{rows}.csv"
+    write_progress(path, rows, catalog)
+
+    def cold_start(_):
+        # Fresh tracker: read the file, then build the views the UI loads first
+        app_module.tracker = ProgressTracker(str(path))
+        client.get("/api/parshiot")
+        client.get("/api/stats")
+        app_module.tracker.close()
+
+    results = {"cold_start": measure(cold_start, max(repeat // 10, 5))}
+
+    app_module.tracker = tracker = ProgressTracker(str(path))
+    etag = client.get("/api/parshiot").headers["ETag"]
+    bereshit = catalog.parshiot[0]
+    url = f"/api/parshiot/{bereshit.title}/aliyot/1"
+
+    cases = {
+        "get_parshiot": lambda i: client.get("/api/parshiot"),
+        "get_parshiot_gzip": lambda i: client.get(
+            "/api/parshiot", headers={"Accept-Encoding": "gzip"}
+        ),
+        "get_parshiot_not_modified": lambda i: client.get(
+            "/api/parshiot", headers={"If-None-Match": etag}
+        ),
+        "get_stats": lambda i: client.get("/api/stats"),
+        "put_aliyah": lambda i: client.put(url, json={"is_complete": i % 2 == 0}),
+        "bulk_toggle_book": lambda i: client.patch(
+            "/api/aliyot", json={"book": bereshit.book, "is_complete": i % 2 == 0}
+        ),
+    }
+    for name, run in cases.items():
+        results[name] = measure(run, repeat)
+
+    tracker.close()
+    return results
+
+
+def git_commit() -> str:
+    """Short hash of the checked out commit, or "unknown"."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(results: Dict, baseline: Dict) -> None:
+    """Print the median change of each case from a baseline run."""
+    print(f"\nChange in p50 from {baseline['commit']}:")
+    for rows, cases in results["sizes"].items():
+        for name, stats in cases.items():
+            before = baseline["sizes"].get(rows, {}).get(name)
+            if before is None or not before["p50_ms"]:
+                continue
+            change = (stats["p50_ms"] / before["p50_ms"] - 1) * 100
+            print(f"  {rows:>6} rows  {name:28} {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--compare", type=Path, help="earlier --json results")
+    args = parser.parse_args()
+
+    catalog = app_module.load_catalog()
+    if len(catalog) == 0:
+        raise SystemExit("No catalog found; run initialize_data.py first")
+
+    app_module.app.config["TESTING"] = True
+    default_tracker = app_module.tracker
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+
+    client = app_module.app.test_client()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for rows in map(int, args.sizes.split(",")):
+                cases = bench_size(client, catalog, Path(directory), rows, args.repeat)
+                results["sizes"][str(rows)] = cases
+                print(f"{rows} progress rows")
+                for name, stats in cases.items():
+                    print(
+                        f"  {name:28} {stats['mean_ms']:9.3f} ms"
+                        f"  p50 {stats['p50_ms']:9.3f}  p95 {stats['p95_ms']:9.3f}"
+                        f"  {stats['ops_per_sec']:10,.0f}/s"
+                    )
+    finally:
+        app_module.tracker = default_tracker
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare:
+        print_comparison(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark Hebrew word counting over the full Torah text.
+
+Compares per-verse count_hebrew_words calls, the original
+substitute/split/filter implementation, and count_hebrew_words_batch on
+every verse. The text is read from the chapter store written by
+initialize_data.py; without it, a synthetic corpus of the same size is
+used.
+
+Usage:
+    uv run python -m benchmarks.bench_tokenizer [--chapter-dir DIR] [--repeat N]
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from backend.data_fetcher.sefaria_fetcher import (
+    ChapterStore,
+    count_hebrew_words,
+    count_hebrew_words_batch,
+)
+from backend.data_fetcher.verse_index import TORAH_CHAPTERS
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+TORAH_VERSES = 5846
+
+# Synthetic verses; roughly one in eight carries markup, as in Sefaria's text
+SAMPLE_VERSES = [
+    "בְּרֵאשִׁ֖ית בָּרָ֣א אֱלֹהִ֑ים אֵ֥ת הַשָּׁמַ֖יִם וְאֵ֥ת הָאָֽרֶץ׃",
+    "וַיֹּ֥אמֶר אֱלֹהִ֖ים יְהִ֣י א֑וֹר וַֽיְהִי־אֽוֹר׃",
+    "וַיַּ֧רְא אֱלֹהִ֛ים אֶת־הָא֖וֹר כִּי־ט֑וֹב וַיַּבְדֵּ֣ל אֱלֹהִ֔ים בֵּ֥ין הָא֖וֹר וּבֵ֥ין הַחֹֽשֶׁךְ׃",
+    "וַיִּקְרָ֨א אֱלֹהִ֤ים ׀ לָאוֹר֙ י֔וֹם וְלַחֹ֖שֶׁךְ קָ֣רָא לָ֑יְלָה וַֽיְהִי־עֶ֥רֶב וַֽיְהִי־בֹ֖קֶר י֥וֹם אֶחָֽד׃",
+    "וַיֹּ֣אמֶר אֱלֹהִ֔ים יְהִ֥י רָקִ֖יעַ בְּת֣וֹךְ הַמָּ֑יִם וִיהִ֣י מַבְדִּ֔יל בֵּ֥ין מַ֖יִם לָמָֽיִם׃",
+    "וַיִּקְרָ֧א אֱלֹהִ֛ים לָֽרָקִ֖יעַ שָׁמָ֑יִם וַֽיְהִי־עֶ֥רֶב וַֽיְהִי־בֹ֖קֶר י֥וֹם שֵׁנִֽי׃",
+    "וַיֹּ֣אמֶר אֱלֹהִ֗ים יִקָּו֨וּ הַמַּ֜יִם מִתַּ֤חַת הַשָּׁמַ֙יִם֙ אֶל־מָק֣וֹם אֶחָ֔ד וְתֵרָאֶ֖ה הַיַּבָּשָׁ֑ה וַֽיְהִי־כֵֽן׃",
+    'וַיְכֻלּ֛וּ הַשָּׁמַ֥יִם וְהָאָ֖רֶץ וְכָל־צְבָאָֽם׃ <span class="mam-spi-pe">{פ}</span><br>',
+]
+
+
+def legacy_count(text: str) -> int:
+    """The original implementation, kept as a baseline."""
+    text = re.sub(r"\{[^}]+\}", "", text)
+    words = [w.strip() for w in text.split() if w.strip()]
+    return len(words)
+
+
+def load_verses(chapter_dir: Path) -> List[str]:
+    """Load every Torah verse from the chapter store, or a synthetic corpus."""
+    if (chapter_dir / "Deuteronomy" / "34.json").exists():
+        store = ChapterStore(chapter_dir)
+        return [
+            verse
+            for book, chapters in TORAH_CHAPTERS.items()
+            for ch in range(1, chapters + 1)
+            for verse in store.chapter(book, ch)
+        ]
+
+    print(f"No chapter store in {chapter_dir}, using a synthetic corpus")
+    return [SAMPLE_VERSES[i % len(SAMPLE_VERSES)] for i in range(TORAH_VERSES)]
+
+
+def best_time(run: Callable[[], object], repeat: int) -> float:
+    """Fastest of several timed runs, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chapter-dir", type=Path, default=DATA_DIR / "chapters")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    verses = load_verses(args.chapter_dir)
+    words = sum(count_hebrew_words_batch(verses))
+    print(f"{len(verses)} verses, {words} words\n")
+
+    cases = {
+        "legacy per verse": lambda: [legacy_count(v) for v in verses],
+        "count_hebrew_words per verse": lambda: [count_hebrew_words(v) for v in verses],
+        "count_hebrew_words_batch": lambda: count_hebrew_words_batch(verses),
+        "count_hebrew_words_batch (maqaf)": lambda: count_hebrew_words_batch(
+            verses, split_maqaf=True
+        ),
+    }
+    for name, run in cases.items():
+        seconds = best_time(run, args.repeat)
+        print(
+            f"{name:34} {seconds * 1000:8.2f} ms"
+            f"  {len(verses) / seconds:12,.0f} verses/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
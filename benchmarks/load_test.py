@@ -0,0 +1,99 @@
+"""
+Load test a running API server for lost progress updates.
+
+Many client threads mark every aliyah complete, with several concurrent
+requests per aliyah, then mark them all incomplete again. After each phase
+the server's statistics must account for every aliyah; a lost update shows
+up as a count mismatch. Requests go to a throwaway user, so the default
+progress file is untouched.
+
+Usage:
+    uv run --extra prod gunicorn backend.api.app:app
+    uv run python -m benchmarks.load_test [--url URL] [--threads N]
+"""
+
+import argparse
+import secrets
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from urllib.parse import quote
+
+import requests
+
+
+def mark_all(
+    base: str, keys: List[Tuple[str, int]], state: bool, threads: int, copies: int
+) -> List[float]:
+    """
+    Send one PUT per aliyah and copy, from a pool of client threads.
+
+    Returns:
+        Request latencies in seconds
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=threads)
+    session.mount("http://", adapter)
+
+    def put(key: Tuple[str, int]) -> float:
+        started = time.perf_counter()
+        response = session.put(
+            f"{base}/parshiot/{quote(key[0], safe='')}/aliyot/{key[1]}",
+            json={"is_complete": state},
+        )
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(put, [key for key in keys for _ in range(copies)]))
+
+
+def completed_aliyot(base: str) -> Tuple[int, int]:
+    """Get (completed, total) aliyot from the stats endpoint."""
+    stats = requests.get(f"{base}/stats").json()
+    return stats["completed"]["aliyot"], stats["total"]["aliyot"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:5001")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument(
+        "--copies", type=int, default=4, help="concurrent requests per aliyah"
+    )
+    args = parser.parse_args()
+
+    base = f"{args.url.rstrip('/')}/api/users/loadtest-{secrets.token_hex(4)}"
+    keys = [
+        (parsha["title"], aliyah["number"])
+        for parsha in requests.get(f"{base}/parshiot").json()
+        for aliyah in parsha["aliyot"]
+    ]
+    if not keys:
+        sys.exit("The server has no catalog loaded")
+
+    failed = False
+    for state, expected in ((True, len(keys)), (False, 0)):
+        started = time.perf_counter()
+        latencies = sorted(mark_all(base, keys, state, args.threads, args.copies))
+        elapsed = time.perf_counter() - started
+        completed, total = completed_aliyot(base)
+
+        label = "complete" if state else "incomplete"
+        print(
+            f"mark {label:10} {len(latencies):6} requests"
+            f"  {len(latencies) / elapsed:8,.0f} req/s"
+            f"  p50 {latencies[len(latencies) // 2] * 1000:6.1f} ms"
+            f"  p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.1f} ms"
+            f"  completed {completed}/{total}"
+        )
+        if completed != expected:
+            print(f"  lost updates: expected {expected} completed aliyot")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
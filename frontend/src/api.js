@@ -26,9 +26,68 @@ export const api = {
     return response.json();
   },
 
+  async bulkUpdateAliyot(body) {
+    const response = await fetch(`${API_BASE_URL}/aliyot`, {
+      method: 'PATCH',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body)
+    });
+    if (!response.ok) throw new Error('Failed to update aliyot');
+    return response.json();
+  },
+
   async getStats() {
     const response = await fetch(`${API_BASE_URL}/stats`);
     if (!response.ok) throw new Error('Failed to fetch stats');
     return response.json();
+  },
+
+  async getSchedule({ date, count = 1, israel = false } = {}) {
+    const params = new URLSearchParams({ count, israel });
+    if (date) params.set('date', date);
+    const response = await fetch(`${API_BASE_URL}/schedule?${params}`);
+    if (!response.ok) throw new Error('Failed to fetch schedule');
+    return response.json();
+  },
+
+  // Calls onProgress with each {parsha, aliyah, is_complete, version} delta
+  // and onReset when the stream missed too much and data should be reloaded.
+  // Returns a function that closes the stream.
+  subscribeToProgress(onProgress, onReset) {
+    let source;
+    let retryTimer;
+    const connect = () => {
+      source = new EventSource(`${API_BASE_URL}/events`);
+      source.addEventListener('progress', (e) => onProgress(JSON.parse(e.data)));
+      source.addEventListener('reset', () => onReset && onReset());
+      // A 503 (too many open streams) closes the source for good; the new
+      // stream starts with a reset, so nothing missed meanwhile is lost
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+          retryTimer = setTimeout(connect, 10000 + Math.random() * 5000);
+        }
+      };
+    };
+    connect();
+    return () => {
+      clearTimeout(retryTimer);
+      source.close();
+    };
+  },
+
+  async getAnalytics(window = 30) {
+    const response = await fetch(`${API_BASE_URL}/analytics?window=${window}`);
+    if (!response.ok) throw new Error('Failed to fetch analytics');
+    return response.json();
+  },
+
+  async getPlan({ by, start, book, parsha }) {
+    const params = new URLSearchParams({ by });
+    if (start) params.set('start', start);
+    if (book) params.set('book', book);
+    if (parsha) params.set('parsha', parsha);
+    const response = await fetch(`${API_BASE_URL}/plan?${params}`);
+    if (!response.ok) throw new Error('Failed to fetch plan');
+    return response.json();
   }
 };
@@ -0,0 +1,45 @@
+"""
+Production server settings for gunicorn.
+
+    uv run --extra prod gunicorn backend.api.app:app
+
+gunicorn reads this file from the working directory. Each worker process
+serves requests on a pool of threads that share one ProgressTracker per
+user, guarded by the tracker's lock. Worker processes don't share memory, so
+more than one worker requires PROGRESS_DB (SQLite), which serializes writes
+across processes and lets each worker pick up the others' changes. Verse
+progress logs are shared the same way through a lock file beside each log.
+
+Environment:
+    PORT: Port to listen on (default 5001)
+    WEB_CONCURRENCY: Worker processes (default 1, or 2 * CPUs + 1 with
+        PROGRESS_DB set)
+    GUNICORN_THREADS: Threads per worker (default 16; open /api/events
+        streams each hold one, and at most half of them may be streams
+        unless MAX_EVENT_STREAMS says otherwise)
+"""
+
+import multiprocessing
+import os
+
+_shared_storage = bool(os.environ.get("PROGRESS_DB"))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+workers = int(
+    os.environ.get(
+        "WEB_CONCURRENCY",
+        2 * multiprocessing.cpu_count() + 1 if _shared_storage else 1,
+    )
+)
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "16"))
+# Event streams end on their own after EVENTS_MAX_SECONDS (25)
+timeout = 60
+graceful_timeout = 30
+accesslog = "-"
+
+if workers > 1 and not _shared_storage:
+    raise SystemExit(
+        "Running several workers requires PROGRESS_DB; CSV progress files "
+        "can only be written by one process"
+    )
@@ -1,8 +1,12 @@
 #!/bin/bash
 
-# Start Flask API in background
+# Start Flask API in background (./run.sh --prod serves it with gunicorn)
 echo "Starting Flask API on http://localhost:5001..."
-uv run python -m backend.api.app &
+if [ "$1" = "--prod" ]; then
+    uv run --extra prod gunicorn backend.api.app:app &
+else
+    uv run python -m backend.api.app &
+fi
 FLASK_PID=$!
 
 # Wait for Flask to start
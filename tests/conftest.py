@@ -0,0 +1,51 @@
+"""
+Fixtures shared across the test modules.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from backend.data_fetcher.catalog import Catalog, Parsha
+from backend.data_fetcher.verse_index import VerseIndex
+
+
+@pytest.fixture(scope="session")
+def torah_data_file():
+    """The bundled catalog JSON, found without importing the API app."""
+    return Path(__file__).parent.parent / "data" / "torah_readings_complete.json"
+
+
+@pytest.fixture
+def verse_index():
+    """Two chapters of five verses, word counts 1..10."""
+    return VerseIndex({"Genesis": [[1, 2, 3, 4, 5], [6, 7, 8, 9, 10]]})
+
+
+@pytest.fixture
+def catalog():
+    """A parsha with two aliyot covering chapters 1 and 2."""
+    aliyot = [
+        {
+            "number": n,
+            "verses": f"Genesis {n}:1-{n}:5",
+            "parsed": {
+                "book": "Genesis",
+                "start_chapter": n,
+                "start_verse": 1,
+                "end_chapter": n,
+                "end_verse": 5,
+            },
+            "verse_count": 5,
+        }
+        for n in (1, 2)
+    ]
+    parsha = {
+        "name": "בראשית",
+        "title": "Parashat Bereshit",
+        "book": "Genesis",
+        "book_order": 1,
+        "start_chapter": 1,
+        "aliyot": aliyot,
+    }
+    return Catalog([Parsha.from_dict(parsha)])
@@ -2,7 +2,11 @@
 Tests for Flask API endpoints.
 """
 
+import base64
+import gzip
 import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
@@ -50,3 +54,486 @@ def test_parshiot_endpoint(client):
         assert "title" in parsha
         assert "aliyot" in parsha
         assert isinstance(parsha["aliyot"], list)
+
+
+@pytest.fixture
+def tmp_tracker(tmp_path, monkeypatch):
+    """Point the API at a throwaway progress file."""
+    from backend.api import app as app_module
+    from backend.data_fetcher.progress_tracker import ProgressTracker
+
+    tracker = ProgressTracker(str(tmp_path / "progress.csv"))
+    monkeypatch.setattr(app_module, "tracker", tracker)
+    yield tracker
+    tracker.close()
+
+
+def test_update_aliyah_rejects_bad_requests(client, tmp_tracker):
+    """A missing body, a non-boolean flag or an unknown aliyah gets a 400."""
+    assert client.put("/api/parshiot/Parashat Noach/aliyot/1").status_code == 400
+    for path, body in (
+        ("Parashat Noach/aliyot/1", {}),
+        ("Parashat Noach/aliyot/1", {"is_complete": "true"}),
+        ("Parashat Noach/aliyot/9", {"is_complete": True}),
+        ("Parashat Maccabees/aliyot/1", {"is_complete": True}),
+    ):
+        response = client.put(f"/api/parshiot/{path}", json=body)
+        assert response.status_code == 400
+    assert tmp_tracker.load_progress() == {}
+    assert tmp_tracker.version == 0
+
+
+def test_bulk_update_list(client, tmp_tracker):
+    """Bulk PATCH applies a list of updates in one call."""
+    response = client.patch(
+        "/api/aliyot",
+        json={
+            "updates": [
+                {"parsha": "Parashat Noach", "aliyah": 1, "is_complete": True},
+                {"parsha": "Parashat Noach", "aliyah": 2, "is_complete": True},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert json.loads(response.data)["updated"] == 2
+    progress = tmp_tracker.load_progress()
+    assert progress[("Parashat Noach", 2)]["is_complete"] is True
+
+
+def test_bulk_update_parsha_selector(client, tmp_tracker):
+    """Bulk PATCH with a parsha selector marks every aliyah."""
+    response = client.patch(
+        "/api/aliyot", json={"parsha": "Parashat Bereshit", "is_complete": True}
+    )
+    assert response.status_code == 200
+    assert json.loads(response.data)["updated"] == 7
+
+
+def test_bulk_update_unknown_book(client, tmp_tracker):
+    """Unknown selectors are rejected."""
+    response = client.patch(
+        "/api/aliyot", json={"book": "Maccabees", "is_complete": True}
+    )
+    assert response.status_code == 404
+
+
+def test_bulk_update_rejects_bad_updates(client, tmp_tracker):
+    """Bad or missing flags and unknown aliyot are rejected before any write."""
+    for update in (
+        {"parsha": "Parashat Noach", "aliyah": 1, "is_complete": "false"},
+        {"parsha": "Parashat Noach", "aliyah": 1, "is_complete": 0},
+        {"parsha": "Parashat Noach", "aliyah": 1},
+        {"parsha": "Parashat Noach", "aliyah": 9, "is_complete": True},
+        {"parsha": "Parashat Maccabees", "aliyah": 1, "is_complete": True},
+    ):
+        response = client.patch(
+            "/api/aliyot",
+            json={
+                "updates": [
+                    {"parsha": "Parashat Noach", "aliyah": 2, "is_complete": True},
+                    update,
+                ]
+            },
+        )
+        assert response.status_code == 400
+    for selector in (
+        {"parsha": "Parashat Noach", "is_complete": "yes"},
+        {"book": "Genesis"},
+    ):
+        assert client.patch("/api/aliyot", json=selector).status_code == 400
+    assert tmp_tracker.load_progress() == {}
+
+
+def test_stats_follow_updates(client, tmp_tracker):
+    """Stats reflect toggles without a rescan."""
+    before = json.loads(client.get("/api/stats").data)
+    assert before["completed"]["aliyot"] == 0
+
+    client.put("/api/parshiot/Parashat Noach/aliyot/1", json={"is_complete": True})
+    after = json.loads(client.get("/api/stats").data)
+    noach = after["by_parsha"]["Parashat Noach"]
+    assert after["completed"]["aliyot"] == 1
+    assert noach["completed"]["aliyot"] == 1
+    assert after["by_book"]["Genesis"]["completed"]["words"] == (
+        noach["completed"]["words"]
+    )
+    assert after["total"] == before["total"]
+
+
+def test_conditional_get(client, tmp_tracker):
+    """Matching If-None-Match gets a 304 until progress changes."""
+    first = client.get("/api/parshiot")
+    etag = first.headers["ETag"]
+
+    cached = client.get("/api/parshiot", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    client.put("/api/parshiot/Parashat Noach/aliyot/1", json={"is_complete": True})
+    changed = client.get("/api/stats", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_if_modified_since_within_the_same_second(client, tmp_tracker, monkeypatch):
+    """Last-Modified is withheld, and ignored, until its second has passed."""
+    from backend.api import app as app_module
+
+    clock = [datetime(2025, 1, 1, 12, 0, 0, 500000, tzinfo=timezone.utc)]
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock[0]
+
+    monkeypatch.setattr(app_module, "datetime", FrozenDatetime)
+    tmp_tracker.load_progress()
+    tmp_tracker.last_modified = datetime(2025, 1, 1, 12, 0, 0, 100000, timezone.utc)
+    since = {"If-Modified-Since": "Wed, 01 Jan 2025 12:00:00 GMT"}
+
+    # Another change could still land in 12:00:00
+    fresh = client.get("/api/stats", headers=since)
+    assert fresh.status_code == 200
+    assert "Last-Modified" not in fresh.headers
+
+    clock[0] += timedelta(seconds=1)
+    settled = client.get("/api/stats")
+    assert settled.headers["Last-Modified"] == since["If-Modified-Since"]
+    assert client.get("/api/stats", headers=since).status_code == 304
+
+
+def test_progress_bitset(client, tmp_tracker):
+    """Compact progress reflects toggles in canonical slot order."""
+    empty = json.loads(client.get("/api/progress").data)
+    assert empty["count"] == 378
+    assert base64.b64decode(empty["data"]) == bytes(48)
+
+    client.put("/api/parshiot/Parashat Noach/aliyot/1", json={"is_complete": True})
+    bits = json.loads(client.get("/api/progress").data)
+    # Noach follows Bereshit's 7 aliyot, so its first aliyah is slot 7
+    assert base64.b64decode(bits["data"])[0] == 0x01
+    assert bits["version"] == empty["version"] + 1
+
+    runs = json.loads(client.get("/api/progress?encoding=rle").data)
+    assert runs["data"] == [7, 1, 370]
+
+
+@pytest.fixture
+def tmp_users(tmp_path, monkeypatch):
+    """Point per-user storage at a throwaway directory."""
+    from backend.api import app as app_module
+    from backend.data_fetcher.progress_registry import TrackerRegistry
+
+    monkeypatch.setattr(app_module, "USERS_DIR", tmp_path / "users")
+    registry = TrackerRegistry(app_module.create_user_tracker, max_loaded=2)
+    monkeypatch.setattr(app_module, "users", registry)
+    yield registry
+    registry.close()
+
+
+def test_user_progress_is_isolated(client, tmp_tracker, tmp_users):
+    """Each user's updates are tracked separately from the default store."""
+    client.put(
+        "/api/users/alice/parshiot/Parashat Noach/aliyot/1",
+        json={"is_complete": True},
+    )
+
+    alice = json.loads(client.get("/api/users/alice/stats").data)
+    bob = json.loads(client.get("/api/users/bob/stats").data)
+    default = json.loads(client.get("/api/stats").data)
+    assert alice["completed"]["aliyot"] == 1
+    assert bob["completed"]["aliyot"] == 0
+    assert default["completed"]["aliyot"] == 0
+
+
+def test_user_trackers_evicted_and_reloaded(client, tmp_users):
+    """Evicted users reload their progress from their shard."""
+    client.patch(
+        "/api/users/alice/aliyot", json={"parsha": "Parashat Bo", "is_complete": False}
+    )
+    client.patch(
+        "/api/users/alice/aliyot", json={"parsha": "Parashat Bo", "is_complete": True}
+    )
+    client.get("/api/users/bob/stats")
+    client.get("/api/users/carol/stats")
+    assert "alice" not in tmp_users
+    assert len(tmp_users) == 2
+
+    alice = json.loads(client.get("/api/users/alice/stats").data)
+    assert alice["by_parsha"]["Parashat Bo"]["completed"]["aliyot"] == 7
+
+
+def test_held_trackers_are_not_evicted(client, tmp_users):
+    """A tracker still in use stays loaded, so no second one opens its store."""
+    alice = tmp_users.acquire("alice")
+    client.get("/api/users/bob/stats")
+    client.get("/api/users/carol/stats")
+    assert "alice" in tmp_users
+    assert "bob" not in tmp_users
+
+    client.put(
+        "/api/users/alice/parshiot/Parashat Noach/aliyot/1",
+        json={"is_complete": True},
+    )
+    assert alice.load_progress()[("Parashat Noach", 1)]["is_complete"] is True
+    tmp_users.release("alice")
+
+    client.get("/api/users/dave/stats")
+    client.get("/api/users/erin/stats")
+    assert "alice" not in tmp_users
+    alice = json.loads(client.get("/api/users/alice/stats").data)
+    assert alice["completed"]["aliyot"] == 1
+
+
+def test_invalid_user_id(client, tmp_users):
+    """User ids that aren't safe file names are rejected."""
+    for user_id in ("a..b!", "alice.verses"):
+        response = client.get(f"/api/users/{user_id}/stats")
+        assert response.status_code == 400
+
+
+def test_range_counts(client, monkeypatch):
+    """Arbitrary ranges are counted from the verse index."""
+    from backend.api import app as app_module
+    from backend.data_fetcher.verse_index import VerseIndex
+
+    verse_index = VerseIndex({"Genesis": [[3, 4, 5], [6, 7]]})
+    monkeypatch.setattr(app_module, "_verse_index_cache", verse_index)
+
+    response = client.get("/api/counts?range=Genesis 1:3-2:2")
+    assert json.loads(response.data) == {
+        "range": "Genesis 1:3-2:2",
+        "word_count": 18,
+        "verse_count": 3,
+    }
+    assert client.get("/api/counts?range=Genesis 3:1-3:2").status_code == 400
+
+
+@pytest.fixture
+def tmp_verses(tmp_path, monkeypatch):
+    """Verse index for Genesis 1-2 and a throwaway verse log."""
+    from backend.api import app as app_module
+    from backend.data_fetcher.verse_index import VerseIndex
+
+    verse_index = VerseIndex({"Genesis": [[1] * 31, [1] * 25]})
+    monkeypatch.setattr(app_module, "_verse_index_cache", verse_index)
+    monkeypatch.setattr(app_module, "VERSE_PROGRESS_FILE", tmp_path / "verses.csv")
+    return verse_index
+
+
+def test_verse_updates_need_boolean(client, tmp_tracker, tmp_verses):
+    """is_complete must be a JSON boolean, not a truthy string or number."""
+    for flag in ("false", 0):
+        response = client.put(
+            "/api/verses", json={"range": "Genesis 1:1-1:3", "is_complete": flag}
+        )
+        assert response.status_code == 400
+
+    response = client.put("/api/verses", json={"range": "Genesis 1:1-1:3"})
+    assert response.status_code == 200
+    verses = json.loads(client.get("/api/verses").data)
+    assert verses["books"]["Genesis"]["ranges"] == ["1:1-1:3"]
+
+
+def test_verses_complete_aliyot(client, tmp_tracker, tmp_verses):
+    """Reading every verse of an aliyah completes it for the stats too."""
+    client.put("/api/verses", json={"range": "Genesis 1:1-2:3", "is_complete": True})
+    stats = json.loads(client.get("/api/stats").data)
+    assert stats["completed"]["aliyot"] == 1
+
+    client.put("/api/verses", json={"range": "Genesis 1:5-1:5", "is_complete": False})
+    stats = json.loads(client.get("/api/stats").data)
+    assert stats["completed"]["aliyot"] == 0
+    verses = json.loads(client.get("/api/verses").data)
+    assert verses["books"]["Genesis"]["ranges"] == ["1:1-1:4", "1:6-2:3"]
+
+
+def test_schedule(client, tmp_tracker, monkeypatch):
+    """Upcoming readings come from the calendar index with progress attached."""
+    from backend.api import app as app_module
+    from backend.data_fetcher.calendar_index import CalendarIndex
+
+    calendar = CalendarIndex(
+        {
+            "diaspora": [
+                ("2025-07-19", "Parashat Pinchas", ("Parashat Pinchas",)),
+                (
+                    "2025-07-26",
+                    "Parashat Matot-Masei",
+                    ("Parashat Matot", "Parashat Masei"),
+                ),
+            ]
+        }
+    )
+    monkeypatch.setattr(app_module, "_calendar_cache", calendar)
+    tmp_tracker.mark_complete("Parashat Matot", 1)
+
+    response = client.get("/api/schedule?date=2025-07-20&count=5")
+    data = json.loads(response.data)
+    assert [r["title"] for r in data["readings"]] == ["Parashat Matot-Masei"]
+    reading = data["readings"][0]
+    assert reading["combined"]
+    assert reading["progress"]["Parashat Matot"]["completed"]["aliyot"] == 1
+
+    assert client.get("/api/schedule?date=soon").status_code == 400
+
+
+def test_plan_follows_progress(client, tmp_tracker):
+    """Plans cover only unfinished aliyot and are rebuilt after toggles."""
+    url = "/api/plan?book=Numbers&start=2026-05-01&by=2026-05-21"
+    data = json.loads(client.get(url).data)
+    assert data["days"] == 21
+    assert sum(len(day["aliyot"]) for day in data["schedule"]) == 70
+    assert max(day["words"] for day in data["schedule"]) == data["max_words_per_day"]
+
+    tmp_tracker.mark_complete("Parashat Bamidbar", 1)
+    data = json.loads(client.get(url).data)
+    assert data["remaining"]["aliyot"] == 69
+    assert data["schedule"][0]["aliyot"][0]["aliyah"] == 2
+
+    assert client.get("/api/plan?by=2000-01-01").status_code == 400
+    assert client.get(url + "&parsha=Parashat Nowhere").status_code == 400
+
+
+def test_analytics_endpoint(client, tmp_tracker):
+    """Marked aliyot show up in today's bucket."""
+    tmp_tracker.mark_complete("Parashat Noach", 1)
+    data = json.loads(client.get("/api/analytics?window=7").data)
+    assert data["daily"][-1]["aliyot"] == 1
+    assert data["streak"]["current"] == 1
+    assert client.get("/api/analytics?today=someday").status_code == 400
+
+
+def test_event_stream_resumes(client, tmp_tracker):
+    """Reconnecting with Last-Event-ID replays missed deltas; stale ids reset."""
+    first = client.get("/api/events?timeout=0")
+    assert first.mimetype == "text/event-stream"
+    assert "event: progress" not in first.get_data(as_text=True)
+
+    from backend.api import app as app_module
+
+    events = app_module.get_events(tmp_tracker)
+    tmp_tracker.mark_complete("Parashat Noach", 1)
+    tmp_tracker.mark_incomplete("Parashat Noach", 1)
+
+    body = client.get(
+        "/api/events?timeout=0", headers={"Last-Event-ID": events.event_id(0)}
+    ).get_data(as_text=True)
+    payloads = [
+        json.loads(line[len("data: ") :])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert [(p["aliyah"], p["is_complete"]) for p in payloads] == [
+        (1, True),
+        (1, False),
+    ]
+    assert payloads[-1]["version"] == tmp_tracker.version
+
+    stale = client.get("/api/events?timeout=0", headers={"Last-Event-ID": "old-3"})
+    assert "event: reset" in stale.get_data(as_text=True)
+
+
+def test_event_streams_capped(client, tmp_tracker, monkeypatch):
+    """Streams past the cap get a 503; finished streams free their slot."""
+    import threading
+
+    from backend.api import app as app_module
+
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(app_module, "_event_streams", slots)
+    slots.acquire()
+    refused = client.get("/api/events?timeout=0")
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "10"
+
+    slots.release()
+    with client.get("/api/events?timeout=0") as response:
+        assert response.status_code == 200
+        response.get_data()
+    assert slots.acquire(blocking=False)
+
+
+def test_concurrent_puts_lose_no_updates(tmp_tracker):
+    """Threaded requests marking the same aliyot are all accounted for."""
+    keys = [("Parashat Noach", n) for n in range(1, 8)] * 6
+
+    def put(key):
+        with app.test_client() as client:
+            return client.put(
+                f"/api/parshiot/{key[0]}/aliyot/{key[1]}", json={"is_complete": True}
+            ).status_code
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        assert set(pool.map(put, keys)) == {200}
+
+    assert tmp_tracker.version == 7
+    with app.test_client() as client:
+        stats = json.loads(client.get("/api/stats").data)
+    assert stats["by_parsha"]["Parashat Noach"]["completed"]["aliyot"] == 7
+
+
+def test_metrics_endpoint(client, tmp_tracker):
+    """Requests and progress writes show up in the Prometheus output."""
+    client.get("/api/stats")
+    client.put("/api/parshiot/Parashat Noach/aliyot/1", json={"is_complete": True})
+
+    response = client.get("/api/metrics")
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert 'http_requests_total{route="/api/stats",method="GET",status="200"}' in text
+    assert 'http_request_duration_seconds_count{route="/api/stats",method="GET"}' in (
+        text
+    )
+    assert 'http_response_size_bytes_bucket{route="/api/stats",le="+Inf"}' in text
+    assert 'cache_lookups_total{cache="catalog",result="hit"}' in text
+    assert (
+        'progress_storage_duration_seconds_count{backend="CsvJournalStorage",'
+        'operation="write"}' in text
+    )
+
+
+def test_parshiot_compressed_per_state(client, tmp_tracker):
+    """Catalog bodies are gzipped, revalidate, and change with progress."""
+    headers = {"Accept-Encoding": "gzip"}
+    plain = client.get("/api/parshiot")
+    first = client.get("/api/parshiot", headers=headers)
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["Vary"]
+    assert gzip.decompress(first.data) == plain.data
+
+    etag = first.headers["ETag"]
+    assert etag.startswith("W/")
+    revalidated = client.get(
+        "/api/parshiot", headers={**headers, "If-None-Match": etag}
+    )
+    assert revalidated.status_code == 304
+
+    tmp_tracker.mark_complete("Parashat Noach", 1)
+    second = client.get("/api/parshiot", headers=headers)
+    assert second.headers["ETag"] != etag
+    assert gzip.decompress(second.data) == client.get("/api/parshiot").data
+
+    small = client.get("/api/health", headers=headers)
+    assert "Content-Encoding" not in small.headers
+
+
+def test_cycle_portion_updates(client, tmp_users, monkeypatch, verse_index):
+    """Portions are marked by label and number; bad bodies are rejected."""
+    from backend.api import app as app_module
+    from backend.data_fetcher.reading_cycle import ReadingCycle
+
+    cycle = ReadingCycle.from_rows(
+        "custom", [["Week 1", 1, "Genesis 1:1-1:3"]], verse_index
+    )
+    monkeypatch.setattr(app_module, "_verse_index_cache", verse_index)
+    monkeypatch.setattr(app_module, "_cycles_cache", {"custom": cycle})
+    url = "/api/users/alice/cycles/custom/portions"
+
+    assert client.put(url, json={"label": "Week 1", "number": "one"}).status_code == 400
+    assert client.put(url, json={"label": "Week 2", "number": 1}).status_code == 404
+    assert client.put(url, json={"label": "Week 1", "number": 1}).status_code == 200
+
+    data = json.loads(client.get("/api/users/alice/cycles/custom").data)
+    assert data["portions"][0]["is_complete"] is True
+    assert client.get("/api/users/alice/cycles/triennial").status_code == 404
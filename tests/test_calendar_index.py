@@ -0,0 +1,65 @@
+"""
+Tests for the weekly reading calendar index.
+"""
+
+import json
+
+from backend.data_fetcher.calendar_index import CalendarIndex
+from backend.data_fetcher.hebcal_fetcher import stream_calendar_entries
+
+HEBCAL_RESPONSE = {
+    "items": [
+        {"category": "parashat", "date": "2025-10-25", "title": "Parashat Noach"},
+        {"category": "holiday", "date": "2025-10-22", "title": "Isru Chag"},
+        {
+            "category": "parashat",
+            "date": "2025-11-01",
+            "title": "Parashat Lech-Lecha",
+        },
+        {
+            "category": "parashat",
+            "date": "2025-07-26",
+            "title": "Parashat Matot-Masei",
+        },
+    ]
+}
+
+
+class FakeSession:
+    """Serves HEBCAL_RESPONSE for every request."""
+
+    def iter_bytes(self, url, params=None):
+        yield json.dumps(HEBCAL_RESPONSE).encode()
+
+
+def calendar_entries():
+    """Calendar entries for HEBCAL_RESPONSE, fetched as a single year."""
+    return stream_calendar_entries([2025], FakeSession())
+
+
+def test_calendar_entries_keep_combined_parshiot():
+    """Combined readings are split into their parts; hyphenated names aren't."""
+    entries = calendar_entries()
+    assert ("2025-11-01", "Parashat Lech-Lecha", ("Parashat Lech-Lecha",)) in entries
+    assert (
+        "2025-07-26",
+        "Parashat Matot-Masei",
+        ("Parashat Matot", "Parashat Masei"),
+    ) in entries
+    assert len(entries) == 3
+
+
+def test_upcoming_by_bisect(tmp_path):
+    """Readings on or after a date are returned in order, and survive a reload."""
+    index = CalendarIndex({"diaspora": calendar_entries()})
+    path = tmp_path / "calendar_index.json"
+    index.save(path)
+    index = CalendarIndex.load(path)
+
+    titles = [r["title"] for r in index.upcoming("2025-07-27", count=5)]
+    assert titles == ["Parashat Noach", "Parashat Lech-Lecha"]
+
+    (reading,) = index.upcoming("2025-07-26")
+    assert reading["combined"]
+    assert reading["parshiot"] == ["Parashat Matot", "Parashat Masei"]
+    assert index.upcoming("2026-01-01") == []
@@ -0,0 +1,107 @@
+"""
+Tests for the immutable reading catalog.
+"""
+
+import json
+import os
+
+import pytest
+
+from backend.data_fetcher.catalog import Catalog
+
+
+@pytest.fixture(scope="module")
+def catalog(torah_data_file):
+    """Catalog loaded from the bundled data file."""
+    return Catalog.from_json(torah_data_file)
+
+
+def test_indexes(catalog):
+    """Parshiot and aliyot are reachable by title and key."""
+    parsha = catalog.by_title["Parashat Noach"]
+    assert catalog.by_key[("Parashat Noach", 3)] is parsha.aliyot[2]
+    assert parsha in catalog.by_book["Genesis"]
+
+
+def test_records_are_immutable(catalog):
+    """Catalog records reject attribute writes."""
+    parsha = catalog.by_title["Parashat Noach"]
+    with pytest.raises(AttributeError):
+        parsha.title = "changed"
+    with pytest.raises(TypeError):
+        parsha.aliyot[0].parsed["book"] = "changed"
+
+
+def test_progress_overlay_does_not_mutate(catalog):
+    """Overlaying progress leaves the catalog untouched."""
+    parsha = catalog.by_title["Parashat Noach"]
+    progress = {
+        ("Parashat Noach", 1): {"is_complete": True, "date_completed": "2025-01-01"}
+    }
+
+    data = parsha.to_dict(progress)
+    assert data["aliyot"][0]["is_complete"] is True
+    assert data["aliyot"][1]["is_complete"] is False
+    assert not hasattr(parsha.aliyot[0], "__dict__")
+
+
+def test_render_matches_dict(catalog):
+    """Pre-serialized rendering decodes to the same structure as to_dict."""
+    progress = {
+        ("Parashat Noach", 2): {"is_complete": True, "date_completed": "2025-01-01"},
+        ("Parashat Noach", 3): {"is_complete": False, "date_completed": None},
+    }
+
+    rendered = json.loads(catalog.render(progress))
+    assert rendered == [parsha.to_dict(progress) for parsha in catalog]
+
+
+def test_binary_round_trip(catalog, tmp_path, torah_data_file):
+    """The binary catalog renders and exports exactly like the JSON one."""
+    path = tmp_path / "catalog.bin"
+    catalog.save_binary(path)
+    loaded = Catalog.from_binary(path)
+
+    progress = {
+        ("Parashat Noach", 2): {"is_complete": True, "date_completed": "2025-01-01"}
+    }
+    assert loaded.render(progress) == catalog.render(progress)
+    assert loaded.by_key[("Parashat Noach", 2)].parsed == (
+        catalog.by_key[("Parashat Noach", 2)].parsed
+    )
+
+    exported = tmp_path / "torah_readings_complete.json"
+    loaded.save_json(exported)
+    assert exported.read_bytes() == torah_data_file.read_bytes()
+
+
+def test_binary_detects_changed_source(catalog, tmp_path):
+    """A binary catalog built from other JSON is rejected, not served."""
+    source = tmp_path / "torah_readings_complete.json"
+    catalog.save_json(source)
+    path = tmp_path / "catalog.bin"
+    catalog.save_binary(path, source=source)
+    assert len(Catalog.from_binary(path, source=source)) == len(catalog)
+
+    # Rewritten with the same content: a new mtime, but the digest matches
+    source.write_bytes(source.read_bytes())
+    os.utime(source, ns=(0, 0))
+    assert len(Catalog.from_binary(path, source=source)) == len(catalog)
+
+    # Same size, different content
+    source.write_text(source.read_text().replace("Noach", "Noakh"))
+    with pytest.raises(ValueError):
+        Catalog.from_binary(path, source=source)
+
+
+def test_binary_decodes_on_first_use(catalog, tmp_path):
+    """Loading maps the file; records are only decoded when used."""
+    path = tmp_path / "catalog.bin"
+    catalog.save_binary(path)
+    loaded = Catalog.from_binary(path)
+
+    assert len(loaded) == len(catalog)
+    assert "parshiot" not in vars(loaded)
+    assert loaded.by_title["Parashat Noach"].aliyot[1].parsed == (
+        catalog.by_title["Parashat Noach"].aliyot[1].parsed
+    )
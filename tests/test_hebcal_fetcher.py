@@ -0,0 +1,77 @@
+"""
+Tests for streaming Hebcal ingestion.
+"""
+
+import json
+
+import pytest
+
+from backend.data_fetcher.hebcal_fetcher import (
+    CALENDAR_PARSHIOT,
+    fetch_torah_readings_multi_year,
+    iter_json_items,
+    year_spans,
+)
+
+
+def hebcal_body(titles):
+    """Hebcal-style response with a holiday between parashat items."""
+    items = [{"title": "Rosh Hashana", "category": "holiday", "hebrew": "ראש השנה"}]
+    for week, title in enumerate(titles):
+        items.append(
+            {
+                "title": title,
+                "date": f"2014-01-{week % 28 + 1:02d}",
+                "category": "parashat",
+                "hebrew": "פרשת " + title,
+                "leyning": {"torah": "Genesis 1:1-1:5", "1": "Genesis 1:1-1:5"},
+            }
+        )
+    return json.dumps({"title": "Hebcal", "items": items}, ensure_ascii=False).encode()
+
+
+class FakeSession:
+    """Serves one body per request in small chunks and counts what is read."""
+
+    def __init__(self, bodies):
+        self.bodies = list(bodies)
+        self.requests = []
+        self.chunks_read = 0
+
+    def iter_bytes(self, url, params=None):
+        self.requests.append(params)
+        body = self.bodies[len(self.requests) - 1]
+        for start in range(0, len(body), 7):
+            self.chunks_read += 1
+            yield body[start : start + 7]
+
+
+def test_items_decoded_across_chunk_boundaries():
+    """Elements split mid-token (and mid-character) decode intact."""
+    body = hebcal_body(CALENDAR_PARSHIOT[:3])
+    chunks = [body[i : i + 5] for i in range(0, len(body), 5)]
+    assert list(iter_json_items(chunks)) == json.loads(body)["items"]
+
+
+def test_scalar_items_split_across_chunks():
+    """A number cut by a chunk boundary is decoded whole."""
+    chunks = [b'{"items": [12', b"3, 45", b"]}"]
+    assert list(iter_json_items(chunks)) == [123, 45]
+    with pytest.raises(ValueError):
+        list(iter_json_items([b'{"items": [1, 2']))
+
+
+def test_ingestion_stops_once_all_parshiot_found():
+    """A span holding every parsha ends fetching, mid-response."""
+    titles = CALENDAR_PARSHIOT + ["Parashat Noach"] * 20
+    body = hebcal_body(titles)
+    session = FakeSession([body, body])
+
+    assert year_spans(list(range(2014, 2022))) == [(2014, 2017), (2018, 2021)]
+    readings = fetch_torah_readings_multi_year(list(range(2014, 2022)), session)
+
+    assert [r["title"] for r in readings] == CALENDAR_PARSHIOT
+    assert len(session.requests) == 1
+    assert session.requests[0]["start"] == "2014-01-01"
+    assert session.requests[0]["end"] == "2017-12-31"
+    assert session.chunks_read < len(body) / 7
@@ -0,0 +1,112 @@
+"""
+Tests for the cached, rate-limited HTTP client.
+"""
+
+import pytest
+
+from backend.data_fetcher.http_cache import CachedSession, OfflineCacheMiss
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeTransport:
+    """Records requests and answers with the requested params."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        return FakeResponse({"url": url, "params": params})
+
+
+def test_responses_cached_on_disk(tmp_path):
+    """A second session reuses responses fetched by the first."""
+    transport = FakeTransport()
+    first = CachedSession(tmp_path, rate=0, session=transport)
+    body = first.get_json("https://example.org/a", {"x": 1})
+
+    second = CachedSession(tmp_path, rate=0, session=transport)
+    assert second.get_json("https://example.org/a", {"x": 1}) == body
+    assert len(transport.calls) == 1
+    assert (first.misses, second.hits) == (1, 1)
+
+
+def test_offline_mode_uses_only_cache(tmp_path):
+    """Offline sessions serve recorded responses and never hit the network."""
+    CachedSession(tmp_path, rate=0, session=FakeTransport()).get_json(
+        "https://example.org/a"
+    )
+
+    transport = FakeTransport()
+    offline = CachedSession(tmp_path, offline=True, session=transport)
+    assert offline.get_json("https://example.org/a")["url"] == "https://example.org/a"
+    with pytest.raises(OfflineCacheMiss):
+        offline.get_json("https://example.org/b")
+    assert transport.calls == []
+
+
+class FakeStreamResponse(FakeResponse):
+    """Streaming stand-in that counts the chunks handed out."""
+
+    def __init__(self, body, transport):
+        super().__init__(body)
+        self.transport = transport
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            self.transport.chunks += 1
+            yield self.body[start : start + chunk_size]
+
+
+class FakeStreamTransport(FakeTransport):
+    """Answers streamed requests with a fixed body."""
+
+    def __init__(self, body):
+        super().__init__()
+        self.body = body
+        self.chunks = 0
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        self.calls.append((url, params))
+        return FakeStreamResponse(self.body, self)
+
+
+def test_stream_closed_early_stops_reading(tmp_path):
+    """Stopping early closes the response; only offline replays use the part read."""
+    transport = FakeStreamTransport(b"0123456789" * 10)
+    session = CachedSession(tmp_path, rate=0, session=transport)
+    stream = session.iter_bytes("https://example.org/a", {"x": 1}, chunk_size=10)
+    assert next(stream) == b"0123456789"
+    stream.close()
+    assert transport.chunks == 1
+
+    offline = CachedSession(tmp_path, offline=True, session=transport)
+    replay = b"".join(offline.iter_bytes("https://example.org/a", {"x": 1}))
+    assert replay == b"0123456789"
+    assert len(transport.calls) == 1
+
+    online = CachedSession(tmp_path, rate=0, session=transport)
+    assert b"".join(online.iter_bytes("https://example.org/a", {"x": 1})) == (
+        transport.body
+    )
+    assert len(transport.calls) == 2
+    replay = b"".join(offline.iter_bytes("https://example.org/a", {"x": 1}))
+    assert replay == transport.body
@@ -0,0 +1,27 @@
+"""
+Tests for the Prometheus metrics.
+"""
+
+from backend.metrics import Counter, Histogram, Registry
+
+
+def test_histogram_exposition():
+    """Buckets are cumulative, bounds are inclusive and +Inf holds everything."""
+    registry = Registry()
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    )
+    requests = registry.register(Counter("hits_total", "Hits", ("route",)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "/a")
+    requests.inc('say "hi"')
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/a"} 3.65' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+    assert 'hits_total{route="say \\"hi\\""} 1' in lines
+    assert latency.count("/a") == 4
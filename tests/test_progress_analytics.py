@@ -0,0 +1,80 @@
+"""
+Tests for date-bucketed reading analytics.
+"""
+
+from datetime import date
+
+import pytest
+
+from backend.data_fetcher.catalog import Catalog
+from backend.data_fetcher.progress_analytics import ProgressAnalytics
+
+
+@pytest.fixture(scope="module")
+def catalog(torah_data_file):
+    """Catalog loaded from the bundled data file."""
+    return Catalog.from_json(torah_data_file)
+
+
+def _done(day):
+    return {"is_complete": True, "date_completed": f"{day}T08:00:00"}
+
+
+def test_buckets_streaks_and_projection(catalog):
+    """Daily buckets drive the rate, streaks and projected finish."""
+    noach = catalog.by_title["Parashat Noach"].aliyot
+    progress = {
+        noach[0].key: _done("2025-03-01"),
+        noach[1].key: _done("2025-03-02"),
+        noach[2].key: _done("2025-03-02"),
+        noach[3].key: _done("2025-03-05"),
+        noach[4].key: _done("2025-03-06"),
+    }
+    analytics = ProgressAnalytics(catalog, progress)
+
+    summary = analytics.summary(date(2025, 3, 7), window=7)
+    assert [d["date"] for d in summary["daily"]] == [
+        "2025-03-01",
+        "2025-03-02",
+        "2025-03-05",
+        "2025-03-06",
+    ]
+    assert summary["daily"][1]["aliyot"] == 2
+    assert summary["streak"] == {"current": 2, "longest": 2}
+
+    words = sum(a.word_count for a in noach[:5])
+    assert summary["rate"]["words_per_day"] == round(words / 7, 1)
+    assert summary["remaining_words"] == analytics.total_words - words
+    assert summary["projected_completion"] > "2025-03-07"
+
+
+def test_toggles_move_buckets(catalog):
+    """Unmarking removes an aliyah from its day; remarking adds it to today's."""
+    key = catalog.by_title["Parashat Noach"].aliyot[0].key
+    analytics = ProgressAnalytics(catalog, {key: _done("2025-03-01")})
+
+    analytics.apply(key, _done("2025-03-01"), {"is_complete": False})
+    assert analytics.days == []
+    assert analytics.by_week == {}
+    assert analytics.summary(date(2025, 3, 7))["projected_completion"] is None
+
+    analytics.apply(key, None, _done("2025-03-07"))
+    assert analytics.days == ["2025-03-07"]
+    assert analytics.summary(date(2025, 3, 7))["streak"]["current"] == 1
+
+
+def test_current_streak_ignores_later_days(catalog):
+    """The current streak counts back from today, not from the last day read."""
+    noach = catalog.by_title["Parashat Noach"].aliyot
+    progress = {
+        noach[0].key: _done("2025-03-01"),
+        noach[1].key: _done("2025-03-02"),
+        noach[2].key: _done("2025-03-03"),
+        noach[3].key: _done("2025-03-10"),
+    }
+    analytics = ProgressAnalytics(catalog, progress)
+
+    assert analytics.streaks(date(2025, 3, 2)) == (2, 3)
+    assert analytics.streaks(date(2025, 3, 4)) == (3, 3)
+    assert analytics.streaks(date(2025, 3, 7)) == (0, 3)
+    assert analytics.streaks(date(2025, 3, 10)) == (1, 3)
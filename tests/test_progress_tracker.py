@@ -0,0 +1,188 @@
+"""
+Tests for ProgressTracker persistence.
+"""
+
+import multiprocessing
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.data_fetcher.progress_storage import SqliteStorage
+from backend.data_fetcher.progress_tracker import ProgressTracker
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """Path to a fresh progress CSV."""
+    return tmp_path / "progress.csv"
+
+
+def test_mark_complete_appends_to_journal(csv_path):
+    """Marking an aliyah writes a journal line, not a new snapshot."""
+    tracker = ProgressTracker(str(csv_path))
+    snapshot = csv_path.read_text()
+
+    tracker.mark_complete("Parashat Noach", 1)
+    tracker.close()
+
+    assert csv_path.read_text() == snapshot
+    assert "Parashat Noach,1,True" in tracker.storage.journal_path.read_text()
+
+
+def test_journal_replayed_on_load(csv_path):
+    """A new tracker sees progress recorded only in the journal."""
+    tracker = ProgressTracker(str(csv_path))
+    tracker.mark_complete("Parashat Noach", 1)
+    tracker.mark_complete("Parashat Noach", 2)
+    tracker.mark_incomplete("Parashat Noach", 1)
+    tracker.close()
+
+    progress = ProgressTracker(str(csv_path)).load_progress()
+    assert progress[("Parashat Noach", 1)]["is_complete"] is False
+    assert progress[("Parashat Noach", 2)]["is_complete"] is True
+
+
+def test_torn_journal_line_ignored(csv_path):
+    """A partial trailing line from a crash does not break loading."""
+    tracker = ProgressTracker(str(csv_path))
+    tracker.mark_complete("Parashat Noach", 1)
+    tracker.close()
+
+    with open(tracker.storage.journal_path, "a", encoding="utf-8") as f:
+        f.write("Parashat Noach,2,Tr")
+
+    progress = ProgressTracker(str(csv_path)).load_progress()
+    assert progress[("Parashat Noach", 1)]["is_complete"] is True
+    assert ("Parashat Noach", 2) not in progress
+
+
+def test_append_after_torn_journal_line(csv_path):
+    """Events written after a crash are not glued onto the torn line."""
+    tracker = ProgressTracker(str(csv_path))
+    tracker.mark_complete("Parashat Noach", 1)
+    tracker.close()
+
+    with open(tracker.storage.journal_path, "a", encoding="utf-8") as f:
+        f.write("Parashat Noach,2,Tr")
+
+    tracker = ProgressTracker(str(csv_path))
+    tracker.mark_complete("Parashat Noach", 3)
+    tracker.close()
+
+    progress = ProgressTracker(str(csv_path)).load_progress()
+    assert progress[("Parashat Noach", 1)]["is_complete"] is True
+    assert progress[("Parashat Noach", 3)]["is_complete"] is True
+    assert ("Parashat Noach", 2) not in progress
+
+
+def test_compaction_folds_journal_into_snapshot(csv_path):
+    """Reaching the compaction threshold rewrites the snapshot."""
+    tracker = ProgressTracker(str(csv_path), compact_every=3)
+    for number in range(1, 4):
+        tracker.mark_complete("Parashat Noach", number)
+
+    assert not tracker.storage.journal_path.exists()
+    assert csv_path.read_text().count("Parashat Noach") == 3
+
+    progress = ProgressTracker(str(csv_path)).load_progress()
+    assert all(progress[("Parashat Noach", n)]["is_complete"] for n in (1, 2, 3))
+
+
+def test_sqlite_storage_round_trip(tmp_path):
+    """Progress written through SQLite is visible to a new tracker."""
+    db_path = tmp_path / "progress.db"
+    tracker = ProgressTracker(storage=SqliteStorage(str(db_path)))
+    tracker.apply_updates([("Parashat Noach", 1, True), ("Parashat Noach", 2, True)])
+    tracker.mark_incomplete("Parashat Noach", 2)
+    tracker.close()
+
+    progress = ProgressTracker(storage=SqliteStorage(str(db_path))).load_progress()
+    assert progress[("Parashat Noach", 1)]["is_complete"] is True
+    assert progress[("Parashat Noach", 2)]["is_complete"] is False
+
+
+def test_sqlite_sees_other_workers(tmp_path):
+    """A tracker picks up commits made through another connection."""
+    db_path = str(tmp_path / "progress.db")
+    first = ProgressTracker(storage=SqliteStorage(db_path))
+    second = ProgressTracker(storage=SqliteStorage(db_path))
+    changes = []
+    local_changes = []
+    second.subscribe(lambda key, old, new: changes.append(key))
+    second.subscribe(lambda key, old, new: local_changes.append(key), external=False)
+    second.load_progress()
+
+    first.mark_complete("Parashat Noach", 1)
+
+    assert second.load_progress()[("Parashat Noach", 1)]["is_complete"] is True
+    assert changes == [("Parashat Noach", 1)]
+    assert local_changes == []
+    assert second.version == 1
+
+
+def test_sqlite_csv_import_export(csv_path, tmp_path):
+    """CSV progress imports into SQLite and exports back unchanged."""
+    tracker = ProgressTracker(str(csv_path))
+    tracker.apply_updates([("Parashat Noach", 1, True), ("Parashat Bo", 3, True)])
+    tracker.close()
+
+    storage = SqliteStorage(str(tmp_path / "progress.db"))
+    assert storage.import_csv(str(csv_path)) == 2
+
+    export_path = tmp_path / "export.csv"
+    storage.export_csv(str(export_path))
+    assert ProgressTracker(str(export_path)).load_progress() == (
+        ProgressTracker(str(csv_path)).load_progress()
+    )
+
+
+KEYS = [(f"Parashat {n}", a) for n in range(10) for a in range(1, 8)]
+
+
+def _mark_all(tracker, seed):
+    """Mark every key complete one at a time; return the changes applied."""
+    keys = KEYS[:]
+    random.Random(seed).shuffle(keys)
+    return sum(tracker.apply_updates([(*key, True)]) for key in keys)
+
+
+def _mark_all_in_process(db_path, seed):
+    """Same as _mark_all, through a worker process's own tracker."""
+    tracker = ProgressTracker(storage=SqliteStorage(db_path))
+    try:
+        return _mark_all(tracker, seed)
+    finally:
+        tracker.close()
+
+
+def test_concurrent_threads_lose_no_updates(csv_path):
+    """Threads racing on the same keys change each exactly once."""
+    tracker = ProgressTracker(str(csv_path))
+    completed = set()
+    tracker.subscribe(lambda key, old, new: completed.add(key))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        applied = sum(pool.map(lambda seed: _mark_all(tracker, seed), range(8)))
+    tracker.close()
+
+    assert applied == tracker.version == len(KEYS)
+    assert completed == set(KEYS)
+    progress = ProgressTracker(str(csv_path)).load_progress()
+    assert all(progress[key]["is_complete"] for key in KEYS)
+
+
+def test_concurrent_processes_lose_no_updates(tmp_path):
+    """Workers sharing SQLite check and write each key atomically."""
+    db_path = str(tmp_path / "progress.db")
+    SqliteStorage(db_path).close()
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(4) as pool:
+        applied = sum(
+            pool.starmap(_mark_all_in_process, [(db_path, s) for s in range(4)])
+        )
+
+    assert applied == len(KEYS)
+    progress = ProgressTracker(storage=SqliteStorage(db_path)).load_progress()
+    assert all(progress[key]["is_complete"] for key in KEYS)
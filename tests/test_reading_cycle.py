@@ -0,0 +1,58 @@
+"""
+Tests for reading cycles over the shared verse index.
+"""
+
+import pytest
+
+from backend.data_fetcher.reading_cycle import ReadingCycle, load_cycles
+from backend.data_fetcher.verse_progress import VerseProgress
+
+
+@pytest.fixture
+def annual(verse_index, catalog):
+    """The fixture catalog as a cycle."""
+    return ReadingCycle.from_catalog(catalog, verse_index)
+
+
+def test_cycles_share_verse_progress(tmp_path, verse_index, catalog, annual):
+    """Verses read through one cycle count towards every cycle covering them."""
+    custom = ReadingCycle.from_rows(
+        "custom",
+        [["Week 1", 1, "Genesis 1:4-2:2"], ["Week 2", 1, "Genesis 2:3-2:5"]],
+        verse_index,
+    )
+    progress = VerseProgress(tmp_path / "verses.csv", verse_index, catalog)
+    portion = custom.portion("Week 1", 1)
+    progress.record([("add", portion.book, portion.start, portion.end)])
+
+    summary = custom.summary(progress)
+    assert summary["portions"][0]["is_complete"]
+    assert summary["portions"][0]["range"] == "Genesis 1:4-2:2"
+    assert summary["total"]["completed"] == {"portions": 1, "verses": 4, "words": 22}
+
+    aliyot = annual.summary(progress)["portions"]
+    assert [a["read"] for a in aliyot] == [
+        {"verses": 2, "words": 9},
+        {"verses": 2, "words": 13},
+    ]
+    assert not any(a["is_complete"] for a in aliyot)
+
+    with pytest.raises(ValueError):
+        custom.portion("Week 3", 1)
+
+
+def test_split_and_reload(tmp_path, verse_index, catalog, annual):
+    """Split cycles are word-balanced and round-trip through cycle files."""
+    years = [annual.split(f"year{part}", 2, part, per_part=1) for part in (1, 2)]
+    assert [years[0].reference(p) for p in years[0].portions] == ["Genesis 1:1-2:2"]
+    assert [years[1].reference(p) for p in years[1].portions] == ["Genesis 2:3-2:5"]
+
+    cycle_dir = tmp_path / "cycles"
+    cycle_dir.mkdir()
+    for year in years:
+        year.save(cycle_dir / f"{year.name}.json")
+
+    cycles = load_cycles(cycle_dir, verse_index, catalog)
+    assert list(cycles) == ["annual", "year1", "year2"]
+    assert cycles["year2"].portions == years[1].portions
+    assert cycles["year2"].description == years[1].description
@@ -0,0 +1,62 @@
+"""
+Tests for reading plan partitioning.
+"""
+
+import itertools
+from datetime import date, timedelta
+
+import pytest
+
+from backend.data_fetcher.catalog import Catalog
+from backend.data_fetcher.reading_plan import (
+    MAX_CACHED_PLANS,
+    ReadingPlanner,
+    linear_partition,
+)
+
+
+def _best_max(weights, parts):
+    """Smallest possible largest part, by trying every split."""
+    n = len(weights)
+    return min(
+        max(sum(weights[a:b]) for a, b in zip((0,) + cuts, cuts + (n,)))
+        for cuts in itertools.combinations_with_replacement(range(n + 1), parts - 1)
+    )
+
+
+@pytest.mark.parametrize(
+    "weights, parts",
+    [
+        ([9, 1, 1, 1, 1, 1, 1, 1, 1, 9], 3),
+        ([5, 40, 5, 5, 5, 40, 5], 4),
+        ([1, 2, 3, 4, 5, 6, 7, 8, 9], 3),
+        ([100, 1, 1], 5),
+    ],
+)
+def test_partition_is_optimal(weights, parts):
+    """The largest part matches an exhaustive search."""
+    limit, cuts = linear_partition(weights, parts)
+    assert len(cuts) == parts + 1
+    assert cuts[0] == 0 and cuts[-1] == len(weights)
+    sums = [sum(weights[a:b]) for a, b in zip(cuts, cuts[1:])]
+    assert max(sums) == limit == _best_max(weights, parts)
+
+
+def test_partition_balances_below_the_limit():
+    """Parts are evened out rather than filled greedily to the limit."""
+    limit, cuts = linear_partition([10] * 10, 4)
+    sums = [sum([10] * (b - a)) for a, b in zip(cuts, cuts[1:])]
+    assert limit == 30
+    assert sorted(sums) == [20, 20, 30, 30]
+
+
+def test_plan_cache_is_bounded():
+    """Plans for many distinct windows don't accumulate without limit."""
+    planner = ReadingPlanner(Catalog([]), {})
+    start = date(2025, 1, 1)
+    first = planner.plan(start, start)
+    for days in range(1, MAX_CACHED_PLANS + 5):
+        planner.plan(start, start + timedelta(days=days))
+        assert planner.plan(start, start) is first
+
+    assert len(planner._plans) == MAX_CACHED_PLANS
@@ -0,0 +1,97 @@
+"""
+Tests for Sefaria text handling.
+"""
+
+from backend.data_fetcher.sefaria_fetcher import (
+    ChapterStore,
+    count_hebrew_words,
+    count_hebrew_words_batch,
+    count_words_and_verses_in_aliyah,
+)
+
+
+class FakeSefaria:
+    """Serves chapters of numbered placeholder verses and counts requests."""
+
+    def __init__(self, chapter_lengths):
+        self.chapter_lengths = chapter_lengths
+        self.requests = 0
+
+    def get_json(self, url, params=None):
+        self.requests += 1
+        chapter = int(url.rsplit(".", 1)[1])
+        return {
+            "he": [
+                f"א ב {chapter}:{v}"
+                for v in range(1, self.chapter_lengths[chapter] + 1)
+            ]
+        }
+
+
+def _range(start_ch, start_v, end_ch, end_v):
+    return {
+        "book": "Genesis",
+        "start_chapter": start_ch,
+        "start_verse": start_v,
+        "end_chapter": end_ch,
+        "end_verse": end_v,
+    }
+
+
+def test_chapter_store_slices_multi_chapter_ranges(tmp_path):
+    """Ranges spanning chapters are sliced from stored chapters."""
+    store = ChapterStore(tmp_path, session=FakeSefaria({1: 5, 2: 4, 3: 6}))
+    verses = store.verses(_range(1, 4, 3, 2))
+    assert verses[0].endswith("1:4")
+    assert verses[-1].endswith("3:2")
+    assert len(verses) == 2 + 4 + 2
+
+
+def test_chapter_fetched_once_and_persisted(tmp_path):
+    """Overlapping aliyot share chapter fetches, and the store survives restarts."""
+    sefaria = FakeSefaria({1: 5, 2: 4})
+    store = ChapterStore(tmp_path, session=sefaria)
+    first = count_words_and_verses_in_aliyah(_range(1, 1, 2, 2), store=store)
+    count_words_and_verses_in_aliyah(_range(2, 3, 2, 4), store=store)
+    assert first == {"word_count": 21, "verse_count": 7}
+    assert sefaria.requests == 2
+
+    reloaded = ChapterStore(tmp_path, session=sefaria)
+    reloaded.verses(_range(1, 1, 2, 4))
+    assert sefaria.requests == 2
+
+
+def test_batch_word_counts_handle_markup_and_punctuation():
+    """Markup, markers and stand-alone punctuation aren't counted as words."""
+    verses = [
+        "בְּרֵאשִׁ֖ית בָּרָ֣א אֱלֹהִ֑ים אֵ֥ת הַשָּׁמַ֖יִם וְאֵ֥ת הָאָֽרֶץ׃",
+        "וַיִּקְרָ֨א אֱלֹהִ֤ים ׀ לָאוֹר֙ וַֽיְהִי־עֶ֥רֶב ׃",
+        "אֵ֣לֶּה תוֹלְד֧וֹת בְּ<small>הִ</small>בָּֽרְאָ֑ם&nbsp;{פ}<br>וַיְכֻלּ֛וּ",
+    ]
+    assert count_hebrew_words_batch(verses) == [7, 4, 4]
+    assert count_hebrew_words_batch(verses, split_maqaf=True) == [7, 5, 4]
+    assert [count_hebrew_words(verse) for verse in verses] == [7, 4, 4]
+
+
+def test_punctuation_separated_by_any_whitespace():
+    """Tabs and no-break spaces separate words just like spaces."""
+    verses = [
+        "אֱלֹהִ֤ים ׀ לָאוֹר֙",
+        "אֱלֹהִ֤ים\t׀ לָאוֹר֙",
+        "אֱלֹהִ֤ים\u00a0׀\u00a0לָאוֹר֙",
+        "׃\tאוֹר",
+    ]
+    assert count_hebrew_words_batch(verses) == [2, 2, 2, 1]
+
+
+def test_counting_rules_differ_from_plain_split():
+    """Markup and letterless tokens are dropped; a plain split counts them."""
+    verses = [
+        "אֱלֹהִ֤ים ׀ לָאוֹר֙",
+        "<b>אֱלֹהִ֤ים</b>&nbsp;לָאוֹר֙",
+        "הָאָֽרֶץ׃ {ס}",
+        "וַֽיְהִי־עֶ֥רֶב",
+    ]
+    assert [len(verse.split()) for verse in verses] == [3, 1, 2, 1]
+    assert count_hebrew_words_batch(verses) == [2, 2, 1, 1]
+    assert count_hebrew_words_batch(verses, split_maqaf=True) == [2, 2, 1, 2]
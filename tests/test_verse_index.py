@@ -0,0 +1,60 @@
+"""
+Tests for the per-verse word-count index.
+"""
+
+import pytest
+
+from backend.data_fetcher.verse_index import VerseIndex
+
+
+@pytest.fixture
+def verse_index():
+    """Tiny two-chapter book with known word counts."""
+    return VerseIndex({"Genesis": [[3, 4, 5], [6, 7]]})
+
+
+def test_count_range_across_chapters(verse_index):
+    """Ranges spanning chapters sum the right verses."""
+    counts = verse_index.count_range(
+        {
+            "book": "Genesis",
+            "start_chapter": 1,
+            "start_verse": 2,
+            "end_chapter": 2,
+            "end_verse": 1,
+        }
+    )
+    assert counts == {"word_count": 4 + 5 + 6, "verse_count": 3}
+
+
+def test_ordinals_round_trip(verse_index):
+    """Ordinals map back to chapter and verse."""
+    book = verse_index.book("Genesis")
+    assert book.ordinal(2, 1) == 3
+    assert [book.reference(i) for i in range(5)] == [
+        (1, 1),
+        (1, 2),
+        (1, 3),
+        (2, 1),
+        (2, 2),
+    ]
+
+
+def test_invalid_references_rejected(verse_index):
+    """Out-of-range verses and unknown books raise ValueError."""
+    book = verse_index.book("Genesis")
+    with pytest.raises(ValueError):
+        book.ordinal(1, 4)
+    with pytest.raises(ValueError):
+        book.span(2, 1, 1, 3)
+    with pytest.raises(ValueError):
+        verse_index.book("Judges")
+
+
+def test_save_and_load(tmp_path, verse_index):
+    """The index survives a save/load round trip."""
+    path = tmp_path / "verse_index.json"
+    verse_index.save(path)
+    assert VerseIndex.load(path).book("Genesis").prefix == (
+        verse_index.book("Genesis").prefix
+    )
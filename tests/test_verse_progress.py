@@ -0,0 +1,98 @@
+"""
+Tests for interval sets and verse-level progress.
+"""
+
+from backend.data_fetcher.interval_set import IntervalSet
+from backend.data_fetcher.progress_tracker import ProgressTracker
+from backend.data_fetcher.verse_progress import VerseProgress
+
+
+def test_interval_set_merges_and_splits():
+    """Inserts merge touching intervals; removals split them."""
+    intervals = IntervalSet()
+    intervals.add(0, 3)
+    intervals.add(5, 8)
+    intervals.add(3, 5)
+    assert list(intervals) == [(0, 8)]
+
+    intervals.remove(2, 4)
+    assert list(intervals) == [(0, 2), (4, 8)]
+    assert intervals.covered(1, 6) == 3
+    assert intervals.contains(4, 8)
+    assert not intervals.contains(1, 5)
+    assert intervals.total() == 6
+
+
+def test_partial_ranges_weighted_by_words(tmp_path, verse_index, catalog):
+    """Completion is measured in words from the prefix sums."""
+    progress = VerseProgress(tmp_path / "verses.csv", verse_index, catalog)
+    progress.mark_range("Genesis", 1, 4, 2, 1, True)
+
+    summary = progress.summary()
+    genesis = summary["books"]["Genesis"]
+    assert genesis["ranges"] == ["1:4-2:1"]
+    assert genesis["completed"] == {"verses": 3, "words": 4 + 5 + 6}
+    assert summary["total"]["total"]["words"] == 55
+
+
+def test_aliyot_kept_in_step_with_verses(tmp_path, verse_index, catalog):
+    """Aliyah flags follow their verses, and un-marking keeps other verses."""
+    tracker = ProgressTracker(str(tmp_path / "progress.csv"))
+    log_path = tmp_path / "verses.csv"
+    progress = VerseProgress(log_path, verse_index, catalog)
+    progress.attach(tracker)
+
+    def ranges(progress):
+        return progress.summary()["books"]["Genesis"]["ranges"]
+
+    def is_complete(number):
+        entry = tracker.load_progress().get(("Parashat Bereshit", number))
+        return bool(entry and entry["is_complete"])
+
+    progress.mark_range("Genesis", 1, 1, 1, 3, True)
+    tracker.mark_complete("Parashat Bereshit", 1)
+    assert ranges(progress) == ["1:1-1:5"]
+    tracker.mark_incomplete("Parashat Bereshit", 1)
+    assert ranges(progress) == ["1:1-1:3"]
+
+    progress.mark_range("Genesis", 1, 4, 1, 5, True)
+    assert is_complete(1)
+    progress.mark_range("Genesis", 1, 2, 1, 2, False)
+    assert not is_complete(1)
+    assert ranges(progress) == ["1:1-1:1", "1:3-1:5"]
+
+    tracker.mark_complete("Parashat Bereshit", 2)
+    progress.mark_range("Genesis", 2, 5, 2, 5, False)
+    assert not is_complete(2)
+    assert ranges(progress) == ["1:1-1:1", "1:3-2:4"]
+
+    # All of aliyah 2's verses are now marked individually
+    progress.mark_range("Genesis", 2, 5, 2, 5, True)
+    assert is_complete(2)
+    tracker.mark_incomplete("Parashat Bereshit", 2)
+    assert ranges(progress) == ["1:1-1:1", "1:3-1:5"]
+    progress.close()
+
+    reloaded = VerseProgress(log_path, verse_index, catalog)
+    reloaded.attach(tracker)
+    assert ranges(reloaded) == ["1:1-1:1", "1:3-1:5"]
+    reloaded.compact()
+    assert len(log_path.read_text().splitlines()) == 3
+
+
+def test_shared_log_between_processes(tmp_path, verse_index, catalog):
+    """Writers sharing a log see each other's ranges, even across compaction."""
+    log_path = tmp_path / "verses.csv"
+    first = VerseProgress(log_path, verse_index, catalog)
+    second = VerseProgress(log_path, verse_index, catalog)
+
+    first.mark_range("Genesis", 1, 1, 1, 2, True)
+    second.mark_range("Genesis", 2, 1, 2, 2, True)
+    second.compact()
+    first.mark_range("Genesis", 1, 4, 1, 4, True)
+
+    expected = ["1:1-1:2", "1:4-1:4", "2:1-2:2"]
+    assert second.summary()["books"]["Genesis"]["ranges"] == expected
+    first.close()
+    reloaded = VerseProgress(log_path, verse_index, catalog)
+    assert reloaded.summary()["books"]["Genesis"]["ranges"] == expected